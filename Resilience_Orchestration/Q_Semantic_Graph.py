@@ -26,12 +26,14 @@ There is more about this pattern and how it and the LD Views work in my papers,
 
 # #!/usr/bin/python
 import os
+from collections import defaultdict
 import numpy as np
 import rdflib
 from rdflib import Graph
 from rdflib import URIRef, BNode, Literal
 from rdflib.namespace import RDF
 from rdflib import Namespace
+from instrument import span, traced
 
 
 # Some of the namespaces might be as follows
@@ -43,6 +45,12 @@ xslt_attribute = URIRef(xslt_base + "attribute")
 xslt_list = URIRef(xslt_base + "list")
 rdfs_isDefinedBy = URIRef(rdfs_base + "isDefinedBy")
 geo_hasGeometry = URIRef(geo_base + "hasGeometry")
+ubo_base = "http://www.sw.org/UBO#"
+ubo_hasType = URIRef(ubo_base + "hasType")
+ubo_hasValue = URIRef(ubo_base + "hasValue")
+ubo_hasProperty = URIRef(ubo_base + "hasProperty")
+ubo_hasSpaceMember = URIRef(ubo_base + "hasSpaceMember")
+ubo_SpaceBoundary = URIRef(ubo_base + "SpaceBoundary")
 
 class GraphData():
     # Input parameters
@@ -51,10 +59,11 @@ class GraphData():
         for row in USO_New.query("""SELECT ?s ?p ?o
             WHERE { ?s ?p ?o .}""",
                 initBindings={}):
-            print "row: ", row
+            print("row: " + str(row))
 
         return
 
+    @traced("graph.get_levels")
     def get_levels(self, USO_New):
         LevelDict = dict()
         type = URIRef('http://www.sw.org/UBO#hasType')
@@ -78,6 +87,7 @@ class GraphData():
         #print counter
         return LevelDict
 
+    @traced("graph.get_spaces")
     def get_spaces(self, USO_New):
         spaces_dict = dict()
         for row in USO_New.query("""SELECT ?s ?o
@@ -99,6 +109,7 @@ class GraphData():
 #In the following query, we are asking for the parser to go through and do the following:
     #1) Go through each subject and select the ones that have a predicate "hasType" = "Column"
     #2) Now that we have identified all of these components, grab the "hasValue" values (literals)...in this case they are a dictionary of all the info for the column
+    @traced("graph.get_dim_columns")
     def get_dim_columns(self, USO_New):
         dimC_dict = dict()
         typeURI = URIRef('http://www.sw.org/UBO#hasType')
@@ -119,6 +130,7 @@ class GraphData():
 
 #Now doing the same for the beams:
 
+    @traced("graph.get_dim_beams")
     def get_dim_beams(self, USO_New):
         dimB_dict = dict()
         type = URIRef('http://www.sw.org/UBO#hasType')
@@ -136,3 +148,45 @@ class GraphData():
                 dimB_dict[row[0]] = temp
 
         return dimB_dict
+
+#The query methods above each evaluate their own SPARQL query over the whole graph.
+#get_components instead indexes the hasType / hasValue / hasProperty / hasSpaceMember triples (and which subjects are
+#SpaceBoundaries) once, with one lookup per predicate, and then puts together all of the dicts from those indexes:
+    #levels  --> same as get_levels:       {spaceBoundary: [values of its properties]}
+    #spaces  --> same as get_spaces:       {space_collection: [spaces]}
+    #columns --> same as get_dim_columns:  {column: [hasValue literals]}
+    #beams   --> same as get_dim_beams:    {beam: [hasValue literals]}
+    #walls   --> the same for subjects with hasType "Wall"
+    @traced("graph.get_components")
+    def get_components(self, USO_New, column_type="Column", beam_type="Beam", wall_type="Wall"):
+        types = defaultdict(list)
+        values = defaultdict(list)
+        properties = defaultdict(list)
+        spaces_dict = defaultdict(list)
+        with span("graph.index_triples", triples=len(USO_New)):
+            for s, p, o in USO_New.triples((None, ubo_hasType, None)):
+                types[o].append(s)
+            for s, p, o in USO_New.triples((None, ubo_hasValue, None)):
+                values[s].append(o)
+            for s, p, o in USO_New.triples((None, ubo_hasProperty, None)):
+                properties[s].append(o)
+            for s, p, o in USO_New.triples((None, ubo_hasSpaceMember, None)):
+                spaces_dict[s].append(o)
+        space_boundaries = USO_New.subjects(RDF.type, ubo_SpaceBoundary)
+
+        LevelDict = dict()
+        for sbx in space_boundaries:
+            level_values = [x for prop in properties.get(sbx, []) for x in values.get(prop, [])]
+            if level_values:
+                LevelDict[sbx] = level_values
+
+        def values_of_type(type_name):
+            return dict((s, values[s]) for s in types.get(Literal(type_name), []) if s in values)
+
+        return {
+            "levels": LevelDict,
+            "spaces": dict(spaces_dict),
+            "columns": values_of_type(column_type),
+            "beams": values_of_type(beam_type),
+            "walls": values_of_type(wall_type),
+        }
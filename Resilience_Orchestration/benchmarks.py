@@ -0,0 +1,399 @@
+# -------------------------------------------------------------------------------
+# Name:        benchmarks.py
+# Purpose:     Time the Python hot paths of the orchestration on the repository's own data and on enlarged copies
+#
+# Created:     10/18/2026
+# Licence:     The University of Notre Dame
+# -------------------------------------------------------------------------------
+
+'''
+Every benchmark runs on the files that ship with the repository, enlarged by each scale factor:
+
+    hazard.*    ReadHazardData and Curves.querycurves on MATLAB Codes/total*.csv, sites repeated `scale` times;
+                hazard.at interpolates the curves at 1000 points around the sites (site_index.py)
+    graph.*     parsing MyGraph.ttl and each GraphData query, the graph repeated `scale` times (EnlargeGraph)
+    colvol.*    calcvolume and calcvolumes on the example literals of colvol.py, 100 x `scale` of them
+    embodied.*  EmbodiedImpacts of those members for the four default material scenarios
+    xml.*       the component extraction of xml_parsing.py on the three TempXMLs files, components repeated `scale`
+                times; ifc.read_structure on the two ifcxml files
+
+    python benchmarks.py                              all benchmarks, scales 1 10 100 1000
+    python benchmarks.py --scales=1,10 --only=graph   just the graph benchmarks, small scales
+    python benchmarks.py --save=baseline.json         keep the timings as the baseline
+    python benchmarks.py --compare=baseline.json      report against the baseline, exit code 1 on a regression
+
+The report gives, per benchmark and scale, the best time of `repeat` runs, the time per item (site, triple, element)
+and the scaling exponent against the previous scale (1 means linear, 2 quadratic). With --compare it also shows
+the baseline time and flags every benchmark more than `threshold` times slower than its baseline.
+'''
+
+# #!/usr/bin/python
+import io
+import os
+import sys
+import copy
+import json
+import math
+import time
+import getopt
+import shutil
+import tempfile
+import contextlib
+import xml.etree.ElementTree as ET
+import numpy as np
+import pandas as pd
+from rdflib import Graph, Literal
+
+from main import ReadHazardData
+from curves import Curves
+from Q_Semantic_Graph import GraphData
+from graph_cache import EnlargeGraph
+from colvol import calcvolume, calcvolumes, load_section_areas
+from embodied import EmbodiedImpacts, SCENARIOS
+import colvol
+from xml_parsing import IFC_NS, DEFAULT_CLASSES, extract_components
+from ifc_structure import ReadIfcStructure
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+HAZARD_FILES = {"PGA": "total.csv", "SA0P2": "total_SA0P2.csv", "SA1P0": "total_SA1.csv"}  # model: file in MATLAB Codes
+TEMP_XMLS = ("aRC_FRAME_2016Concrete_beamcolumnsonly.xml", "bRC_FRAME_Concrete_allComponents.ifcxml",
+             "cRC_FRAME_Concrete_ReinforcementCheck.ifcxml")
+# Column literal and W shape beam literal of colvol.py (calcvolume only computes a volume for the second one)
+COLUMN_LITERAL = ("[[<Element {http://www.iai-tech.org/ifcXML/IFC2x2/FINAL}IfcColumn at 0x136b6808>, ('Concrete-Square-Column:"
+                  "14 x 14:528211', 'name'), ('i3438', 'id'), ([('CadID', '528211'), ('world_direction_ratios', "
+                  "['6.123031769E-17', '1.']), ('depth', ['8.572916667']), ('XandYDim', ['0.08333333333', '0.08333333333']), "
+                  "('profile_location', ['-3.552713679E-15', '0.']), ('reference_direction', ['1.', '0.']), "
+                  "('local_direction_ratios', ['-75.50063228', '53.15938446', '10.']), ('position', ['-75.50063228', "
+                  "'53.15938446', '10.']), ('extrude_direction', ['0.', '0.', '1.'])], 'coors')]]")
+COLVOL_LITERAL = ("[[<Element {http://www.iai-tech.org/ifcXML/IFC2x2/FINAL}IfcBeam at 0x42d66c8>, ('W Shapes:W14X22:587548', "
+                  "'name'), ('i1963', 'id'), ([('CadID', ['587548']), ('position', ['-76.04229895', '62.6177178', '0.']), "
+                  "('local_direction_ratios', []), ('reference_direction', []), ('profile_location', ['0.5708333333', "
+                  "'-0.2083333333', '-1.141666667']), ('XandYDim', ['18.85833333', '0.4166666667', '1.141666667'])], 'coors')]]")
+W_SECTIONS = {"W14X22": 6.49}  # in^2, stands in for the section catalogue colvol reads from a local Revit folder
+SCALES = (1, 10, 100, 1000)
+
+
+# Synthetic data ........................................................................................................
+
+def SyntheticHazard(directory, scale, source_dir=os.path.join(HERE, "MATLAB Codes")):
+    """
+    Writes <directory>/<model>/total.csv for every model with the sites of the USGS files repeated `scale` times
+    (renamed, moved a little and with slightly different rates so every curve is distinct)
+    returns: (model names, number of sites)
+    """
+    sites = 0
+    for model, name in HAZARD_FILES.items():
+        df = pd.read_csv(os.path.join(source_dir, name), header=None)
+        header, rows = df.iloc[:1], df.iloc[1:]
+        copies = []
+        for k in range(scale):
+            part = rows.copy()
+            if k:
+                part[0] = part[0].astype(str) + " #%d" % k
+                part[1] = part[1].astype(float) + 0.01 * k
+                part[2] = part[2].astype(float) + 0.01 * k
+                part[part.columns[3:]] = part[part.columns[3:]].astype(float) * (1 + 1e-3 * k)
+            copies.append(part)
+        folder = os.path.join(directory, model)
+        if not os.path.isdir(folder):
+            os.makedirs(folder)
+        pd.concat([header] + copies).to_csv(os.path.join(folder, "total.csv"), header=False, index=False)
+        sites = len(rows) * scale
+    return list(HAZARD_FILES), sites
+
+
+def SyntheticGraph(path, scale, source=os.path.join(HERE, "MyGraph.ttl")):
+    """Writes MyGraph.ttl repeated `scale` times to path; returns the number of triples"""
+    graph = Graph().parse(source, format="turtle")
+    if scale > 1:
+        graph = EnlargeGraph(graph, scale)
+    graph.serialize(destination=path, format="turtle")
+    return len(graph)
+
+
+def SyntheticIfc(path, scale, source, classes=DEFAULT_CLASSES):
+    """
+    Writes the ifcxml file `source` to path with its components repeated `scale` times; the copies get new ids and
+    Tags and share the placement and geometry of the original
+    returns: the number of components in the new file
+    """
+    tree = ET.parse(source)
+    uos = list(tree.getroot())[-1]
+    components = [e for e in uos if e.tag.startswith(IFC_NS) and e.tag[len(IFC_NS):] in classes]
+    for k in range(1, scale):
+        for element in components:
+            duplicate = copy.deepcopy(element)
+            duplicate.set("id", "%s_%d" % (element.get("id"), k))
+            tag = duplicate.find(IFC_NS + "Tag")
+            if tag is not None and tag.text:
+                tag.text = "%s_%d" % (tag.text, k)
+            uos.append(duplicate)
+    tree.write(path, encoding="utf-8", xml_declaration=True)
+    return len(components) * scale
+
+
+# Benchmarks ............................................................................................................
+# Each one is setup(scale, work) -> (function to time, number of items it handles); setup is not timed.
+
+def _quiet(func, *args):
+    # ReadHazardData prints every model it reads and calcvolume every section it looks up
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args)
+
+
+def _hazard_folder(scale, work):
+    folder = os.path.join(work, "hazard_x%d" % scale)
+    if not os.path.isdir(folder):
+        SyntheticHazard(folder, scale)
+    return folder
+
+
+def bench_hazard_read(scale, work):
+    folder = _hazard_folder(scale, work)
+    sites = _quiet(ReadHazardData, list(HAZARD_FILES), folder, None).keys()
+    return (lambda: _quiet(ReadHazardData, list(HAZARD_FILES), folder, None)), len(sites)
+
+
+def bench_hazard_read_cached(scale, work):
+    folder = _hazard_folder(scale, work)
+    cache = os.path.join(work, "hazard_cache_x%d" % scale)
+    sites = _quiet(ReadHazardData, list(HAZARD_FILES), folder, cache).keys()  # fills the cache
+    return (lambda: _quiet(ReadHazardData, list(HAZARD_FILES), folder, cache)), len(sites)
+
+
+def bench_querycurves(scale, work):
+    store = _quiet(ReadHazardData, list(HAZARD_FILES), _hazard_folder(scale, work), None)
+
+    def run():
+        splines = Curves().querycurves(store, savefigs=False)
+        splines.prefetch(store.keys())  # querycurves is lazy, this fits every curve
+    return run, len(store) * len(HAZARD_FILES)
+
+
+def bench_hazard_at(scale, work):
+    store = _quiet(ReadHazardData, list(HAZARD_FILES), _hazard_folder(scale, work), None)
+    model = next(iter(store.models.values()))
+    rng = np.random.default_rng(0)
+    lon = rng.uniform(model.lon.min(), model.lon.max(), 1000)
+    lat = rng.uniform(model.lat.min(), model.lat.max(), 1000)
+    store.at(lon[0], lat[0])  # the KD-trees are built once per store, not per query
+    return (lambda: store.at(lon, lat)), len(lon)
+
+
+def _graph_file(scale, work):
+    path = os.path.join(work, "graph_x%d.ttl" % scale)
+    if not os.path.exists(path):
+        SyntheticGraph(path, scale)
+    return path
+
+
+def bench_graph_parse(scale, work):
+    path = _graph_file(scale, work)
+    return (lambda: Graph().parse(path, format="turtle")), len(Graph().parse(path, format="turtle"))
+
+
+def _graph_query(method):
+    def setup(scale, work):
+        graph = Graph().parse(_graph_file(scale, work), format="turtle")
+        query = getattr(GraphData(), method)
+        return (lambda: query(graph)), len(graph)
+    setup.__name__ = "bench_graph_" + method
+    return setup
+
+
+def _section_catalogue(work):
+    path = os.path.join(work, "ISectionAreas.csv")
+    pd.DataFrame({"Section": list(W_SECTIONS), "Area": list(W_SECTIONS.values())}).to_csv(path, index=False)
+    # calcvolume always reads the catalogue at colvol.ISECTION_CSV, which is a folder on the author's machine
+    colvol._section_areas.setdefault(colvol.ISECTION_CSV, load_section_areas(path))
+    return path
+
+
+def bench_calcvolume(scale, work):
+    _section_catalogue(work)
+    literals = [COLVOL_LITERAL] * (100 * scale)
+    return (lambda: [_quiet(calcvolume, s) for s in literals]), len(literals)
+
+
+def bench_calcvolumes(scale, work):
+    # MyGraph.ttl is the single room model without columns or beams, so the members are the colvol.py literals
+    csv = _section_catalogue(work)
+    columns = dict(("column_%d" % i, [Literal(COLUMN_LITERAL)]) for i in range(100 * scale))
+    beams = dict(("beam_%d" % i, [Literal(COLVOL_LITERAL)]) for i in range(100 * scale))
+    return (lambda: calcvolumes(columns, beams, section_csv=csv)), len(columns) + len(beams)
+
+
+def bench_embodied(scale, work):
+    csv = _section_catalogue(work)
+    columns = dict(("column_%d" % i, [Literal(COLUMN_LITERAL)]) for i in range(100 * scale))
+    beams = dict(("beam_%d" % i, [Literal(COLVOL_LITERAL)]) for i in range(100 * scale))
+    table, volumes, _ = calcvolumes(columns, beams, section_csv=csv)
+    levels = {"level_1": [Literal("Level 1"), Literal("0.")], "level_2": [Literal("Level 2"), Literal("10.")]}
+    return (lambda: EmbodiedImpacts(table, volumes, SCENARIOS, levels=levels)), len(table) * len(SCENARIOS)
+
+
+def _ifc_file(name, scale, work):
+    path = os.path.join(work, "x%d_%s" % (scale, name))
+    if not os.path.exists(path):
+        if name.endswith(".ifcxml"):
+            SyntheticIfc(path, scale, os.path.join(HERE, "TempXMLs", name))
+        else:  # the gbXML file has no IFC components to repeat, it is timed as it is
+            shutil.copy(os.path.join(HERE, "TempXMLs", name), path)
+    return path
+
+
+def _xml_extract(name):
+    def setup(scale, work):
+        path = _ifc_file(name, scale, work)
+        return (lambda: extract_components(path)), sum(len(c) for c in extract_components(path).values())
+    setup.__name__ = "bench_xml_extract_" + name.split("_")[0]
+    return setup
+
+
+def _ifc_read(name):
+    def setup(scale, work):
+        path = _ifc_file(name, scale, work)
+        structure = ReadIfcStructure(path)
+        return (lambda: ReadIfcStructure(path)), len(structure["columns"]) + len(structure["beams"])
+    return setup
+
+
+BENCHMARKS = [
+    ("hazard.read", bench_hazard_read),
+    ("hazard.read_cached", bench_hazard_read_cached),
+    ("hazard.querycurves", bench_querycurves),
+    ("hazard.at", bench_hazard_at),
+    ("graph.parse", bench_graph_parse),
+    ("graph.get_levels", _graph_query("get_levels")),
+    ("graph.get_spaces", _graph_query("get_spaces")),
+    ("graph.get_dim_columns", _graph_query("get_dim_columns")),
+    ("graph.get_dim_beams", _graph_query("get_dim_beams")),
+    ("graph.get_components", _graph_query("get_components")),
+    ("colvol.calcvolume", bench_calcvolume),
+    ("colvol.calcvolumes", bench_calcvolumes),
+    ("embodied.impacts", bench_embodied),
+    ("xml.extract.aRC", _xml_extract(TEMP_XMLS[0])),
+    ("xml.extract.bRC", _xml_extract(TEMP_XMLS[1])),
+    ("xml.extract.cRC", _xml_extract(TEMP_XMLS[2])),
+    ("ifc.read_structure.bRC", _ifc_read(TEMP_XMLS[1])),
+    ("ifc.read_structure.cRC", _ifc_read(TEMP_XMLS[2])),
+]
+
+
+# Running and reporting ..................................................................................................
+
+def TimeIt(func, repeat=3):
+    """returns: (best, median) seconds of `repeat` calls"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times), float(np.median(times))
+
+
+def RunBenchmarks(scales=SCALES, only=None, repeat=3, work=None):
+    """
+    scales: factors the data is enlarged by
+    only: prefixes of the benchmark names to run (e.g. ["graph", "xml.extract"]), None for all of them
+    work: folder for the synthetic files, a temporary folder that is removed afterwards when None
+    returns: list of {"benchmark", "scale", "items", "best_s", "median_s"}
+    """
+    own_work = work is None
+    work = work or tempfile.mkdtemp(prefix="benchmarks")
+    results = []
+    try:
+        for name, setup in BENCHMARKS:
+            if only and not any(name.startswith(prefix) for prefix in only):
+                continue
+            for scale in scales:
+                try:
+                    func, items = setup(scale, work)
+                    best, median = TimeIt(func, repeat)
+                except Exception as e:
+                    print("Could not run %s at x%d: %s" % (name, scale, e))
+                    continue
+                results.append({"benchmark": name, "scale": scale, "items": items, "best_s": best, "median_s": median})
+                print("%-26s x%-5d %9.4f s" % (name, scale, best))
+    finally:
+        if own_work:
+            shutil.rmtree(work, ignore_errors=True)
+    return results
+
+
+def SaveBaseline(results, path):
+    with open(path, "w") as f:
+        json.dump({"created": time.strftime("%Y-%m-%d %H:%M:%S"), "python": sys.version.split()[0],
+                   "results": results}, f, indent=1)
+
+
+def LoadBaseline(path):
+    with open(path) as f:
+        return json.load(f)["results"]
+
+
+def Report(results, baseline=None, threshold=1.2):
+    """
+    returns: (report text, list of (benchmark, scale) that are more than `threshold` times slower than the baseline)
+    """
+    base = dict(((r["benchmark"], r["scale"]), r["best_s"]) for r in baseline or [])
+    previous = {}
+    regressions = []
+    header = "%-26s %6s %9s %11s %12s %8s" % ("benchmark", "scale", "items", "best s", "per item us", "exponent")
+    if baseline is not None:
+        header += " %11s %7s" % ("baseline s", "ratio")
+    lines = [header]
+    for r in results:
+        name, scale, items, best = r["benchmark"], r["scale"], r["items"], r["best_s"]
+        exponent = ""
+        if name in previous:
+            items0, best0 = previous[name]
+            if items > items0 and best0 > 0 and best > 0:
+                exponent = "%.2f" % (math.log(best / best0) / math.log(float(items) / items0))
+        previous[name] = (items, best)
+        line = "%-26s %6d %9d %11.4f %12.2f %8s" % (name, scale, items, best, 1e6 * best / max(items, 1), exponent)
+        if baseline is not None:
+            if (name, scale) in base:
+                ratio = best / base[(name, scale)] if base[(name, scale)] > 0 else float("inf")
+                line += " %11.4f %7.2f" % (base[(name, scale)], ratio)
+                if ratio > threshold:
+                    line += "  REGRESSION"
+                    regressions.append((name, scale))
+            else:
+                line += " %11s %7s" % ("-", "-")
+        lines.append(line)
+    return "\n".join(lines), regressions
+
+
+def main(argv):
+    scales, only, repeat, save, compare, threshold, work = SCALES, None, 3, None, None, 1.2, None
+    opts, args = getopt.getopt(argv, "", ["scales=", "only=", "repeat=", "save=", "compare=", "threshold=", "work="])
+    for opt, arg in opts:
+        if opt == "--scales":
+            scales = [int(s) for s in arg.split(",")]
+        elif opt == "--only":
+            only = [s.strip() for s in arg.split(",") if s.strip()]
+        elif opt == "--repeat":
+            repeat = int(arg)
+        elif opt == "--save":
+            save = arg
+        elif opt == "--compare":
+            compare = arg
+        elif opt == "--threshold":
+            threshold = float(arg)
+        elif opt == "--work":
+            work = arg  # keeps the synthetic files, so the next run does not generate them again
+    results = RunBenchmarks(scales, only, repeat, work)
+    report, regressions = Report(results, LoadBaseline(compare) if compare else None, threshold)
+    print(report)
+    if save:
+        SaveBaseline(results, save)
+        print("Baseline written to " + save)
+    if regressions:
+        print("%d benchmarks are more than %.2fx slower than the baseline" % (len(regressions), threshold))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,174 @@
+# -------------------------------------------------------------------------------
+# Name:        checkpoints.py
+# Purpose:     Keep the outputs of the orchestration stages so a rerun skips the stages whose inputs did not change
+#
+# Created:     10/18/2026
+# Licence:     The University of Notre Dame
+# -------------------------------------------------------------------------------
+
+'''
+Every stage output is stored under a key made from the stage name and everything the stage depends on: parameters,
+arrays, and the contents of the input files (wrap a path in FileInput to hash what is in it rather than its name).
+A stage does
+
+    key = checkpoints.key("modal", FileInput(FilePath), units, elev, PGAx, ..., E, u, a)
+    found, outputs = checkpoints.load("modal", key)
+    if not found:
+        outputs = eng.InitHazardModule(...)
+        checkpoints.save("modal", key, outputs)
+
+so changing the building, a wall property or the hazard curves gives a new key and the stage runs again, while
+changing only what comes after it (e.g. the damage parameters) reuses it. The files are written whole and then
+renamed into place, so a run that crashes leaves only complete checkpoints behind: running main() again resumes
+after the last stage that finished.
+
+MATLAB arrays are stored as NumPy arrays and turned back into matlab.double (backend.double) when they are loaded.
+Stages named in `invalidate` are run again (and their checkpoints replaced) even if a checkpoint exists.
+'''
+
+# #!/usr/bin/python
+import os
+import pickle
+import hashlib
+import numpy as np
+
+
+class FileInput():
+    """A file or folder whose contents (not just its name) are part of a checkpoint key"""
+
+    def __init__(self, path):
+        self.path = path
+
+
+class _MatlabArray():
+    """A matlab.double stored as a NumPy array"""
+
+    def __init__(self, values):
+        self.values = values
+
+
+def _is_matlab(value):
+    return type(value).__module__.split(".")[0] == "matlab"
+
+
+def _update(h, value):
+    if isinstance(value, FileInput):
+        path = value.path
+        if os.path.isdir(path):
+            h.update(b"dir")
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    full = os.path.join(root, name)
+                    h.update(os.path.relpath(full, path).encode("utf-8"))
+                    _update_file(h, full)
+        elif os.path.isfile(path):
+            h.update(b"file")
+            _update_file(h, path)
+        else:
+            h.update(("missing:" + str(path)).encode("utf-8"))
+    elif _is_matlab(value) or isinstance(value, np.ndarray):
+        array = np.ascontiguousarray(np.asarray(value))
+        h.update(("array%s%s" % (array.dtype.str, array.shape)).encode("utf-8"))
+        h.update(array.tobytes() if array.dtype != object else repr(array.tolist()).encode("utf-8"))
+    elif isinstance(value, dict):
+        h.update(b"dict%d" % len(value))
+        for k in sorted(value, key=repr):
+            _update(h, k)
+            _update(h, value[k])
+    elif isinstance(value, (list, tuple)):
+        h.update(b"list%d" % len(value))
+        for item in value:
+            _update(h, item)
+    else:
+        h.update((type(value).__name__ + ":" + repr(value)).encode("utf-8"))
+
+
+def _update_file(h, path):
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+
+
+def _encode(value):
+    if _is_matlab(value):
+        return _MatlabArray(np.array(value))
+    if isinstance(value, dict):
+        return dict((k, _encode(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return type(value)(_encode(v) for v in value)
+    return value
+
+
+def _decode(value, backend):
+    if isinstance(value, _MatlabArray):
+        return backend.double(value.values.tolist()) if backend is not None else value.values
+    if isinstance(value, dict):
+        return dict((k, _decode(v, backend)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return type(value)(_decode(v, backend) for v in value)
+    return value
+
+
+class CheckpointStore():
+    """
+    directory: where the checkpoints are kept, one folder per stage
+    invalidate: names of the stages that must run again this time
+    backend: engine backend whose double() rebuilds the MATLAB arrays (engine_pool.MatlabBackend, StubBackend)
+    """
+
+    def __init__(self, directory, invalidate=(), backend=None):
+        self.directory = directory
+        self.invalidate = set(invalidate)
+        self.backend = backend
+        self.hits = []
+        self.misses = []
+
+    def key(self, stage, *inputs):
+        h = hashlib.sha1(stage.encode("utf-8"))
+        _update(h, list(inputs))
+        return h.hexdigest()
+
+    def _path(self, stage, key):
+        return os.path.join(self.directory, stage, key + ".pkl")
+
+    def load(self, stage, key):
+        """returns: (True, outputs) when the stage has a checkpoint for this key, (False, None) otherwise"""
+        path = self._path(stage, key)
+        if stage in self.invalidate or not os.path.exists(path):
+            self.misses.append(stage)
+            return False, None
+        try:
+            with open(path, "rb") as f:
+                value = _decode(pickle.load(f), self.backend)
+        except Exception as e:
+            print("Could not read checkpoint of " + stage + ", running it again: " + str(e))
+            self.misses.append(stage)
+            return False, None
+        print("Stage " + stage + " loaded from checkpoint " + key[:12])
+        self.hits.append(stage)
+        return True, value
+
+    def save(self, stage, key, outputs):
+        path = self._path(stage, key)
+        tmp = path + ".tmp"
+        try:
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            with open(tmp, "wb") as f:
+                pickle.dump(_encode(outputs), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except Exception as e:
+            # The outputs are still good for this run, the stage will just run again next time
+            print("Could not checkpoint stage " + stage + ": " + str(e))
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def clear(self, stage=None):
+        """Deletes the checkpoints of one stage (or of every stage)"""
+        stages = [stage] if stage is not None else (os.listdir(self.directory) if os.path.isdir(self.directory) else [])
+        for name in stages:
+            folder = os.path.join(self.directory, name)
+            if os.path.isdir(folder):
+                for entry in os.listdir(folder):
+                    os.remove(os.path.join(folder, entry))
@@ -3,6 +3,8 @@
 import string,re
 import pandas as pd
 import numpy as np
+from elements import ElementTable
+from instrument import span, traced
 #volume strings to parse
 # Column element
 # "[[<Element {http://www.iai-tech.org/ifcXML/IFC2x2/FINAL}IfcColumn at 0x136b6808>, ('Concrete-Square-Column:14 x 14:528211', 'name'), ('i3438', 'id'), ([('CadID', '528211'), ('world_direction_ratios', ['6.123031769E-17', '1.']), ('depth', ['8.572916667']), ('XandYDim', ['0.08333333333', '0.08333333333']), ('profile_location', ['-3.552713679E-15', '0.']), ('reference_direction', ['1.', '0.']), ('local_direction_ratios', ['-75.50063228', '53.15938446', '10.']), ('position', ['-75.50063228', '53.15938446', '10.']), ('extrude_direction', ['0.', '0.', '1.'])], 'coors')]]" .
@@ -14,20 +16,74 @@ import numpy as np
     #volume = calcvolume(teststr)
     #print(volume)
 
+ISECTION_CSV = 'D:/Users/Karen/Documents/Revit 2016/OMS Building/Model Progression/ifcxmls/ISectionAreas.csv'
+_section_areas = {}
+
+# Section catalogue as a dict {Section: Area}, read only once per CSV file no matter how many members ask for it
+def load_section_areas(csv_path=ISECTION_CSV):
+    if csv_path not in _section_areas:
+        with span('colvol.load_section_areas'):
+            Isections = pd.read_csv(csv_path)
+            _section_areas[csv_path] = dict(zip(Isections['Section'].astype(str).str.strip(), Isections['Area'].astype(float)))
+    return _section_areas[csv_path]
+
+# Volumes of all columns and beams at once, from the {subject: [literals]} dicts of GraphData
+# (get_dim_columns, get_dim_beams or get_components). Same rules as calcvolume:
+#   W Shapes column: area * depth / 144          W Shapes beam: area * XandYDim[0] / 144   (area in in^2, ft^3)
+#   other columns:   depth * XandYDim[0] * XandYDim[1]
+#   other beams:     XandYDim[0] * XandYDim[1] * XandYDim[2]
+# Returns (table, volumes, errors): the element table, one volume per row of it (NaN when it cannot be computed),
+# and a list of dicts {"subject", "id", "name", "error"} for every element without a volume.
+@traced('colvol.calcvolumes')
+def calcvolumes(*component_dicts, **kwargs):
+    section_csv = kwargs.get('section_csv', ISECTION_CSV)
+    with span('colvol.element_table') as info:
+        table, parse_errors = ElementTable(*component_dicts)
+        info['elements'] = len(table)
+    volumes, errors = calctablevolumes(table, section_csv)
+    return table, volumes, [dict(e, id='', name='') for e in parse_errors] + errors
+
+# Volumes of the rows of an element table that has already been built (e.g. the one main keeps with the graph),
+# same rules as calcvolumes. Returns (volumes, errors).
+def calctablevolumes(table, section_csv=ISECTION_CSV):
+    errors = []
+    is_column = table['ifc_class'] == 'IfcColumn'
+    is_W = np.char.find(table['family'], 'W Shapes') >= 0
+    dims = table['XandYDim']
+    length = np.where(is_column, table['depth'], dims[:, 0])
+    area = np.where(is_column, dims[:, 0] * dims[:, 1], dims[:, 1] * dims[:, 2])
+
+    if is_W.any():
+        areas = load_section_areas(section_csv)
+        sections, inverse = np.unique(table['section'][is_W], return_inverse=True)
+        W_area = np.array([areas.get(str(name).strip(), np.nan) for name in sections])[inverse]
+        area[is_W] = W_area / 144 #in^2 --> ft^2
+        for i in np.flatnonzero(is_W)[np.isnan(W_area)]:
+            errors.append({'subject': str(table['subject'][i]), 'id': str(table['id'][i]), 'name': str(table['name'][i]),
+                           'error': 'section %s not in the section catalogue' % table['section'][i]})
+
+    volumes = length * area
+    reported = set(e['subject'] for e in errors)
+    for i in np.flatnonzero(np.isnan(volumes)):
+        if table['subject'][i] not in reported:
+            errors.append({'subject': str(table['subject'][i]), 'id': str(table['id'][i]), 'name': str(table['name'][i]),
+                           'error': 'missing depth or XandYDim'})
+    return volumes, errors
+
 # Return volume in whatever units are passed in as part of the
 # String representing value literal for the Column and Beam Entities in
 # the semantic graph object.
+@traced('colvol.calcvolume')
 def calcvolume(eStr):
     if 'W Shapes' and 'Column' in eStr:
-        Isections = pd.read_csv('D:/Users/Karen/Documents/Revit 2016/OMS Building/Model Progression/ifcxmls/ISectionAreas.csv')
+        Isections = load_section_areas()
         splitstr = eStr.split('(')
         for i in splitstr:
             if 'W Shapes' in i:
                 Wname = i.split(':')[1]
                 print(Wname)
                 #Find the matching name for W shape in CSV file:
-                CSV_NAME=Isections.index[Isections['Section']== Wname].tolist()
-                thisarea = Isections.Area[float(CSV_NAME[0])] #this is in in^2 for now
+                thisarea = Isections[Wname] #this is in in^2 for now
             if 'depth' in i:
                 thisdepth = i.split("'")[3]
         try:
@@ -43,15 +99,14 @@ def calcvolume(eStr):
         volume=fdepth*farea/144 #volume in ft^3
 
     if 'W Shapes' and 'Beam' in eStr:
-        Isections = pd.read_csv('D:/Users/Karen/Documents/Revit 2016/OMS Building/Model Progression/ifcxmls/ISectionAreas.csv')
+        Isections = load_section_areas()
         splitstr = eStr.split('(')
         for i in splitstr:
             if 'W Shapes' in i:
                 Wname = i.split(':')[1]
                 print(Wname)
                 #Find the matching name for W shape in CSV file:
-                CSV_NAME=Isections.index[Isections['Section']== Wname].tolist()
-                thisarea = Isections.Area[float(CSV_NAME[0])] #this is in in^2 for now
+                thisarea = Isections[Wname] #this is in in^2 for now
             if 'XandYDim' in i:
                 thisdepth = i.split("'")[3]
         try:
@@ -0,0 +1,84 @@
+# -------------------------------------------------------------------------------
+# Name:        curve_figures.py
+# Purpose:     Export the hazard curve figures outside of the spline fitting
+#
+# Created:     10/18/2026
+# Licence:     The University of Notre Dame
+# -------------------------------------------------------------------------------
+
+'''
+InferSpline used to draw and save every curve itself, on the shared pyplot figure and on the main thread.
+Now the fitting only hands the data to plot to a FigureExporter:
+
+    exporter = FigureExporter(directory="figures", dpi=500, fmt="png", sites=["Chicago IL"])
+    city_splines = Curves().querycurves(hazard_data, savefigs=exporter)
+    ...
+    exporter.close()  # waits for the figures that are still being written
+
+Each curve is drawn on its own Figure with the non-interactive Agg canvas, in a pool of worker processes.
+'''
+
+# #!/usr/bin/python
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+
+def RenderCurveFigure(cityname, modelname, x, y, x_lin, y_lin, directory, dpi, fmt):
+    """Draws the USGS points and the fitted curve of one city and model on a fresh figure; returns the file path"""
+    from matplotlib.figure import Figure  # a bare Figure is drawn with Agg and never touches the pyplot state
+    fig = Figure()
+    ax = fig.add_subplot(111)
+    ax.plot(x, y, 'kx')
+    ax.plot(x_lin, y_lin, 'b-')
+    ax.set_title(cityname + "\n" + modelname)
+    ax.set_xscale("log")
+    ax.set_yscale("log")
+    path = os.path.join(directory, cityname + modelname + "." + fmt)
+    fig.savefig(path, dpi=dpi, format=fmt)
+    return path
+
+
+class FigureExporter():
+    """
+    Renders hazard curve figures in a process pool
+    directory: folder the figures are saved into
+    dpi, fmt: resolution and file format handed to savefig
+    sites: only these cities are rendered, None renders every curve that is submitted
+    processes: size of the pool, None uses one process per CPU
+    """
+
+    def __init__(self, directory="figures", dpi=500, fmt="png", sites=None, processes=None):
+        self.directory = directory
+        self.dpi = dpi
+        self.fmt = fmt
+        self.sites = None if sites is None else set(sites)
+        self.processes = processes
+        self.pool = None
+        self.jobs = []
+
+    def wants(self, cityname):
+        return self.sites is None or cityname in self.sites
+
+    def submit(self, cityname, modelname, x, y, x_lin, y_lin):
+        """Queues one figure, returns immediately"""
+        if not self.wants(cityname):
+            return
+        if self.pool is None:
+            if not os.path.isdir(self.directory):
+                os.makedirs(self.directory)
+            self.pool = ProcessPoolExecutor(max_workers=self.processes)
+        self.jobs.append(self.pool.submit(RenderCurveFigure, cityname, modelname, x, y, x_lin, y_lin,
+                                          self.directory, self.dpi, self.fmt))
+
+    def wait(self):
+        """Blocks until every queued figure is written; returns the paths of the saved figures"""
+        paths = [job.result() for job in self.jobs]
+        self.jobs = []
+        return paths
+
+    def close(self):
+        paths = self.wait()
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+        return paths
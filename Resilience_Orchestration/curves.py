@@ -13,8 +13,11 @@
 # #!/usr/bin/python
 import os
 import numpy as np
-import matplotlib.pyplot as plt
 from scipy.interpolate import UnivariateSpline
+from curve_figures import FigureExporter
+from hazard_curve import HazardCurve
+from spline_cache import SplineKey
+from instrument import span
 
 def ImputeZeros(_x, _y):
     """Returns modified in-place versions _x & _y where the value of zero is slightly shifted by DELTA"""
@@ -32,9 +35,11 @@ def ImputeZeros(_x, _y):
     return tuple(_x), tuple(_y) #re-cast the modified lists as tuples befoire returning
 
 # import multipolyfit as mpf
-def InferSpline(x,y,cityname,modelname,savefigures,degree=3,GRANULARITY=500):
-    x_lin = np.linspace(min(x),max(x),GRANULARITY)
-
+def InferSpline(x,y,cityname,modelname,exporter=None,degree=3,GRANULARITY=500):
+    """
+    Fits the log-log spline of one hazard curve
+    exporter: FigureExporter the points and the fitted curve are handed to for plotting, None for no figure
+    """
     # make sure you don't have any zeroes around, or else you'll get an -Inf.
     # I don't know what that does to splines, all I know is that it can't be good
     #print "X = ", x
@@ -44,39 +49,143 @@ def InferSpline(x,y,cityname,modelname,savefigures,degree=3,GRANULARITY=500):
 
     x_clean,y_clean = ImputeZeros(x,y)
     spl = UnivariateSpline(np.log(x_clean),np.log(y_clean),k=degree)
-    y_lin = np.exp(spl(np.log(x_lin)))
-
-    if savefigures:
-        plt.plot(x, y, 'kx')
-        plt.plot(x_lin, y_lin, 'b-')
-        plt.title(cityname + "\n" + modelname)
-        plt.xscale("log")
-        plt.yscale("log")
-        plt.savefig(os.path.join("figures",cityname + modelname + ".png"),dpi=500)
+    ExportCurve(x,y,spl,cityname,modelname,exporter,GRANULARITY)
     return spl
 
+def InferCurve(x,y,cityname,modelname,exporter=None,GRANULARITY=500):
+    """
+    Monotone log-log PCHIP curve of one hazard curve (see hazard_curve.py), no zeros to impute and no smoothing
+    exporter: FigureExporter the points and the curve are handed to for plotting, None for no figure
+    """
+    curve = HazardCurve(x,y)
+    ExportCurve(x,y,curve,cityname,modelname,exporter,GRANULARITY)
+    return curve
+
+def ExportCurve(x,y,spl,cityname,modelname,exporter,GRANULARITY=500):
+    """Hands the points and the fitted curve to the exporter, if there is one and it wants this city"""
+    if exporter is not None and exporter.wants(cityname):
+        # Only the data to plot is handed off, drawing and saving happen in the exporter's worker processes
+        x_lin = np.linspace(min(x),max(x),GRANULARITY)
+        with np.errstate(divide="ignore"): #an intensity of 0 is log(0) = -inf
+            y_lin = np.exp(spl(np.log(x_lin)))
+        exporter.submit(cityname, modelname, np.asarray(x), np.asarray(y), x_lin, y_lin)
+
+
+
+
+class CityCurves():
+    """The {model: spline} entry of a single city in a CurveSet, splines are fitted when they are first accessed"""
+
+    def __init__(self, curveset, city):
+        self.curveset = curveset
+        self.city = city
+
+    def __getitem__(self, model):
+        return self.curveset.spline(self.city, model)
+
+    def __contains__(self, model):
+        return model in self.curveset.data[self.city]
+
+    def __iter__(self):
+        return iter(self.curveset.data[self.city])
+
+    def keys(self):
+        return list(self.curveset.data[self.city])
+
 
+class CurveSet():
+    """
+    Lazy {city_name: {model: curve}} mapping
+    method: "pchip" gives HazardCurve objects (monotone, with rate() and sa() for arrays of points),
+            "spline" the smoothing log-log UnivariateSpline of InferSpline; both answer curve(np.log(Sa)) = log rate
+    A spline is only fitted the first time city_splines[city][model] is asked for and is kept for later lookups,
+    so a run that only needs one site pays for one site instead of the whole curve set.
+    self.fits counts how many splines were actually fitted.
+    With a SplineCache, splines fitted by earlier runs on the same data are loaded instead of refitted.
+    """
+
+    def __init__(self, citydatanesteddict, savefigs=False, degree=3, GRANULARITY=500, cache=None, method="pchip"):
+        self.data = citydatanesteddict
+        if savefigs is True:
+            savefigs = FigureExporter()
+        self.exporter = savefigs or None  # FigureExporter, or None when no figures are wanted
+        self.degree = degree
+        self.GRANULARITY = GRANULARITY
+        self.cache = cache  # SplineCache or None
+        self.method = method
+        self.splines = {}  # {(city, model): spline}
+        self.fits = 0
+
+    def spline(self, city, model):
+        key = (city, model)
+        if key not in self.splines:
+            with span("curves.spline", city=city, model=model) as info:
+                hazard_x, hazard_y = self.data[city][model]
+                cached = None
+                if self.cache is not None:
+                    cache_key = SplineKey(hazard_x, hazard_y, self.degree, self.GRANULARITY, self.method)
+                    cached = self.cache.get(cache_key)
+                info["cached"] = cached is not None
+                if cached is not None:
+                    ExportCurve(hazard_x, hazard_y, cached, city, model, self.exporter, self.GRANULARITY)
+                    self.splines[key] = cached
+                else:
+                    self.splines[key] = self.fit(hazard_x, hazard_y, city, model)
+                    self.fits += 1
+                    if self.cache is not None:
+                        self.cache.put(cache_key, self.splines[key])
+        return self.splines[key]
+
+    def fit(self, hazard_x, hazard_y, city, model):
+        """Fits one curve with the fitter of self.method, handing it to the exporter"""
+        if self.method == "pchip":
+            return InferCurve(hazard_x, hazard_y, cityname=city, modelname=model, exporter=self.exporter,
+                              GRANULARITY=self.GRANULARITY)
+        return InferSpline(hazard_x, hazard_y, cityname=city, modelname=model, exporter=self.exporter,
+                           degree=self.degree, GRANULARITY=self.GRANULARITY)
+
+    def prefetch(self, cities, models=None):
+        """
+        Fits every (city, model) in one batch ahead of time instead of on first access
+        models: None means every model available for the city
+        returns: number of splines that had to be fitted
+        """
+        before = self.fits
+        for _city in cities:
+            for _model in (self.data[_city] if models is None else models):
+                self.spline(_city, _model)
+        return self.fits - before
+
+    def __getitem__(self, city):
+        if city not in self.data:
+            raise KeyError(city)
+        return CityCurves(self, city)
+
+    def __contains__(self, city):
+        return city in self.data
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __len__(self):
+        return len(self.data)
+
+    def keys(self):
+        return list(self.data)
 
 
 class Curves():
     # Input parameters
 
-    def querycurves(self,citydatanesteddict,savefigs):
+    def querycurves(self,citydatanesteddict,savefigs,cache=None,method="pchip"):
         """
-        Builds an interpolated spline for each model for each city
+        Builds an interpolated curve for each model for each city
         citydatanesteddict: looks like this {city_name: {model: (X,Y) }}
-        savefigs: Boolean. Saves figures into a common directory for now if 'True'
-
-        returns: {city_name: {model: spline}}
+        savefigs: Boolean or FigureExporter. Saves figures into a common directory for now if 'True'
+                  (figures are written in the background, call close() on city_splines.exporter to wait for them)
+        cache: SplineCache to load previously fitted curves from (and store new ones in), None to always fit
+        method: "pchip" for monotone, invertible HazardCurve objects, "spline" for the old smoothing UnivariateSpline
 
-        In a future version, something more advanced / modular than splines can be swapped out and vars can be renamed
+        returns: CurveSet, used like {city_name: {model: curve}}; curves are fitted the first time they are looked up
         """
-        model_splines = {}
-        for _city in citydatanesteddict:
-            model_splines[_city] = {}
-            for _model in citydatanesteddict[_city]:
-                hazardcurve_coarse = citydatanesteddict[_city][_model]
-                hazard_x, hazard_y = zip(*hazardcurve_coarse)
-                hazard_spl = InferSpline(hazard_x,hazard_y,cityname=_city, modelname=_model, savefigures=savefigs)
-                model_splines[_city][_model] = hazard_spl
-        return model_splines
+        return CurveSet(citydatanesteddict, savefigs=savefigs, cache=cache, method=method)
@@ -0,0 +1,191 @@
+# -------------------------------------------------------------------------------
+# Name:        elements.py
+# Purpose:     Columnar table of the structural elements (columns, beams) from the semantic graph literals
+#
+# Created:     10/18/2026
+# Licence:     The University of Notre Dame
+# -------------------------------------------------------------------------------
+
+'''
+get_dim_columns / get_dim_beams give back every element as the repr of a Python list (see the examples in colvol.py):
+
+"[[<Element {...}IfcBeam at 0x42d66c8>, ('W Shapes:W14X22:587548', 'name'), ('i1963', 'id'), ([('CadID', ['587548']),
+  ('position', ['-76.04229895', '62.6177178', '0.']), ..., ('XandYDim', ['18.85833333', '0.4166666667', '1.141666667'])],
+  'coors')]]"
+
+ElementTable parses all of those literals once into a NumPy structured array with one row per element:
+
+    subject, ifc_class, id, CadID, name, family, section   --> strings ('W Shapes', 'W14X22', ...)
+    position, local_direction_ratios, reference_direction, extrude_direction, XandYDim   --> 3 floats each
+    world_direction_ratios   --> 2 floats
+    depth   --> float
+
+Missing or 'None' values are NaN, so volumes, elevations and masses can be computed on the whole table at once.
+'''
+
+# #!/usr/bin/python
+import re
+import ast
+import numpy as np
+
+VECTOR_FIELDS = [("position", 3), ("local_direction_ratios", 3), ("reference_direction", 3),
+                 ("extrude_direction", 3), ("XandYDim", 3), ("world_direction_ratios", 2)]
+STRING_FIELDS = ["subject", "ifc_class", "id", "CadID", "name", "family", "section"]
+
+_ELEMENT = re.compile(r"<Element \{[^}]*\}(\w+) at 0x[0-9a-fA-F]+>")
+# (value, 'name') or (value, 'id') right after the element, the value is a string repr in either quote style
+_TAGGED = re.compile(r",\s*\(\s*('[^'\\]*(?:\\.[^'\\]*)*'|\"[^\"\\]*(?:\\.[^\"\\]*)*\")\s*,\s*'(name|id)'\s*\)")
+
+
+def _unquote(token):
+    """'587548' or "O'Brien" --> the string the repr stands for, None for None, number text as it is"""
+    token = token.strip()
+    if token == "None":
+        return None
+    if token[:1] in ("'", '"'):
+        return ast.literal_eval(token) if "\\" in token else token[1:-1]  # only escaped strings need the parser
+    return token
+
+
+def _floats(values, n):
+    """"['1.', 'None']" --> [1.0, nan, nan] padded to n entries"""
+    out = [np.nan] * n
+    if values is None:
+        return out
+    if values[:1] == "[":
+        values = values[1:-1]
+    for i, token in enumerate(values.split(",", n)[:n]):
+        try:
+            out[i] = float(token.strip(" '\""))
+        except ValueError:
+            pass
+    return out
+
+
+def ParseElementLiteral(literal):
+    """
+    returns: dict with the fields of one element
+    raises: ValueError when the literal is not an element repr
+
+    The literals are the repr of the same nested list every time, so the fields are cut out of the string with
+    str.split at the separators of that layout instead of evaluating the whole string as Python, and only the
+    values that are used are converted. It gives what ParseElementLiteralReference() gives, several times faster.
+    """
+    text = str(literal)
+    header = _ELEMENT.search(text)
+    element = {"ifc_class": header.group(1) if header else "", "name": "", "id": ""}
+    position = header.end() if header else 0
+    match = _TAGGED.match(text, position)
+    while match:
+        element[match.group(2)] = str(_unquote(match.group(1)))
+        position = match.end()
+        match = _TAGGED.match(text, position)
+
+    # ([('CadID', ['587548']), ('position', ['-76.04', '62.61', '0.']), ...], 'coors') --> {key: value text}
+    coors = {}
+    start = text.find("[(", position)
+    end = text.rfind("], 'coors')", start) - 1  # the ")" of the last pair
+    if start >= 0 and end > start:
+        for item in text[start + 2:end].split("), ("):
+            key, _, value = item.partition(",")
+            coors[key.strip(" '\"")] = value.strip()
+    if header is None and not coors and not element["name"]:
+        raise ValueError("cannot parse element literal: " + text[:80])
+
+    # 'W Shapes:W14X22:587548' --> family, section (the last part is the CadID again)
+    parts = element["name"].split(":")
+    element["family"] = parts[0]
+    element["section"] = parts[1] if len(parts) > 1 else ""
+    cad_id = coors.get("CadID")
+    if cad_id is None:
+        element["CadID"] = parts[-1] if len(parts) > 2 else ""
+    else:
+        cad_id = cad_id[1:-1].split(",")[0] if cad_id[:1] == "[" else cad_id
+        element["CadID"] = str(_unquote(cad_id) or "") if cad_id.strip() else ""
+    for field, n in VECTOR_FIELDS:
+        element[field] = _floats(coors.get(field), n)
+    element["depth"] = _floats(coors.get("depth"), 1)[0]
+    return element
+
+
+def ParseElementLiteralReference(literal):
+    """
+    ParseElementLiteral by evaluating the whole literal with ast.literal_eval, the way it was first written: slower,
+    but it reads any valid Python repr, so it is what the split parser is checked against
+    """
+    text = _ELEMENT.sub(lambda m: repr(m.group(1)), str(literal))
+    try:
+        parsed = ast.literal_eval(text)
+    except (SyntaxError, ValueError) as e:
+        raise ValueError("cannot parse element literal: " + str(e))
+    while isinstance(parsed, list) and len(parsed) == 1 and isinstance(parsed[0], list):
+        parsed = parsed[0]
+    if not isinstance(parsed, list) or not parsed:
+        raise ValueError("element literal is not a list")
+
+    element = {"ifc_class": parsed[0] if isinstance(parsed[0], str) else "", "name": "", "id": ""}
+    coors = {}
+    for item in parsed[1:]:
+        if isinstance(item, tuple) and len(item) == 2:
+            if item[1] == "coors":
+                coors = dict(pair for pair in item[0] if isinstance(pair, tuple) and len(pair) == 2)
+            elif item[1] in ("name", "id"):
+                element[item[1]] = str(item[0])
+    if not element["ifc_class"] and not coors and not element["name"]:
+        raise ValueError("cannot parse element literal: " + str(literal)[:80])
+
+    parts = element["name"].split(":")
+    element["family"] = parts[0]
+    element["section"] = parts[1] if len(parts) > 1 else ""
+    cad_id = coors.get("CadID", parts[-1] if len(parts) > 2 else "")
+    element["CadID"] = str(cad_id[0] if isinstance(cad_id, list) and cad_id else cad_id or "")
+
+    def floats(values, n):
+        values = values if isinstance(values, (list, tuple)) else [values]
+        out = [np.nan] * n
+        for i, v in enumerate(values[:n]):
+            try:
+                out[i] = float(v)
+            except (TypeError, ValueError):
+                pass
+        return out
+
+    for field, n in VECTOR_FIELDS:
+        element[field] = floats(coors.get(field, []), n)
+    element["depth"] = floats(coors.get("depth", []), 1)[0]
+    return element
+
+
+def ElementDtype(width=64):
+    return np.dtype([(f, "U%d" % width) for f in STRING_FIELDS] +
+                    [(f, np.float64, (n,)) for f, n in VECTOR_FIELDS] +
+                    [("depth", np.float64)])
+
+
+def ElementTable(*component_dicts):
+    """
+    component_dicts: {subject: [literals]} dicts from GraphData (get_dim_columns, get_dim_beams, get_components)
+    returns: (table, errors); table is the structured array, errors is a list of {"subject": ..., "error": ...}
+             for literals that could not be parsed
+    """
+    rows = []
+    errors = []
+    for components in component_dicts:
+        for subject in components:
+            for literal in components[subject]:
+                try:
+                    element = ParseElementLiteral(literal)
+                except ValueError as e:
+                    errors.append({"subject": str(subject), "error": str(e)})
+                    continue
+                element["subject"] = str(subject)
+                rows.append(element)
+
+    width = max([1] + [len(r[f]) for r in rows for f in STRING_FIELDS])
+    table = np.zeros(len(rows), dtype=ElementDtype(width))
+    for f in STRING_FIELDS:
+        table[f] = [r[f] for r in rows]
+    for f, n in VECTOR_FIELDS:
+        table[f] = np.array([r[f] for r in rows], dtype=np.float64).reshape(len(rows), n)
+    table["depth"] = [r["depth"] for r in rows]
+    return table, errors
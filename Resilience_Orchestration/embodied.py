@@ -0,0 +1,161 @@
+# -------------------------------------------------------------------------------
+# Name:        embodied.py
+# Purpose:     Embodied energy and carbon of the structural members, per member, level and building, for many
+#              material scenarios at once
+#
+# Created:     10/18/2026
+# Licence:     The University of Notre Dame
+# -------------------------------------------------------------------------------
+
+'''
+The member volumes of colvol.calcvolumes are joined to a material database, indexed by material name:
+
+    MATERIALS.loc["Concrete 4000 psi"]    --> category, density (kg/m^3), energy (MJ/kg), carbon (kgCO2e/kg)
+
+A scenario picks a material for every member category, "concrete" or "steel" (W Shapes and other steel families),
+optionally per IFC class with keys like "concrete.IfcColumn":
+
+    result = EmbodiedImpacts(table, volumes, SCENARIOS, levels=graph["components"]["levels"])
+    result["energy"][scenario, member]          # MJ
+    result["level_carbon"][scenario, level]     # kgCO2e of the members of each storey
+    result["total_energy"][scenario]            # MJ of the whole structure
+    ImpactTable(result, "carbon")               # DataFrame, one row per level and one column per scenario
+
+The materials are looked up once per (category, IFC class) group and scenario, not per member: every member gets
+the factors of its group by one fancy index, so all scenarios x members are one array operation. The totals do not
+even need that: the volumes are summed per (group, level) once, and the level and building totals of every scenario
+are one (scenarios x groups) . (groups x levels) product, whatever the number of members. A member belongs to the storey
+whose elevation is the highest one at or below its position (beams just under a floor belong to the storey below
+it); members without a position are summed under "unassigned". Members without a volume (see the errors of
+calcvolumes) count as 0 in the totals and are NaN per member.
+
+The default values are typical cradle-to-gate figures of the ICE database (v3) for generic materials, only meant to
+compare scenarios; ReadMaterials() reads a project database with the same columns (name, category, density, energy,
+carbon) from a CSV. Reinforcement steel in the concrete members is not included.
+'''
+
+# #!/usr/bin/python
+import numpy as np
+import pandas as pd
+
+FT3_TO_M3 = 0.028316846592
+MATERIALS = pd.DataFrame(
+    [("Concrete 3000 psi", "concrete", 2400., 0.74, 0.112),  # ~C20/25
+     ("Concrete 4000 psi", "concrete", 2400., 0.81, 0.126),  # ~C28/35
+     ("Concrete 5000 psi", "concrete", 2400., 0.88, 0.138),  # ~C32/40
+     ("Concrete 6000 psi", "concrete", 2400., 1.00, 0.159),  # ~C40/50
+     ("Concrete 4000 psi, 30% GGBS", "concrete", 2400., 0.64, 0.094),
+     ("Concrete 4000 psi, 50% GGBS", "concrete", 2400., 0.55, 0.074),
+     ("Steel section, world average", "steel", 7850., 21.5, 1.55),
+     ("Steel section, recycled (EAF)", "steel", 7850., 11.0, 0.70),
+     ("Steel section, virgin (BOF)", "steel", 7850., 35.0, 2.45)],
+    columns=["name", "category", "density", "energy", "carbon"]).set_index("name")
+SCENARIOS = [
+    {"name": "baseline", "concrete": "Concrete 4000 psi", "steel": "Steel section, world average"},
+    {"name": "low-carbon concrete", "concrete": "Concrete 4000 psi, 50% GGBS", "steel": "Steel section, world average"},
+    {"name": "recycled steel", "concrete": "Concrete 4000 psi", "steel": "Steel section, recycled (EAF)"},
+    {"name": "high-strength columns", "concrete": "Concrete 4000 psi", "concrete.IfcColumn": "Concrete 6000 psi",
+     "steel": "Steel section, world average"},
+]
+STEEL_FAMILIES = ("w shapes", "steel", "hss", "pipe")
+
+
+def ReadMaterials(path):
+    """Material database CSV with the columns name, category, density (kg/m^3), energy (MJ/kg), carbon (kgCO2e/kg)"""
+    df = pd.read_csv(path)
+    df["name"] = df["name"].astype(str).str.strip()
+    return df.set_index("name")[["category", "density", "energy", "carbon"]]
+
+
+def MemberCategories(table):
+    """"steel" or "concrete" for every row of an element table, from its family ('W Shapes', 'Concrete-...')"""
+    family = np.char.lower(np.asarray(table["family"], dtype=str))
+    steel = np.zeros(len(family), dtype=bool)
+    for name in STEEL_FAMILIES:
+        steel |= np.char.find(family, name) >= 0
+    return np.where(steel, "steel", "concrete")
+
+
+def LevelElevations(levels):
+    """
+    levels: {storey: [Literal(Name), Literal(Elevation)]} of GraphData / ReadIfcStructure
+    returns: (names, elevations) sorted by elevation, in the units of the model
+    """
+    found = []
+    for storey in levels:
+        elevation, name = None, None
+        for value in levels[storey]:
+            try:
+                elevation = float(value)
+            except ValueError:
+                name = name or str(value)
+        if elevation is not None:
+            found.append((elevation, name or str(storey)))
+    found.sort()
+    return [name for _, name in found], np.array([e for e, _ in found], dtype=np.float64)
+
+
+def _materials_per_group(groups, scenarios, materials):
+    """(n_scenarios, n_groups) row of the material database every group of members gets in every scenario"""
+    choice = np.empty((len(scenarios), len(groups)), dtype=np.intp)
+    for s, scenario in enumerate(scenarios):
+        for j, group in enumerate(groups):
+            name = scenario.get(group, scenario.get(group.split(".")[0]))
+            if name not in materials.index:
+                raise ValueError("scenario %s: no material %r in the database for %s" % (scenario.get("name", s), name, group))
+            choice[s, j] = materials.index.get_loc(name)
+    return choice
+
+
+def EmbodiedImpacts(table, volumes, scenarios=SCENARIOS, materials=MATERIALS, levels=None, per_member=True):
+    """
+    table, volumes: element table and member volumes in ft^3 (colvol.calcvolumes or calctablevolumes)
+    scenarios: [{"name": ..., "concrete": material, "steel": material, "concrete.IfcColumn": material, ...}]
+    materials: DataFrame indexed by material name with density, energy and carbon (MATERIALS, ReadMaterials())
+    levels: the levels dict of the graph components, None for building totals only
+    per_member: False leaves out the (n_scenarios, n_members) arrays, the totals do not need them
+
+    returns: dict with "scenarios" and "levels" (names), "group" (member group names), "mass" (kg), "energy" (MJ) and
+             "carbon" (kgCO2e) (n_scenarios, n_members), "level_energy" and "level_carbon" (n_scenarios, n_levels), "total_mass",
+             "total_energy" and "total_carbon" (n_scenarios,), and "missing", the number of members without a volume
+    """
+    volumes = np.asarray(volumes, dtype=np.float64) * FT3_TO_M3
+    labels = np.char.add(np.char.add(MemberCategories(table), "."), np.asarray(table["ifc_class"], dtype=str))
+    groups, group = np.unique(labels, return_inverse=True)
+    choice = _materials_per_group([str(g) for g in groups], scenarios, materials)
+    mass_factor = materials["density"].values[choice]  # (n_scenarios, n_groups) kg per m^3
+    factors = {"mass": mass_factor, "energy": mass_factor * materials["energy"].values[choice],
+               "carbon": mass_factor * materials["carbon"].values[choice]}
+
+    level_names = []
+    level = np.zeros(len(volumes), dtype=np.intp)
+    if levels is not None:
+        level_names, elevations = LevelElevations(levels)
+        z = table["position"][:, 2]
+        level = np.clip(np.searchsorted(elevations, z + 1e-6, side="right") - 1, 0, max(len(elevations) - 1, 0))
+        level = np.where(np.isnan(z) | (len(elevations) == 0), len(level_names), level)
+        if (level == len(level_names)).any():
+            level_names = level_names + ["unassigned"]
+    # Volume of every (group, level), so the totals of all scenarios are one small matrix product
+    n_levels = max(len(level_names), 1)
+    group_volumes = np.bincount(group * n_levels + level, weights=np.nan_to_num(volumes),
+                                minlength=len(groups) * n_levels).reshape(len(groups), n_levels)
+
+    result = {"scenarios": [sc.get("name", str(s)) for s, sc in enumerate(scenarios)], "levels": level_names,
+              "group": groups[group], "missing": int(np.isnan(volumes).sum())}
+    for name, factor in factors.items():
+        if per_member:
+            result[name] = factor[:, group] * volumes  # (n_scenarios, n_members), one fancy index
+        totals = factor.dot(group_volumes)  # (n_scenarios, n_levels)
+        if name != "mass":
+            result["level_" + name] = totals[:, :len(level_names)]
+        result["total_" + name] = totals.sum(axis=1)
+    return result
+
+
+def ImpactTable(result, quantity="carbon"):
+    """One row per level plus the building total, one column per scenario ("energy": MJ, "carbon": kgCO2e)"""
+    table = pd.DataFrame(result["level_" + quantity].T, index=result["levels"], columns=result["scenarios"])
+    table.loc["building"] = result["total_" + quantity]
+    table.index.name = "level"
+    return table
@@ -0,0 +1,218 @@
+# -------------------------------------------------------------------------------
+# Name:        engine_pool.py
+# Purpose:     Keep MATLAB engines warm and share them between the hazard and response modules
+#
+# Created:     10/18/2026
+# Licence:     The University of Notre Dame
+# -------------------------------------------------------------------------------
+
+'''
+Starting a MATLAB engine takes tens of seconds, so the EnginePool starts them in the background as soon as main()
+knows where the m-files are, while the hazard curves and the semantic graph are being built. A module then borrows
+a warm engine for as long as it needs it:
+
+    engines = EnginePool(matlab_dir).start()       # returns right away
+    ...
+    with engines.engine() as eng:                   # waits only if the engine is not up yet
+        outputs = eng.InitHazardModule(..., nargout=18)
+    engines.shutdown()                              # quits every engine it started
+
+SharedEnginePool gives back the same pool for the same folder every time it is called, so running main() in batch
+mode (several buildings or sites from one Python process) only pays for the engines once; the shared pools are shut
+down when Python exits.
+
+The backend decides what an engine is. MatlabBackend uses the MATLAB Engine API for Python; StubBackend hands out
+StubEngines that answer eng.Name(*args, nargout=n) with a Python function registered under Name, so the orchestration
+can be run and timed on machines without MATLAB. backend.double converts a list to what the engine expects
+(matlab.double, or a 2D NumPy array for the stub).
+'''
+
+# #!/usr/bin/python
+import time
+import queue
+import atexit
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from instrument import span
+
+
+class MatlabBackend():
+    """Engines from the MATLAB Engine API for Python"""
+    name = "matlab"
+
+    def __init__(self):
+        import matlab.engine
+        self.matlab = matlab
+
+    def start(self):
+        return self.matlab.engine.start_matlab()
+
+    def double(self, values):
+        return self.matlab.double(values)
+
+
+class StubEngine():
+    """Stands in for a MATLAB engine: eng.Name(*args, nargout=n) calls functions[Name](*args, nargout=n)"""
+
+    def __init__(self, functions):
+        self.functions = functions
+        self.cwd = None
+        self.calls = []
+        self.running = True
+
+    def cd(self, path, nargout=0):
+        self.cwd = path
+
+    def quit(self):
+        self.running = False
+
+    def __getattr__(self, name):
+        if name.startswith("_") or name not in self.functions:
+            raise AttributeError("stub engine has no function " + name)
+
+        def call(*args, **kwargs):
+            self.calls.append(name)
+            return self.functions[name](*args, nargout=kwargs.get("nargout", 1))
+        return call
+
+
+class StubBackend():
+    """
+    functions: {m-file name: Python function}, e.g. {"InitHazardModule": lambda *args, **kw: outputs}
+    start_delay: seconds each engine takes to start, to mimic MATLAB when benchmarking
+    """
+    name = "stub"
+
+    def __init__(self, functions=None, start_delay=0.):
+        self.functions = dict(functions or {})
+        self.start_delay = start_delay
+        self.started = 0
+
+    def start(self):
+        if self.start_delay:
+            time.sleep(self.start_delay)
+        self.started += 1
+        return StubEngine(self.functions)
+
+    def double(self, values):
+        return np.array(values, dtype=np.float64, ndmin=2)
+
+
+class EnginePool():
+    """
+    matlab_dir: folder with the m-files, every engine is cd'ed there once when it starts
+    size: number of engines (one per module that runs at the same time)
+    backend: MatlabBackend() unless told otherwise
+    """
+
+    def __init__(self, matlab_dir, size=1, backend=None):
+        self.matlab_dir = matlab_dir
+        self.size = size
+        self.backend = backend if backend is not None else MatlabBackend()
+        self.idle = queue.Queue()
+        self.starting = []
+        self.executor = None
+        self.lock = threading.Lock()
+        self.closed = False
+
+    def start(self, size=None):
+        """Starts engines in the background until there are `size` of them; returns the pool right away"""
+        with self.lock:
+            if self.closed:
+                raise RuntimeError("the engine pool has been shut down")
+            self.size = max(self.size, size or 0)
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=4)
+            while len(self.starting) < self.size:
+                future = self.executor.submit(self._start_engine)
+                future.add_done_callback(self._engine_ready)
+                self.starting.append(future)
+        return self
+
+    def _start_engine(self):
+        with span("matlab.start", backend=self.backend.name):
+            eng = self.backend.start()
+            eng.cd(self.matlab_dir, nargout=0)
+        return eng
+
+    def _engine_ready(self, future):
+        if future.exception() is None:
+            self.idle.put(future.result())
+
+    def acquire(self, timeout=None):
+        """A warm engine, nobody else gets it until it is released; raises the startup error if no engine came up"""
+        self.start()
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            try:
+                return self.idle.get(timeout=0.5)
+            except queue.Empty:
+                pass
+            failed = [f for f in self.starting if f.done() and f.exception() is not None]
+            if failed and len(failed) == len(self.starting):
+                raise failed[0].exception()
+            if deadline is not None and time.time() > deadline:
+                raise RuntimeError("no MATLAB engine became available in %s s" % timeout)
+
+    def release(self, eng):
+        if not self.closed:  # after shutdown() the engine has already been quit
+            self.idle.put(eng)
+
+    @contextmanager
+    def engine(self, timeout=None):
+        eng = self.acquire(timeout)
+        try:
+            yield eng
+        finally:
+            self.release(eng)
+
+    def shutdown(self):
+        """Waits for the engines that are still starting and quits all of them"""
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+            starting, self.starting = self.starting, []
+        for future in starting:
+            if future.exception() is not None:
+                continue
+            try:
+                future.result().quit()
+            except Exception as e:
+                print("Could not quit MATLAB engine: " + str(e))
+        if self.executor is not None:
+            self.executor.shutdown()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+
+_shared_pools = {}
+_shared_lock = threading.Lock()
+
+
+def SharedEnginePool(matlab_dir, size=1, backend=None):
+    """The same started EnginePool for the same folder and backend on every call, shut down when Python exits"""
+    backend = backend if backend is not None else MatlabBackend()
+    key = (matlab_dir, backend.name)
+    with _shared_lock:
+        pool = _shared_pools.get(key)
+        if pool is None or pool.closed:
+            pool = _shared_pools[key] = EnginePool(matlab_dir, size, backend)
+    return pool.start(size)
+
+
+def ShutdownSharedPools():
+    with _shared_lock:
+        pools = list(_shared_pools.values())
+        _shared_pools.clear()
+    for pool in pools:
+        pool.shutdown()
+
+
+atexit.register(ShutdownSharedPools)
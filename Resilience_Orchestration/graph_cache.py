@@ -0,0 +1,192 @@
+# -------------------------------------------------------------------------------
+# Name:        graph_cache.py
+# Purpose:     Load the GeoLinked semantic graph (MyGraph.ttl) from a binary cache instead of re-parsing the Turtle
+#
+# Created:     10/18/2026
+# Licence:     The University of Notre Dame
+# -------------------------------------------------------------------------------
+
+'''
+The first time a .ttl file is loaded it is parsed with rdflib as before, and its triples are written next to it as
+an integer-encoded triple table plus a term dictionary:
+
+    kinds      --> 0 URIRef, 1 BNode, 2 Literal, one entry per distinct term
+    values     --> the lexical form of every term, one UTF-8 blob with int64 offsets (values_offsets)
+    datatype   --> number of the datatype URI of each literal in datatypes, -1 when there is none
+    lang       --> number of the language tag of each literal in langs, -1 when there is none
+    triples    --> (n_triples, 3) int32 array of term numbers
+
+Every list of strings is stored the same way, as its UTF-8 bytes one after the other and the offsets where each one
+starts, so the cache is about the size of the text itself instead of a fixed-width array as wide as the longest
+element literal. A string is only decoded when the term that uses it is built. The cache file is named after the
+hash of the .ttl contents, so a graph regenerated by GeoLinked is parsed again. Later runs rebuild the rdflib Graph
+straight from the table, which skips the Turtle parser; GraphData queries the returned Graph exactly as before. Run
+this file to time both ways of loading MyGraph.ttl and enlarged copies of it.
+'''
+
+# #!/usr/bin/python
+import os
+import sys
+import time
+import hashlib
+import numpy as np
+from rdflib import Graph, URIRef, BNode, Literal
+from rdflib.namespace import RDF
+from instrument import span
+
+URI, BLANK, LITERAL = 0, 1, 2
+FORMAT = 2  # part of the cache file name, so caches written in another layout are not read
+
+
+def _file_hash(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _pack(strings):
+    """returns: (blob, offsets), the UTF-8 bytes of all the strings and the (n + 1,) int64 offsets of each one"""
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(e) for e in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+class _Strings():
+    """The strings of a _pack blob, each decoded when it is asked for"""
+
+    def __init__(self, blob, offsets):
+        self.blob = np.asarray(blob, dtype=np.uint8).tobytes()
+        self.offsets = np.asarray(offsets).tolist()
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return self.blob[self.offsets[i]:self.offsets[i + 1]].decode("utf-8")
+
+
+def _numbered(values):
+    """returns: (numbers, distinct) with numbers[i] the position of values[i] in distinct, -1 for None"""
+    distinct = {}
+    numbers = np.array([-1 if v is None else distinct.setdefault(v, len(distinct)) for v in values], dtype=np.int32)
+    return numbers, sorted(distinct, key=distinct.get)
+
+
+def EncodeGraph(graph):
+    """returns: dict of arrays, the term dictionary and the integer triple table of the graph"""
+    numbers = {}
+    terms = []
+
+    def number(term):
+        if term not in numbers:
+            numbers[term] = len(terms)
+            terms.append(term)
+        return numbers[term]
+
+    triples = np.array([(number(s), number(p), number(o)) for s, p, o in graph], dtype=np.int32).reshape(-1, 3)
+    kinds = [URI if isinstance(t, URIRef) else BLANK if isinstance(t, BNode) else LITERAL for t in terms]
+    literal = lambda t: isinstance(t, Literal)
+    datatype, datatypes = _numbered([str(t.datatype) if literal(t) and t.datatype else None for t in terms])
+    lang, langs = _numbered([t.language if literal(t) and t.language else None for t in terms])
+    prefixes = list(graph.namespaces())
+    table = {"kinds": np.array(kinds, dtype=np.uint8), "datatype": datatype, "lang": lang, "triples": triples}
+    for name, strings in (("values", [str(t) for t in terms]), ("datatypes", datatypes), ("langs", langs),
+                          ("prefixes", [p for p, _ in prefixes]), ("namespaces", [str(n) for _, n in prefixes])):
+        table[name], table[name + "_offsets"] = _pack(strings)
+    return table
+
+
+def DecodeGraph(table):
+    """Rebuilds the rdflib Graph from the arrays EncodeGraph returned"""
+    strings = lambda name: _Strings(table[name], table[name + "_offsets"])
+    kinds = table["kinds"].tolist()
+    values = strings("values")
+    datatype = table["datatype"].tolist()
+    lang = table["lang"].tolist()
+    datatypes = [URIRef(d) for d in strings("datatypes")]
+    langs = list(strings("langs"))
+    terms = [None] * len(kinds)
+
+    def term(i):
+        if terms[i] is None:
+            if kinds[i] == URI:
+                terms[i] = URIRef(values[i])
+            elif kinds[i] == BLANK:
+                terms[i] = BNode(values[i])
+            else:
+                terms[i] = Literal(values[i], lang=langs[lang[i]] if lang[i] >= 0 else None,
+                                   datatype=datatypes[datatype[i]] if datatype[i] >= 0 else None)
+        return terms[i]
+
+    graph = Graph()
+    for prefix, namespace in zip(strings("prefixes"), strings("namespaces")):
+        graph.bind(prefix, namespace)
+    graph.addN((term(s), term(p), term(o), graph) for s, p, o in table["triples"].tolist())
+    return graph
+
+
+def LoadGraph(ttl_path, cache_dir=None):
+    """
+    Parses ttl_path, or rebuilds it from the binary cache when the file has not changed since it was cached
+    cache_dir: where the encoded graphs are kept, defaults to a folder next to the .ttl file
+    """
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(ttl_path)), "_graphcache")
+    cache_file = os.path.join(cache_dir, "%s.v%d.npz" % (_file_hash(ttl_path), FORMAT))
+    if os.path.exists(cache_file):
+        with span("graph.load", cached=True), np.load(cache_file) as table:
+            return DecodeGraph(table)
+
+    with span("graph.load", cached=False):
+        graph = Graph().parse(ttl_path, format="turtle")
+    try:
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+        tmp_file = cache_file + ".tmp"
+        with open(tmp_file, "wb") as f:
+            np.savez(f, **EncodeGraph(graph))
+        os.replace(tmp_file, cache_file)
+    except (IOError, OSError) as e:
+        # The graph we just parsed is still good, it will just be parsed again next time
+        print("Could not cache graph " + ttl_path + ": " + str(e))
+    return graph
+
+
+def EnlargeGraph(graph, copies):
+    """A graph with `copies` renamed copies of every UBO resource, to benchmark bigger buildings"""
+    ubo = "http://www.sw.org/UBO#"
+    big = Graph()
+    for i in range(copies):
+        rename = lambda t: URIRef("%s_%d" % (t, i)) if isinstance(t, URIRef) and t.startswith(ubo) else t
+        big.addN((rename(s), p, o if p == RDF.type else rename(o), big) for s, p, o in graph)
+    return big
+
+
+def BenchmarkGraphLoad(ttl_path, cache_dir, repeat=3):
+    """returns: (seconds to parse the Turtle, seconds to load from the cache), best of `repeat`"""
+    LoadGraph(ttl_path, cache_dir)  # makes sure the cache entry exists
+    parse = cached = float("inf")
+    for _ in range(repeat):
+        start = time.time()
+        Graph().parse(ttl_path, format="turtle")
+        parse = min(parse, time.time() - start)
+        start = time.time()
+        LoadGraph(ttl_path, cache_dir)
+        cached = min(cached, time.time() - start)
+    return parse, cached
+
+
+if __name__ == "__main__":
+    import tempfile
+    ttl = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(os.path.abspath(__file__)), "MyGraph.ttl")
+    work = tempfile.mkdtemp()
+    base = Graph().parse(ttl, format="turtle")
+    for copies in (1, 10, 100):
+        path = os.path.join(work, "MyGraph_x%d.ttl" % copies)
+        (base if copies == 1 else EnlargeGraph(base, copies)).serialize(destination=path, format="turtle")
+        parse, cached = BenchmarkGraphLoad(path, os.path.join(work, "_graphcache"))
+        print("x%-4d %8d triples   parse %8.3f s   cached %8.3f s   speedup %5.1fx"
+              % (copies, len(base) * copies, parse, cached, parse / cached))
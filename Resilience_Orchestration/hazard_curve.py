@@ -0,0 +1,227 @@
+# -------------------------------------------------------------------------------
+# Name:        hazard_curve.py
+# Purpose:     Monotone log-log PCHIP hazard curves, evaluated and inverted for whole arrays of points
+#
+# Created:     10/18/2026
+# Licence:     The University of Notre Dame
+# -------------------------------------------------------------------------------
+
+'''
+A HazardCurve is the USGS points of one site and model joined by a shape-preserving piecewise cubic (PCHIP) in
+log-log space, the same interpolant time_based.BatchedPCHIP and the MATLAB interp1(..., 'PCHIP') calls use:
+
+    curve = HazardCurve(X, Y)           # X intensities, Y annual rates of exceedance
+    curve.rate(Sa)                      # rate of exceedance for an array of intensities
+    curve.sa(rate)                      # intensity for an array of rates (the inverse curve)
+    curve(np.log(Sa))                   # log rate, the call UnivariateSpline answered in Curves.querycurves
+    X, Y = curve                        # the points it goes through
+
+The rates never increase with the intensity, and PCHIP never overshoots its points, so the curve is monotone
+everywhere, including the tail where the smoothing UnivariateSpline could turn up again. Points with a rate of 0
+(or an intensity of 0) have no logarithm, so they are left out instead of being moved to 2**-256 like ImputeZeros
+did, which is where the overflow warnings came from. Outside its points the curve goes on as a straight line in
+log-log space (a power law) with the end slopes.
+
+sa() is the exact inverse of rate(): a searchsorted on the rates finds the piece every query rate falls in, and the
+cubic of that piece is solved for it by Newton steps kept inside the piece (a step that would leave it is replaced
+by a bisection), all query points at once. The pieces are monotone, so there is one solution per piece; a flat
+stretch maps to the intensity where it starts, and rates beyond the ends follow the end lines. curve.sa(curve.rate(Sa))
+gives Sa back to round-off. Evaluation is one searchsorted and one cubic per query point, for any number of them. A
+curve is kept as its log points and slopes (arrays(), HazardCurve.from_arrays()), which is also how SplineCache
+stores it.
+'''
+
+# #!/usr/bin/python
+import os
+import time
+import numpy as np
+from time_based import BatchedPCHIP
+
+
+def _slopes(x, y):
+    """PCHIP slopes at the points of one increasing x, the formulas of time_based.BatchedPCHIP for a single row"""
+    h = x[1:] - x[:-1]
+    delta = (y[1:] - y[:-1]) / h
+    if len(x) == 2:
+        return np.array([delta[0], delta[0]])
+    d = np.zeros(len(x))
+    w1 = 2 * h[1:] + h[:-1]
+    w2 = h[1:] + 2 * h[:-1]
+    same_sign = np.sign(delta[:-1]) * np.sign(delta[1:]) > 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        d[1:-1] = np.where(same_sign, (w1 + w2) / (w1 / delta[:-1] + w2 / delta[1:]), 0.)
+    d[0] = BatchedPCHIP._end_slope(h[0], h[1], delta[0], delta[1])
+    d[-1] = BatchedPCHIP._end_slope(h[-1], h[-2], delta[-1], delta[-2])
+    return d
+
+
+def _decreasing(d):
+    """Slopes kept at or below 0, the rates never go up (PCHIP of decreasing points only rounds above 0)"""
+    return np.minimum(d, 0.)
+
+
+def _coefficients(x, y, d):
+    """(4, n - 1) cubic coefficients of every piece, in powers of the distance from its left point"""
+    h = x[1:] - x[:-1]
+    delta = (y[1:] - y[:-1]) / h
+    return np.stack([y[:-1], d[:-1], (3 * delta - 2 * d[:-1] - d[1:]) / h, (d[:-1] - 2 * delta + d[1:]) / h ** 2])
+
+
+def _cubic(c, k, t):
+    return c[0, k] + t * (c[1, k] + t * (c[2, k] + t * c[3, k]))
+
+
+def _hermite(x, y, d, c, q):
+    """Piecewise cubic Hermite through (x, y) with slopes d at q (any shape), lines with the end slopes outside"""
+    q = np.asarray(q, dtype=np.float64)
+    k = np.clip(np.searchsorted(x, q, side="right") - 1, 0, len(x) - 2)
+    t = q - x[k]
+    out = _cubic(c, k, t)
+    below = q < x[0]
+    above = q > x[-1]
+    if below.any() or above.any():
+        with np.errstate(invalid="ignore"):  # log(0) queries are -inf, and -inf * a zero end slope is nan
+            out = np.where(below, y[0] + np.where(d[0] == 0, 0., (q - x[0]) * d[0]), out)
+            out = np.where(above, y[-1] + np.where(d[-1] == 0, 0., (q - x[-1]) * d[-1]), out)
+    return out
+
+
+def _solve(x, y, d, c, r, max_iter=100):
+    """
+    q with _hermite(x, y, d, c, q) = r for a non-increasing curve, r of any shape
+    Rates above the first point (below the last one) follow the end lines, or give -inf (inf) where those are flat.
+    """
+    r = np.asarray(r, dtype=np.float64)
+    flat = r.ravel()
+    j = np.searchsorted(-y, -flat, side="left")  # the first point at or below every rate
+    q = np.empty(len(flat))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        left = j == 0
+        q[left] = np.where(flat[left] == y[0], x[0], np.where(d[0] < 0, x[0] + (flat[left] - y[0]) / d[0], -np.inf))
+        right = j == len(x)
+        q[right] = np.where(d[-1] < 0, x[-1] + (flat[right] - y[-1]) / d[-1], np.inf)
+    inside = ~(left | right)
+    k = j[inside] - 1  # y[k] > rate >= y[k + 1]
+    rate = flat[inside]
+    h = x[k + 1] - x[k]
+    lo = np.zeros(len(k))
+    hi = h.copy()
+    t = h * (y[k] - rate) / (y[k] - y[k + 1])  # the straight line between the points to start from
+    for _ in range(max_iter):
+        f = _cubic(c, k, t) - rate
+        lo = np.where(f > 0, t, lo)  # the curve goes down, the solution is after t
+        hi = np.where(f <= 0, t, hi)
+        slope = c[1, k] + t * (2 * c[2, k] + 3 * t * c[3, k])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            step = t - f / slope
+        step = np.where((step >= lo) & (step <= hi), step, (lo + hi) / 2.)
+        done = np.abs(step - t) <= 1e-14 * np.maximum(h, 1.)
+        t = np.where(f == 0, t, step)
+        if done.all():
+            break
+    q[inside] = x[k] + t
+    return q.reshape(r.shape)
+
+
+class HazardCurve():
+    """
+    x, y: USGS intensities and annual rates of exceedance of one site and model
+    Raises ValueError when fewer than two points have an intensity and a rate above 0.
+    """
+
+    def __init__(self, x, y):
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        keep = (x > 0) & (y > 0)
+        x, y = x[keep], y[keep]
+        if np.any(x[1:] <= x[:-1]):
+            order = np.argsort(x, kind="stable")
+            x, first = np.unique(x[order], return_index=True)
+            y = y[order][first]
+        y = np.minimum.accumulate(y)  # round-off in the USGS files can make a rate go up
+        if len(x) < 2:
+            raise ValueError("a hazard curve needs at least two points with an intensity and a rate above 0")
+        self._set(np.log(x), np.log(y))
+
+    def _set(self, log_x, log_y, d=None):
+        self.log_x = log_x
+        self.log_y = log_y
+        self.d = _decreasing(_slopes(log_x, log_y)) if d is None else d
+        self.c = _coefficients(log_x, log_y, self.d)
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """The curve arrays() returned, without fitting it again"""
+        curve = cls.__new__(cls)
+        curve._set(np.asarray(arrays["log_x"]), np.asarray(arrays["log_y"]), np.asarray(arrays["d"]))
+        return curve
+
+    def arrays(self):
+        """{name: array} with everything the curve is made of"""
+        return {"log_x": self.log_x, "log_y": self.log_y, "d": self.d}
+
+    @property
+    def x(self):
+        return np.exp(self.log_x)
+
+    @property
+    def y(self):
+        return np.exp(self.log_y)
+
+    def __call__(self, log_sa):
+        """log rate of exceedance for log intensities, like the log-log UnivariateSpline it replaces"""
+        return _hermite(self.log_x, self.log_y, self.d, self.c, log_sa)
+
+    def rate(self, sa):
+        """annual rate of exceedance for intensities of any shape"""
+        with np.errstate(divide="ignore"):
+            return np.exp(self(np.log(sa)))
+
+    def log_sa(self, log_rate):
+        """log intensity for log rates, the solution of self(log_sa) = log_rate on the piece it falls in"""
+        return _solve(self.log_x, self.log_y, self.d, self.c, log_rate)
+
+    def sa(self, rate):
+        """intensity for annual rates of exceedance of any shape"""
+        with np.errstate(divide="ignore"):
+            return np.exp(self.log_sa(np.log(rate)))
+
+    def __iter__(self):
+        return iter((self.x, self.y))
+
+    def __getitem__(self, i):
+        """curve[0], curve[1]: the intensities and rates of the points, as for the (X, Y) tuples of ReadHazardData"""
+        return (self.x, self.y)[i]
+
+
+if __name__ == "__main__":
+    import pandas as pd
+    from scipy.interpolate import UnivariateSpline
+    df = pd.read_csv(os.path.join(os.path.dirname(os.path.abspath(__file__)), "MATLAB Codes", "total.csv"), header=None)
+    X = df.iloc[0, 3:].values.astype(np.float64)
+    curves = df.iloc[1:, 3:].values.astype(np.float64)
+    queries = np.exp(np.random.default_rng(0).uniform(np.log(X[X > 0].min()), np.log(X.max()), 100000))
+    fit_spline = fit_pchip = query_spline = query_pchip = 0.
+    non_monotone = 0
+    for Y in curves:
+        start = time.time()
+        with np.errstate(all="ignore"):
+            x_clean = np.where(X == 0, 2. ** -256, X)
+            y_clean = np.where(Y == 0, 2. ** -256, Y)
+            spl = UnivariateSpline(np.log(x_clean), np.log(y_clean), k=3)
+        fit_spline += time.time() - start
+        start = time.time()
+        curve = HazardCurve(X, Y)
+        fit_pchip += time.time() - start
+        start = time.time()
+        spline_rates = np.exp(spl(np.log(np.sort(queries))))
+        query_spline += time.time() - start
+        start = time.time()
+        rates = curve.rate(np.sort(queries))
+        query_pchip += time.time() - start
+        non_monotone += np.any(np.diff(spline_rates) > 0)
+        assert np.all(np.diff(rates) <= 0)
+        assert np.allclose(curve.sa(rates), np.sort(queries), rtol=1e-9)
+    print("%d sites, 100000 queries each" % len(curves))
+    print("UnivariateSpline: fit %.4f s, queries %.4f s, %d curves go up somewhere" % (fit_spline, query_spline, non_monotone))
+    print("HazardCurve:      fit %.4f s, queries %.4f s, all monotone" % (fit_pchip, query_pchip))
@@ -0,0 +1,190 @@
+# -------------------------------------------------------------------------------
+# Name:        hazard_store.py
+# Purpose:     Columnar, disk-cached storage of the USGS hazard curve sets
+#
+# Created:     10/18/2026
+# Licence:     The University of Notre Dame
+# -------------------------------------------------------------------------------
+
+'''
+Every intensity-measure model (PGA, SA0P2, SA1P0, ...) is kept as one contiguous array of sites x IM levels:
+
+    model.x      --> IM levels (the header of total.csv), shape (n_levels,)
+    model.y      --> annual rates of exceedance, shape (n_sites, n_levels), one row per site
+    model.sites  --> site names, row order of model.y
+    model.lon    --> longitude of every site (these used to be dropped when reading total.csv)
+    model.lat    --> latitude of every site
+
+The first time a total.csv is read it is also written to a binary cache (.npy for the curves, .npz for the rest).
+The cache entry is keyed by the CSV path, size and modification time, so an edited or replaced file is re-read.
+Later runs memory-map the cached curves instead of parsing the CSV again.
+
+Sites can also be looked up by coordinates (site_index.py): store.nearest(lon, lat, k) and store.within(lon, lat,
+radius_km) give the closest site names, store.at(lon, lat) the curves of every model interpolated at the point.
+'''
+
+# #!/usr/bin/python
+import os
+import hashlib
+import numpy as np
+import pandas as pd
+from instrument import span
+from site_index import ModelIndex, InterpolateCurve
+
+
+def _cache_key(csv_path):
+    """Key of the cache entry for csv_path: hash of its absolute path, size and modification time"""
+    stat = os.stat(csv_path)
+    key = "%s|%d|%d" % (os.path.abspath(csv_path), stat.st_size, int(stat.st_mtime * 1e9))
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+def _write_atomic(path, writer):
+    """Writes through a temporary file first so that a crashed run never leaves half a cache entry behind"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        writer(f)
+    os.replace(tmp_path, path)
+
+
+class HazardModel():
+    """Curves of one intensity-measure model for all sites of a total.csv file"""
+
+    def __init__(self, name, x, y, sites, lon, lat):
+        self.name = name
+        self.x = x
+        self.y = y
+        self.sites = sites
+        self.lon = lon
+        self.lat = lat
+        self.site_index = dict((s, i) for i, s in enumerate(sites))
+
+    def __contains__(self, site):
+        return site in self.site_index
+
+    def curve(self, site):
+        """returns: (X, Y) for the site, X are the IM levels and Y the annual rates of exceedance"""
+        return self.x, self.y[self.site_index[site]]
+
+
+def ParseHazardCSV(csv_path, model_name):
+    """Reads a USGS total.csv file (name, lon, lat, IM levels...) into a HazardModel"""
+    df = pd.read_csv(csv_path, header=None)
+    sites = [str(s) for s in df.iloc[1:, 0].values]  # all values after the first row are city names
+    lon = df.iloc[1:, 1].values.astype(np.float64)
+    lat = df.iloc[1:, 2].values.astype(np.float64)
+    x = df.iloc[0, 3:].values.astype(np.float64)  # the first row holds the IM levels
+    y = np.ascontiguousarray(df.iloc[1:, 3:].values.astype(np.float64))
+    return HazardModel(model_name, x, y, sites, lon, lat)
+
+
+def LoadHazardModel(csv_path, model_name, cache_dir=None):
+    """
+    Returns the HazardModel for csv_path, from the binary cache in cache_dir when it is up to date
+    cache_dir: None turns caching off
+    """
+    if cache_dir is None:
+        return ParseHazardCSV(csv_path, model_name)
+
+    key = _cache_key(csv_path)
+    curves_file = os.path.join(cache_dir, key + ".npy")
+    meta_file = os.path.join(cache_dir, key + ".npz")
+    if os.path.exists(curves_file) and os.path.exists(meta_file):
+        y = np.load(curves_file, mmap_mode="r")
+        meta = np.load(meta_file)
+        return HazardModel(model_name, meta["x"], y, meta["sites"].tolist(), meta["lon"], meta["lat"])
+
+    model = ParseHazardCSV(csv_path, model_name)
+    try:
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+        _write_atomic(curves_file, lambda f: np.save(f, model.y))
+        _write_atomic(meta_file, lambda f: np.savez(f, x=model.x, lon=model.lon, lat=model.lat,
+                                                    sites=np.array(model.sites, dtype=np.str_)))
+    except (IOError, OSError) as e:
+        # Caching is only a speed-up, the curves we just parsed are still good
+        print("Could not write hazard cache for " + csv_path + ": " + str(e))
+    return model
+
+
+class HazardStore():
+    """
+    Hazard curves of several models, indexed by site name
+    store[city][model] gives (X, Y) in the same nested shape ReadHazardData always returned: {city: {model: (X,Y) }}
+    """
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir
+        self.models = {}  # {model: HazardModel}
+        self.sites = []  # union of the sites of all models, in the order they were first read
+        self.site_index = {}  # {city: position in self.sites}
+
+    def load(self, model_names, base_directory):
+        """
+        modelnames: MUST be same as subdirectory names
+        base_directory: curves folders generated using the hazard model from USGS
+        """
+        for _model in model_names:
+            print(_model)
+            f = os.path.join(base_directory, _model, "total.csv")
+            with span("hazard.load", model=_model):
+                self.add_model(LoadHazardModel(f, _model, self.cache_dir))
+        return self
+
+    def add_model(self, model):
+        self.models[model.name] = model
+        for s in model.sites:
+            if s not in self.site_index:
+                self.site_index[s] = len(self.sites)
+                self.sites.append(s)
+
+    def coordinates(self, site):
+        """returns: (lon, lat) of the site, taken from the first model that has it"""
+        for model in self.models.values():
+            if site in model:
+                i = model.site_index[site]
+                return float(model.lon[i]), float(model.lat[i])
+        raise KeyError(site)
+
+    def curve(self, site, model):
+        return self.models[model].curve(site)
+
+    def _model(self, model):
+        """The named model, or the first one read (the models of one curve set share their sites)"""
+        return self.models[model] if model is not None else next(iter(self.models.values()))
+
+    def nearest(self, lon, lat, k=1, model=None):
+        """returns: [(site, km)] of the k sites closest to the point, nearest first"""
+        m = self._model(model)
+        km, rows = ModelIndex(m).nearest(lon, lat, k)
+        return [(m.sites[r], float(d)) for r, d in zip(np.ravel(rows), np.ravel(km))]
+
+    def within(self, lon, lat, radius_km, model=None):
+        """returns: [(site, km)] of every site at most radius_km from the point, nearest first"""
+        m = self._model(model)
+        km, rows = ModelIndex(m).within(lon, lat, radius_km)
+        return [(m.sites[r], float(d)) for r, d in zip(rows, km)]
+
+    def at(self, lon, lat, k=4, power=2.):
+        """
+        Curves at a point, interpolated from the k nearest sites of every model (see site_index.InterpolateCurve)
+        returns: {model: (X, Y)}, like store[city]
+        """
+        return dict((name, InterpolateCurve(m, lon, lat, k, power)) for name, m in self.models.items())
+
+    def __getitem__(self, site):
+        if site not in self.site_index:
+            raise KeyError(site)
+        return dict((name, m.curve(site)) for name, m in self.models.items() if site in m)
+
+    def __contains__(self, site):
+        return site in self.site_index
+
+    def __iter__(self):
+        return iter(self.sites)
+
+    def __len__(self):
+        return len(self.sites)
+
+    def keys(self):
+        return list(self.sites)
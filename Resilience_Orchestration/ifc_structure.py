@@ -0,0 +1,378 @@
+# -------------------------------------------------------------------------------
+# Name:        ifc_structure.py
+# Purpose:     Read levels, columns and beams straight from the ifcxml, without running GeoLinked
+#
+# Created:     10/18/2026
+# Licence:     The University of Notre Dame
+# -------------------------------------------------------------------------------
+
+'''
+main() only needs three things from the GeoLinked graph: the level elevations and the dimensions of the columns and
+beams. ReadIfcStructure gets them in one streaming pass over the ifcxml (see xml_parsing.iter_entities), keeping only
+the geometry entities that hold them, and gives them back in the shape GraphData.get_components returns:
+
+    levels   --> {storey id: [Literal(Name), Literal(Elevation)]}
+    columns  --> {column id: [element literal]}
+    beams    --> {beam id: [element literal]}
+
+Each element literal is written in the GeoLinked format (see colvol.py), so ElementTable and calcvolumes read it
+like the graph literals:
+
+    columns  --> depth and XandYDim from the extruded profile of the body, position in world coordinates
+    beams    --> XandYDim = (length, width, height) of the body, length being its longer side in plan, and the
+                 position of the beam placement
+
+Run this file with an ifcxml (and optionally the MyGraph.ttl GeoLinked made from it) to time the fast path and
+compare its levels and elements with the graph ones. tests/test_ifc_structure.py does the same comparison against
+the GeoLinked graph fixtures of tests/fixtures. The shipped MyGraph.ttl is of another model (a single room without
+columns or beams), and so far only two GeoLinked elements of bRC_FRAME_Concrete_allComponents are available, so
+main() keeps the GeoLinked path by default (ifc_fast_path = 0) until a full graph of the same ifcxml agrees.
+'''
+
+# #!/usr/bin/python
+import os
+import sys
+import time
+import numpy as np
+from rdflib import Literal
+from xml_parsing import IFC_NS, iter_entities
+from elements import ElementTable
+from instrument import span, traced
+
+STRUCTURE_CLASSES = ("IfcColumn", "IfcBeam")
+# Only these entities are kept in memory while the file is read
+GEOMETRY_CLASSES = frozenset([
+    "IfcBuildingStorey", "IfcLocalPlacement", "IfcAxis2Placement3D", "IfcAxis2Placement2D", "IfcCartesianPoint",
+    "IfcDirection", "IfcProductDefinitionShape", "IfcShapeRepresentation", "IfcMappedItem", "IfcRepresentationMap",
+    "IfcCartesianTransformationOperator3D", "IfcExtrudedAreaSolid", "IfcRectangleProfileDef", "IfcArbitraryClosedProfileDef",
+    "IfcPolyline", "IfcBoundingBox",
+    "IfcFaceBasedSurfaceModel", "IfcFacetedBrep", "IfcConnectedFaceSet", "IfcClosedShell", "IfcFace", "IfcFaceOuterBound",
+    "IfcFaceBound", "IfcPolyLoop",
+]) | frozenset(STRUCTURE_CLASSES)
+
+
+def _name(tag):
+    return tag[len(IFC_NS):] if tag.startswith(IFC_NS) else tag.split("}")[-1]
+
+
+def _fields(element, index):
+    """
+    {attribute: text, [refs] or [numbers]} of one entity; entities written inline (with an id instead of a ref)
+    are added to the index as well
+    """
+    fields = {}
+    for child in element:
+        items = list(child)
+        if not items:
+            fields[_name(child.tag)] = child.text
+            continue
+        refs = []
+        numbers = []
+        for item in items:
+            if item.get("ref") is not None:
+                refs.append(item.get("ref"))
+            elif item.get("id") is not None:
+                index[item.get("id")] = (_name(item.tag), _fields(item, index))
+                refs.append(item.get("id"))
+            elif item.text is not None:
+                numbers.append(float(item.text))
+        fields[_name(child.tag)] = refs if refs else numbers
+    return fields
+
+
+def IndexIfc(path):
+    """
+    returns: (index, order); index is {id: (ifc_class, fields)} of the geometry entities, order the ids of the
+    storeys, columns and beams in file order
+    """
+    index = {}
+    order = []
+    for ifc_class, element in iter_entities(path, GEOMETRY_CLASSES):
+        index[element.get("id")] = (ifc_class, _fields(element, index))
+        if ifc_class in STRUCTURE_CLASSES or ifc_class == "IfcBuildingStorey":
+            order.append(element.get("id"))
+    return index, order
+
+
+def _ref(fields, name):
+    value = fields.get(name)
+    return value[0] if isinstance(value, list) and value and isinstance(value[0], str) else None
+
+
+def _point(index, ref, default=(0., 0., 0.)):
+    if ref not in index:
+        return np.array(default, dtype=np.float64)
+    values = index[ref][1].get("Coordinates") or index[ref][1].get("DirectionRatios") or []
+    return np.array((list(values) + [0., 0., 0.])[:3], dtype=np.float64)
+
+
+def _axes(index, ref):
+    """4x4 matrix of an IfcAxis2Placement3D (IfcAxis2Placement2D): local --> parent coordinates"""
+    matrix = np.eye(4)
+    if ref not in index:
+        return matrix
+    fields = index[ref][1]
+    z = _point(index, _ref(fields, "Axis"), (0., 0., 1.))
+    x = _point(index, _ref(fields, "RefDirection"), (1., 0., 0.))
+    z = z / np.linalg.norm(z)
+    x = x - np.dot(x, z) * z
+    x = x / np.linalg.norm(x)
+    matrix[:3, 0] = x
+    matrix[:3, 1] = np.cross(z, x)
+    matrix[:3, 2] = z
+    matrix[:3, 3] = _point(index, _ref(fields, "Location"))
+    return matrix
+
+
+def _placement(index, ref, memo):
+    """4x4 matrix of an IfcLocalPlacement: local --> world coordinates, following PlacementRelTo"""
+    if ref not in index:
+        return np.eye(4)
+    if ref not in memo:
+        fields = index[ref][1]
+        parent = _ref(fields, "PlacementRelTo")
+        relative = _axes(index, _ref(fields, "RelativePlacement"))
+        memo[ref] = relative if parent is None else np.dot(_placement(index, parent, memo), relative)
+    return memo[ref]
+
+
+def _items(index, shape_ref):
+    """[(representation type, item id, 4x4 matrix item --> element coordinates)] with the mapped items resolved"""
+    found = []
+
+    def visit(representation, matrix):
+        rep_type = index[representation][1].get("RepresentationType")
+        for item in index[representation][1].get("Items") or []:
+            if item not in index:
+                continue
+            if index[item][0] != "IfcMappedItem":
+                found.append((rep_type, item, matrix))
+                continue
+            source = index.get(_ref(index[item][1], "MappingSource"))
+            if source is None:
+                continue
+            mapped = np.dot(matrix, _axes(index, _ref(source[1], "MappingOrigin")))
+            operator = index.get(_ref(index[item][1], "MappingTarget"))
+            if operator is not None:
+                target = np.eye(4)
+                target[:3, :3] *= float(operator[1].get("Scale") or 1.)
+                target[:3, 3] = _point(index, _ref(operator[1], "LocalOrigin"))
+                mapped = np.dot(target, mapped)
+            if _ref(source[1], "MappedRepresentation") in index:
+                visit(_ref(source[1], "MappedRepresentation"), mapped)
+
+    if shape_ref in index:
+        for representation in index[shape_ref][1].get("Representations") or []:
+            if representation in index:
+                visit(representation, np.eye(4))
+    return found
+
+
+def _surface_points(index, ref):
+    """All the vertices of an IfcFaceBasedSurfaceModel or IfcFacetedBrep"""
+    points = []
+    todo = [ref]
+    while todo:
+        current = todo.pop()
+        if current not in index:
+            continue
+        ifc_class, fields = index[current]
+        if ifc_class == "IfcPolyLoop":
+            points.extend(_point(index, p) for p in fields.get("Polygon") or [])
+            continue
+        for name in ("FbsmFaces", "Outer", "CfsFaces", "Bounds", "Bound"):
+            todo.extend(fields.get(name) or [])
+    return points
+
+
+def _extents(index, items):
+    """(min corner, max corner) of the body in element coordinates, None when there is no geometry to measure"""
+    corners = []
+    for rep_type, item, matrix in items:
+        ifc_class, fields = index[item]
+        if ifc_class == "IfcBoundingBox":
+            corner = _point(index, _ref(fields, "Corner"))
+            size = [float(fields.get(d) or 0.) for d in ("XDim", "YDim", "ZDim")]
+            points = [corner + np.array([i, j, k]) * size for i in (0, 1) for j in (0, 1) for k in (0, 1)]
+        elif ifc_class in ("IfcFaceBasedSurfaceModel", "IfcFacetedBrep"):
+            points = _surface_points(index, item)
+        else:
+            continue
+        corners.extend(np.dot(matrix, np.append(p, 1.))[:3] for p in points)
+    if not corners:
+        return None
+    corners = np.array(corners)
+    return corners.min(axis=0), corners.max(axis=0)
+
+
+def _profile_size(index, profile):
+    """[XDim, YDim] of a rectangle profile, or of the box around the outline of an arbitrary one, as text"""
+    if profile is None:
+        return None
+    if profile[0] == "IfcRectangleProfileDef":
+        return [profile[1].get("XDim"), profile[1].get("YDim")]
+    curve = index.get(_ref(profile[1], "OuterCurve"))
+    if profile[0] != "IfcArbitraryClosedProfileDef" or curve is None or curve[0] != "IfcPolyline":
+        return None
+    points = np.array([_point(index, p) for p in curve[1].get("Points") or []])
+    if not len(points):
+        return None
+    return _text((points.max(axis=0) - points.min(axis=0))[:2])
+
+
+def _text(values):
+    return ["%.10g" % v for v in values]
+
+
+def _column_coors(index, items, world):
+    coors = []
+    for rep_type, item, matrix in items:
+        ifc_class, fields = index[item]
+        if ifc_class != "IfcExtrudedAreaSolid":
+            continue
+        solid = np.dot(np.dot(world, matrix), _axes(index, _ref(fields, "Position")))
+        position = _text(solid[:3, 3])
+        coors.append(("depth", [fields.get("Depth")]))
+        profile = index.get(_ref(fields, "SweptArea"))
+        size = _profile_size(index, profile)
+        if size is not None:
+            coors.append(("XandYDim", size))
+        if profile is not None and profile[0] == "IfcRectangleProfileDef":
+            profile_axes = index.get(_ref(profile[1], "Position"), (None, {}))[1]
+            coors.append(("profile_location", _text(_point(index, _ref(profile_axes, "Location"))[:2])))
+            coors.append(("reference_direction",
+                          _text(_point(index, _ref(profile_axes, "RefDirection"), (1., 0., 0.))[:2])))
+        coors.append(("local_direction_ratios", position))
+        coors.append(("position", position))
+        coors.append(("extrude_direction", _text(_point(index, _ref(fields, "ExtrudedDirection"), (0., 0., 1.)))))
+        return coors
+
+    # No extruded solid: the bounding box of the body gives the height and the section
+    extents = _extents(index, items)
+    if extents is None:
+        return [("XandYDim", ["None", "None"])]
+    low, high = extents
+    return [("depth", _text([high[2] - low[2]])), ("XandYDim", _text((high - low)[:2])),
+            ("position", _text(np.dot(world, np.append(low, 1.))[:3]))]
+
+
+def _beam_coors(index, items, world):
+    coors = [("position", _text(world[:3, 3])), ("local_direction_ratios", _text(world[:3, 0]))]
+    for rep_type, item, matrix in items:
+        ifc_class, fields = index[item]
+        if ifc_class != "IfcExtrudedAreaSolid":
+            continue
+        size = _profile_size(index, index.get(_ref(fields, "SweptArea")))
+        if size is not None:
+            # extruded along the beam: length, then the section
+            coors.append(("XandYDim", [fields.get("Depth")] + size))
+            return coors
+    extents = _extents(index, items)
+    if extents is None:
+        coors.append(("XandYDim", ["None", "None", "None"]))
+        return coors
+    low, high = extents
+    size = high - low
+    coors.append(("profile_location", _text(low)))
+    coors.append(("XandYDim", _text(sorted(size[:2], reverse=True) + [size[2]])))
+    return coors
+
+
+def ElementLiteral(ifc_class, ifc_id, name, coors):
+    """The GeoLinked string of one element, e.g. "[[<Element {...}IfcColumn at 0x...>, (name, 'name'), ...]]" """
+    return Literal("[[<Element %s%s at 0x%x>, %r, %r, (%r, 'coors')]]"
+                   % (IFC_NS, ifc_class, int(ifc_id.lstrip("i") or 0), (name, "name"), (ifc_id, "id"), coors))
+
+
+@traced("ifc.read_structure")
+def ReadIfcStructure(path):
+    """
+    path: ifcxml file (e.g. TempXMLs/bRC_FRAME_Concrete_allComponents.ifcxml)
+    returns: {"levels": {...}, "spaces": {}, "columns": {...}, "beams": {...}, "walls": {}} with the same layout as
+             GraphData.get_components (only levels, columns and beams are read)
+    """
+    with span("ifc.index"):
+        index, order = IndexIfc(path)
+    memo = {}
+    components = {"levels": {}, "spaces": {}, "columns": {}, "beams": {}, "walls": {}}
+    for ifc_id in order:
+        ifc_class, fields = index[ifc_id]
+        if ifc_class == "IfcBuildingStorey":
+            components["levels"][ifc_id] = [Literal(fields.get("Name") or ""), Literal(fields.get("Elevation"))]
+            continue
+        world = _placement(index, _ref(fields, "ObjectPlacement"), memo)
+        items = _items(index, _ref(fields, "Representation"))
+        if ifc_class == "IfcColumn":
+            coors = _column_coors(index, items, world)
+            kind = "columns"
+        else:
+            coors = _beam_coors(index, items, world)
+            kind = "beams"
+        coors = [("CadID", [fields.get("Tag") or ""])] + coors
+        components[kind][ifc_id] = [ElementLiteral(ifc_class, ifc_id, fields.get("Name") or "", coors)]
+    return components
+
+
+def LevelElevations(levels):
+    """Sorted unique elevations (file units) of a levels dict, i.e. all of its values that read as numbers"""
+    elevations = set()
+    for subject in levels:
+        for value in levels[subject]:
+            try:
+                elevations.add(float(value))
+            except (TypeError, ValueError):
+                pass
+    return sorted(elevations)
+
+
+def CompareWithGraph(fast, graph, tolerance=1e-6, partial=False):
+    """
+    fast: ReadIfcStructure output, graph: GraphData.get_components output for the same model
+    partial: the graph holds only some elements of the model (e.g. the test fixture), so its levels and the elements
+             it does not have are not compared
+    Elevations are compared as sets; columns and beams are matched by CadID and compared on depth, XandYDim and
+    position wherever the graph has a value for them
+    returns: list of differences, empty when both agree
+    """
+    differences = []
+    fast_elev = LevelElevations(fast["levels"])
+    graph_elev = LevelElevations(graph["levels"])
+    if not partial and (len(fast_elev) != len(graph_elev) or not np.allclose(fast_elev, graph_elev, atol=tolerance)):
+        differences.append("elevations: ifcxml %s, graph %s" % (fast_elev, graph_elev))
+
+    fast_table, _ = ElementTable(fast["columns"], fast["beams"])
+    graph_table, graph_errors = ElementTable(graph["columns"], graph["beams"])
+    for e in graph_errors:
+        differences.append("graph element %s unreadable: %s" % (e["subject"], e["error"]))
+    fast_rows = dict((str(row["CadID"]), row) for row in fast_table)
+    graph_rows = dict((str(row["CadID"]), row) for row in graph_table)
+    for cad_id in sorted(set(graph_rows) - set(fast_rows)):
+        differences.append("element %s only in the graph" % cad_id)
+    for cad_id in sorted(set(fast_rows) - set(graph_rows)) if not partial else []:
+        differences.append("element %s only in the ifcxml" % cad_id)
+    for cad_id in sorted(set(fast_rows) & set(graph_rows)):
+        for field in ("depth", "XandYDim", "position"):
+            ours = np.atleast_1d(fast_rows[cad_id][field])
+            theirs = np.atleast_1d(graph_rows[cad_id][field])
+            known = ~np.isnan(theirs)
+            if not np.allclose(ours[known], theirs[known], atol=tolerance, rtol=0):
+                differences.append("element %s %s: ifcxml %s, graph %s" % (cad_id, field, ours, theirs))
+    return differences
+
+
+if __name__ == "__main__":
+    here = os.path.dirname(os.path.abspath(__file__))
+    ifcxml = sys.argv[1] if len(sys.argv) > 1 else os.path.join(here, "TempXMLs", "bRC_FRAME_Concrete_allComponents.ifcxml")
+    start = time.time()
+    structure = ReadIfcStructure(ifcxml)
+    print("%s: %d levels, %d columns, %d beams in %.3f s" % (os.path.basename(ifcxml), len(structure["levels"]),
+          len(structure["columns"]), len(structure["beams"]), time.time() - start))
+    print("elevations", LevelElevations(structure["levels"]))
+    if len(sys.argv) > 2:
+        from graph_cache import LoadGraph
+        from Q_Semantic_Graph import GraphData
+        differences = CompareWithGraph(structure, GraphData().get_components(LoadGraph(sys.argv[2])))
+        for line in differences:
+            print(line)
+        print("graph check: %s" % ("same levels, columns and beams" if not differences else
+                                   "%d differences" % len(differences)))
@@ -0,0 +1,211 @@
+# -------------------------------------------------------------------------------
+# Name:        instrument.py
+# Purpose:     Wall time, CPU time and peak memory of the orchestration stages and of their inner steps
+#
+# Created:     10/18/2026
+# Licence:     The University of Notre Dame
+# -------------------------------------------------------------------------------
+
+'''
+Code that wants to be measured wraps itself in a span:
+
+    with span("curves.spline", city=city, model=model) as info:
+        ...
+        info["cached"] = True       # extra fields for the trace
+
+Nothing is measured until main() installs a Tracer (SetTracer), so the hooks in Curves, GraphData, colvol, ...
+cost next to nothing otherwise. For every span the Tracer records
+
+    wall_s          elapsed time
+    cpu_s           CPU time of the thread that ran the span
+    children_cpu_s  CPU time of the external programs (GeoLinked, GreenScale) that finished during the span
+    peak_rss_mb     peak memory of the process when the span ended
+    rss_growth_mb   how much the span raised that peak
+
+and appends it as one JSON line to the trace file of the run (spans running at the same time on other threads are
+kept apart by their thread name; parent is the enclosing span on the same thread). Comparing the trace files of two
+runs shows which step got slower. summary() aggregates the spans into a table per name.
+'''
+
+# #!/usr/bin/python
+import os
+import json
+import time
+import threading
+from functools import wraps
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def PeakMemoryMB():
+    """Peak resident memory of this process so far, None when it cannot be measured here"""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1024.0 ** 2 if os.uname()[0] == "Darwin" else peak / 1024.0  # bytes on macOS, KB on Linux
+    if psutil is not None:
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss) / 1024.0 ** 2
+    return None
+
+
+def _children_cpu():
+    t = os.times()
+    return t.children_user + t.children_system
+
+
+class _Span():
+
+    def __init__(self, tracer, name, attrs):
+        self.tracer = tracer
+        self.name = name
+        self.info = dict(attrs)
+
+    def __enter__(self):
+        self.parent = self.tracer._push(self.name)
+        self.start = time.time()
+        self.wall = time.perf_counter()
+        self.cpu = time.thread_time()
+        self.children = _children_cpu()
+        self.peak = PeakMemoryMB()
+        return self.info
+
+    def __exit__(self, exc_type, exc, tb):
+        peak = PeakMemoryMB()
+        record = {
+            "run": self.tracer.run,
+            "span": self.name,
+            "parent": self.parent,
+            "thread": threading.current_thread().name,
+            "start": round(self.start - self.tracer.started, 6),
+            "wall_s": round(time.perf_counter() - self.wall, 6),
+            "cpu_s": round(time.thread_time() - self.cpu, 6),
+            "children_cpu_s": round(_children_cpu() - self.children, 6),
+            "peak_rss_mb": None if peak is None else round(peak, 3),
+            "rss_growth_mb": None if peak is None else round(peak - self.peak, 3),
+        }
+        if exc_type is not None:
+            record["error"] = exc_type.__name__
+        record.update(self.info)
+        self.tracer._pop()
+        self.tracer._write(record)
+        return False
+
+
+class _NullSpan():
+
+    def __enter__(self):
+        return {}
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+class Tracer():
+    """
+    path: JSON-lines file the spans are appended to (None keeps them in memory only)
+    run: name of the run in every record, defaults to the start time
+    """
+
+    def __init__(self, path=None, run=None):
+        self.path = path
+        self.started = time.time()
+        self.run = run or time.strftime("%Y%m%d-%H%M%S", time.localtime(self.started))
+        self.records = []
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.file = None
+        if path is not None:
+            if os.path.dirname(path) and not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            self.file = open(path, "a")
+
+    def span(self, name, **attrs):
+        return _Span(self, name, attrs)
+
+    def _push(self, name):
+        stack = getattr(self.local, "stack", None)
+        if stack is None:
+            stack = self.local.stack = []
+        parent = stack[-1] if stack else None
+        stack.append(name)
+        return parent
+
+    def _pop(self):
+        self.local.stack.pop()
+
+    def _write(self, record):
+        with self.lock:
+            self.records.append(record)
+            if self.file is not None:
+                self.file.write(json.dumps(record, default=str) + "\n")
+                self.file.flush()  # a crashed run still leaves the spans that finished
+
+    def summary(self):
+        """Table with one row per span name: calls, total wall and CPU time, highest peak memory"""
+        rows = {}
+        order = []
+        for r in self.records:
+            if r["span"] not in rows:
+                rows[r["span"]] = {"calls": 0, "wall": 0., "cpu": 0., "children": 0., "peak": None}
+                order.append(r["span"])
+            row = rows[r["span"]]
+            row["calls"] += 1
+            row["wall"] += r["wall_s"]
+            row["cpu"] += r["cpu_s"]
+            row["children"] += r["children_cpu_s"]
+            if r["peak_rss_mb"] is not None:
+                row["peak"] = max(row["peak"] or 0., r["peak_rss_mb"])
+        lines = ["%-34s %6s %10s %10s %12s %10s" % ("span", "calls", "wall s", "cpu s", "child cpu s", "peak MB")]
+        for name in sorted(order, key=lambda n: -rows[n]["wall"]):
+            row = rows[name]
+            lines.append("%-34s %6d %10.3f %10.3f %12.3f %10s" % (name, row["calls"], row["wall"], row["cpu"],
+                         row["children"], "-" if row["peak"] is None else "%.1f" % row["peak"]))
+        return "\n".join(lines)
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+_tracer = None
+
+
+def SetTracer(tracer):
+    """Installs the Tracer every span() goes to (None switches measuring off); returns the previous one"""
+    global _tracer
+    previous, _tracer = _tracer, tracer
+    return previous
+
+
+def GetTracer():
+    return _tracer
+
+
+def span(name, **attrs):
+    tracer = _tracer
+    return _NullSpan() if tracer is None else tracer.span(name, **attrs)
+
+
+def traced(name):
+    """Decorator: every call of the function is a span"""
+    def decorate(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def LoadTrace(path):
+    """The records of a trace file, e.g. to compare two runs"""
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
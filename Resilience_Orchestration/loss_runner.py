@@ -0,0 +1,159 @@
+# -------------------------------------------------------------------------------
+# Name:        loss_runner.py
+# Purpose:     Repair cost simulation of all intensities and directions on a process pool, inputs in shared memory
+#
+# Created:     10/18/2026
+# Licence:     The University of Notre Dame
+# -------------------------------------------------------------------------------
+
+'''
+The damage part of InitResponseDamageModule calls calc_losses once per intensity interval and direction, one after
+another. RunLosses splits that work into (intensity, direction, chunk of samples) units and spreads them over a
+process pool:
+
+    result = RunLosses(m_drift_ratios, b_SD, Dl, Nz=100000, seed=1)
+    result["mean"][intensity, direction, floor]     # Cost of InitResponseDamageModule, see CostMatrix()
+    result["annual"][direction, floor]              # sum over the intensities of Dl * mean loss
+    result["samples"][intensity, direction, sample, floor]     # sorted loss distribution (keep_samples=True)
+
+The inputs (median EDPs, their dispersions, the fragility curves and repair costs) are written once to .npy files
+in a scratch folder and every worker maps them read-only (np.load with mmap_mode), so they are shared through the
+page cache instead of being pickled to each worker; the workers write their samples straight into a mapped output
+file the same way. Every unit draws its samples from its own stream, SeedSequence(seed, spawn_key=(group,
+intensity, direction, chunk)), and the sums of the chunks are added up in unit order, so a seed gives the same
+results to the last bit whatever the number of workers (chunk is part of the stream layout and must stay the same).
+
+A fragility group is (EDP name, theta, beta, RC, quant); the EDP name picks the medians and dispersions the group
+is evaluated on, e.g. "drift" with (m_drift_ratios, b_SD) or "accel" with (m_accel, b_FA). The default is the
+drift-sensitive groups calc_losses uses. Each group gets its own samples, the losses of all groups are added up.
+'''
+
+# #!/usr/bin/python
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from losses import CalcLosses, THETA, BETA, RC, QUANT, NZ
+
+CHUNK = 10000  # samples per work unit
+DRIFT_GROUPS = [("drift", THETA, BETA, RC, QUANT)]
+
+
+def SplitDirections(matlab_array, num_int):
+    """
+    (n_floors, 2 * num_int) MATLAB layout with the columns x1, y1, x2, y2, ... (m_drift_ratios, m_accel, Cost)
+    returns: (num_int, 2, n_floors)
+    """
+    a = np.asarray(matlab_array, dtype=np.float64)
+    return a.T.reshape(int(num_int), 2, a.shape[0])
+
+
+def CostMatrix(mean):
+    """(num_int, 2, n_floors) back to the (n_floors, 2 * num_int) layout of Cost in InitResponseDamageModule"""
+    return mean.reshape(-1, mean.shape[-1]).T
+
+
+_mapped = {}  # {path: array} in each worker, so the inputs are mapped once per process
+
+
+def _shared(path):
+    if path not in _mapped:
+        _mapped[path] = np.load(path, mmap_mode="r")
+    return _mapped[path]
+
+
+def _run_unit(unit):
+    """
+    Losses of one (intensity, direction, chunk); returns the sums of the losses and of their squares
+    The samples of the groups are added in the order they were drawn and only sorted once all of them are in.
+    """
+    files, groups, i, k, c, start, stop, seed, samples_file = unit
+    L = 0.
+    for g, (edp, theta, beta, RC, quant) in enumerate(groups):
+        medians = _shared(files[edp + ".medians"])
+        dispersions = _shared(files[edp + ".dispersions"])
+        rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(g, i, k, c)))
+        z = rng.standard_normal(stop - start)
+        L = L + CalcLosses(medians[i, k], dispersions[i, k], _shared(files[beta]), _shared(files[theta]),
+                           RC=_shared(files[RC]), quant=_shared(files[quant]), z=z, max_bytes=np.inf,
+                           sort=False)["samples"]  # sample by sample, the groups are independent
+    if samples_file is not None:
+        samples = np.load(samples_file, mmap_mode="r+")
+        samples[i, k, start:stop] = L
+        samples.flush()
+    return L.sum(axis=0), np.square(L).sum(axis=0)
+
+
+def RunLosses(m_drift_ratios, b_SD, Dl=None, Nz=NZ, seed=0, workers=None, chunk=CHUNK, groups=None, edps=None,
+              keep_samples=False, scratch_dir=None):
+    """
+    m_drift_ratios: (num_int, 2, n_floors) median drifts (SplitDirections() turns the MATLAB layout into this)
+    b_SD: (num_int, 2) their dispersions
+    Dl: (num_int,) mean annual probability of each intensity interval, None to skip the annual losses
+    Nz: samples for every intensity and direction
+    workers: processes, defaults to the number of cores; 1 runs everything in this process
+    groups: fragility groups [(edp, theta, beta, RC, quant)], defaults to DRIFT_GROUPS
+    edps: {edp: (medians, dispersions)} for the groups that are not driven by the drifts, e.g. {"accel": (m_accel, b_FA)}
+    keep_samples: also return the sorted losses of every sample (memory mapped, Nz x everything else)
+    scratch_dir: where the shared files are written, a temporary folder that is removed afterwards when None
+
+    returns: dict with "mean" and "std" (num_int, 2, n_floors), "annual" (2, n_floors), "annual_total" (2,), "samples"
+    """
+    groups = DRIFT_GROUPS if groups is None else groups
+    inputs = {"drift": (m_drift_ratios, b_SD)}
+    inputs.update(edps or {})
+    shape = np.shape(m_drift_ratios)
+    num_int, n_floors = shape[0], shape[-1]
+    own_scratch = scratch_dir is None
+    scratch = tempfile.mkdtemp(prefix="losses") if own_scratch else scratch_dir
+    workers = workers or os.cpu_count() or 1
+    try:
+        files = {}
+
+        def share(name, value):
+            files[name] = os.path.join(scratch, name + ".npy")
+            np.save(files[name], np.ascontiguousarray(value, dtype=np.float64))
+            return name
+
+        for edp in set(g[0] for g in groups):
+            medians, dispersions = inputs[edp]
+            share(edp + ".medians", medians)
+            share(edp + ".dispersions", np.broadcast_to(dispersions, np.shape(medians)[:-1]))
+        shared_groups = [(edp, share("g%d.theta" % n, theta), share("g%d.beta" % n, beta), share("g%d.RC" % n, RC),
+                          share("g%d.quant" % n, quant)) for n, (edp, theta, beta, RC, quant) in enumerate(groups)]
+        samples_file = None
+        if keep_samples:
+            samples_file = os.path.join(scratch, "samples.npy")
+            np.lib.format.open_memmap(samples_file, mode="w+", shape=(num_int, 2, Nz, n_floors)).flush()
+
+        units = [(files, shared_groups, i, k, c, start, min(Nz, start + chunk), seed, samples_file)
+                 for i in range(num_int) for k in range(2) for c, start in enumerate(range(0, Nz, chunk))]
+        if workers == 1:
+            sums = [_run_unit(u) for u in units]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                sums = list(pool.map(_run_unit, units, chunksize=max(1, len(units) // (4 * workers))))
+
+        total = np.zeros((num_int, 2, n_floors))
+        total_sq = np.zeros((num_int, 2, n_floors))
+        for unit, (s, sq) in zip(units, sums):  # in unit order, so the rounding does not depend on the workers
+            total[unit[2], unit[3]] += s
+            total_sq[unit[2], unit[3]] += sq
+        mean = total / Nz
+        result = {"mean": mean, "std": np.sqrt(np.maximum(total_sq / Nz - mean ** 2, 0.)), "samples": None}
+        if Dl is not None:
+            result["annual"] = np.einsum("i,ikf->kf", np.ravel(np.asarray(Dl, dtype=np.float64)), mean)
+            result["annual_total"] = result["annual"].sum(axis=1)
+        if keep_samples:
+            samples = np.load(samples_file, mmap_mode="r+")
+            samples.sort(axis=2)
+            # A copy in memory, the scratch folder is about to go
+            result["samples"] = np.array(samples) if own_scratch else samples
+            del samples
+        return result
+    finally:
+        for path in [p for p in _mapped if p.startswith(scratch)]:
+            del _mapped[path]
+        if own_scratch:
+            shutil.rmtree(scratch, ignore_errors=True)
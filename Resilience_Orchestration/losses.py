@@ -0,0 +1,160 @@
+# -------------------------------------------------------------------------------
+# Name:        losses.py
+# Purpose:     FEMA P-58 Monte Carlo repair costs (calc_losses.m and frag_curve.m) in NumPy
+#
+# Created:     10/18/2026
+# Licence:     The University of Notre Dame
+# -------------------------------------------------------------------------------
+
+'''
+Same model as the MATLAB calc_losses function: for every sample z ~ N(0, 1) the drift of each floor is
+mean_drift * exp(z * b_SD), every damage assembly j is in damage state k with probability F_jk - F_j(k+1) where
+F_jk = normcdf(log(D / theta_jk) / beta_jk) (frag_curve.m), and the repair cost of the floor is
+sum over j and k of quant_j * RC_jk * P_jk.
+
+    result = CalcLosses(m_drift_ratios, b_SD, seed=1, Nz=100000)
+    result["mean"][..., floor]            # what calc_losses returns (CT)
+    result["samples"][sample, ..., floor] # the loss distribution, sorted over the samples like L in calc_losses
+
+Instead of one sample and one assembly at a time, the fragility CDFs of all samples x floors x assemblies x damage
+states are evaluated as one broadcast operation, a chunk of samples at a time so that memory stays below max_bytes
+whatever Nz is. The state probabilities are never formed: sum_k RC_k (F_k - F_k+1) = sum_k (RC_k - RC_k-1) F_k, so
+the CDFs are weighted by the cost increments directly. mean_drifts can carry leading dimensions (intensities,
+directions, ...) with one b_SD each, so every calc_losses call of InitResponseDamageModule is done in one go; each
+of them gets its own samples, as in the MATLAB loop. The samples come from a seeded NumPy Generator and are drawn in
+order, so a seed gives the same losses whatever the chunk size. CalcLossesReference() is a line-by-line
+transcription of the .m files; tests/test_losses.py checks that for the same z samples both agree within TOLERANCE
+(relative), sample by sample, and against losses worked out by hand from calc_losses.m for a small case.
+'''
+
+# #!/usr/bin/python
+import time
+import numpy as np
+from scipy.special import ndtr
+
+TOLERANCE = 1e-9  # relative agreement with the scalar reference
+# Fragility data of InitResponseDamageModule.m, one row per damage assembly (exterior wall, OMF),
+# one column per damage state [D1, D2, D3]
+THETA = np.array([[0.4, 2.26, 2.67], [0.0175, 0.0225, 0.0322]])  # median drifts
+BETA = np.array([[0.4, 0.3, 0.25], [0.4, 0.4, 0.4]])  # logarithmic standard deviations
+RC = np.array([[1776.67, 3720, 5460], [27846, 38978.4, 47978.4]])  # average repair cost of each damage state
+QUANT = np.array([8, 4])  # quantity of each damage assembly
+NZ = 1000  # samples per calc_losses call in the MATLAB code
+MAX_BYTES = 64 * 1024 ** 2  # memory for the fragility CDFs of one chunk of samples
+
+
+def FragCurve(D, theta, beta):
+    """
+    frag_curve for any number of demands and assemblies: the probability of reaching each damage state
+    D: demands of any shape, theta, beta: (..., n_states) medians and dispersions
+    returns: D.shape + theta.shape
+    """
+    D = np.asarray(D, dtype=np.float64)
+    with np.errstate(divide="ignore"):  # a zero drift is log(0) = -inf, i.e. no damage
+        return ndtr((np.log(D)[(Ellipsis,) + (None,) * np.ndim(theta)] - np.log(theta)) / beta)
+
+
+def CostIncrements(RC, quant):
+    """quant_j * (RC_jk - RC_j(k-1)): the weights that turn the CDFs of frag_curve straight into a repair cost"""
+    RC = np.asarray(RC, dtype=np.float64)
+    steps = np.diff(RC, axis=-1, prepend=0.)
+    return steps * np.asarray(quant, dtype=np.float64)[:, None]
+
+
+def CalcLosses(mean_drifts, b_SD, beta=BETA, theta=THETA, Nz=NZ, RC=RC, quant=QUANT, seed=None, z=None,
+               max_bytes=MAX_BYTES, keep_samples=True, sort=True):
+    """
+    mean_drifts: (..., n_floors) corrected drift ratios, e.g. m_drift_ratios of median_dispersions transposed
+    b_SD: dispersion of the drifts, broadcastable to mean_drifts.shape[:-1]
+    beta, theta, RC: (Na, n_states) fragility curves and repair costs, quant: (Na,) quantities
+    Nz: number of samples for every drift vector
+    seed: seed of the NumPy Generator (None for a random one)
+    z: (Nz, ...) standard normal samples to use instead of drawing them
+    keep_samples: False keeps only the mean and standard deviation, for sample counts too big to hold
+    sort: False leaves the samples in the order of z, so the losses of several groups can be added sample by sample
+
+    returns: dict with "mean" and "std" (..., n_floors), and "samples" (Nz, ..., n_floors) sorted over the samples
+    """
+    mean_drifts = np.asarray(mean_drifts, dtype=np.float64)
+    batch = mean_drifts.shape[:-1]
+    with np.errstate(divide="ignore"):  # a zero drift is no damage, as in FragCurve
+        log_drifts = np.log(mean_drifts)
+    b_SD = np.broadcast_to(np.asarray(b_SD, dtype=np.float64), batch)
+    weights = CostIncrements(RC, quant)
+    log_theta = np.log(np.asarray(theta, dtype=np.float64))
+    beta = np.asarray(beta, dtype=np.float64)
+    if z is not None:
+        z = np.asarray(z, dtype=np.float64)
+        Nz = z.shape[0]
+    rng = np.random.default_rng(seed) if z is None else None
+
+    per_sample = 8 * mean_drifts.size * log_theta.size
+    chunk = int(max(1, min(Nz, max_bytes // max(per_sample, 1))))
+    samples = np.empty((Nz,) + mean_drifts.shape) if keep_samples else None
+    total = np.zeros(mean_drifts.shape)
+    total_sq = np.zeros(mean_drifts.shape)
+    for start in range(0, Nz, chunk):
+        stop = min(Nz, start + chunk)
+        zc = z[start:stop] if z is not None else rng.standard_normal((stop - start,) + batch)
+        # log D for every sample and floor: (chunk, ..., n_floors)
+        log_D = log_drifts + (zc * b_SD)[..., None]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            F = ndtr((log_D[..., None, None] - log_theta) / beta)  # (chunk, ..., n_floors, Na, n_states)
+        L = np.einsum("...jk,jk->...", F, weights)
+        total += L.sum(axis=0)
+        total_sq += np.square(L).sum(axis=0)
+        if keep_samples:
+            samples[start:stop] = L
+    mean = total / Nz
+    result = {"mean": mean, "std": np.sqrt(np.maximum(total_sq / Nz - mean ** 2, 0.))}
+    if keep_samples:
+        if sort:
+            samples.sort(axis=0)
+        result["samples"] = samples
+    return result
+
+
+def CalcLossesReference(mean_drifts, b_SD, z, beta=BETA, theta=THETA, RC=RC, quant=QUANT):
+    """Scalar transcription of calc_losses.m for one drift vector and the samples z, to check against"""
+    theta = np.asarray(theta, dtype=np.float64)
+    beta = np.asarray(beta, dtype=np.float64)
+    RC = np.asarray(RC, dtype=np.float64)
+    N = theta.shape[1]
+    Na = theta.shape[0]
+    L = np.zeros((len(mean_drifts), len(z)))
+    Td = np.eye(N)
+    for k in range(N - 1):
+        Td[k + 1, k] = -1
+
+    def frag_curve(D, theta, beta):
+        F = np.zeros((len(D), len(theta)))
+        for i in range(len(theta)):
+            F[:, i] = ndtr(np.log(D / theta[i]) / beta[i])
+        return F
+
+    for i in range(len(z)):
+        D = np.asarray(mean_drifts, dtype=np.float64) * np.exp(z[i] * b_SD)
+        for j in range(Na):
+            F = frag_curve(D, theta[j, :], beta[j, :])
+            P = np.dot(Td.T, F.T).T
+            L[:, i] = np.dot(RC[j, :], P.T).T * quant[j] + L[:, i]
+    L = np.sort(L, axis=1)
+    return L.mean(axis=1)
+
+
+if __name__ == "__main__":
+    drifts = np.array([0.004, 0.006, 0.005, 0.003])  # one direction of a four storey building
+    z = np.random.default_rng(0).standard_normal(2000)
+    start = time.time()
+    reference = CalcLossesReference(drifts, 0.35, z)
+    loop = time.time() - start
+    start = time.time()
+    fast = CalcLosses(drifts, 0.35, z=z)["mean"]
+    vectorized = time.time() - start
+    print("reference %.3f s, vectorized %.4f s, largest relative difference %.2e"
+          % (loop, vectorized, np.max(np.abs(fast - reference) / reference)))
+    for Nz in (10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6):
+        start = time.time()
+        result = CalcLosses(np.tile(drifts, (8, 2, 1)), 0.35, Nz=Nz, seed=1, keep_samples=Nz <= 10 ** 5)
+        print("Nz=%-8d 8 intensities x 2 directions  %.3f s  mean loss of floor 1 (x): %.1f"
+              % (Nz, time.time() - start, result["mean"][0, 0, 0]))
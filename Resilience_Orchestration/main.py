@@ -13,6 +13,7 @@
 
 # #!/usr/bin/python
 import sys, os, getopt
+import time
 import json
 import subprocess
 import importlib
@@ -22,6 +23,15 @@ import pandas as pd
 #from GeoLinked.Geo_Link import Geo_Link
 #x = Geo_Link()
 from curves import Curves
+from curve_figures import FigureExporter
+from spline_cache import SplineCache
+from portfolio import ReadPortfolio, RunPortfolio, SiteTable
+from hazard_store import HazardStore
+from engine_pool import SharedEnginePool
+from stages import StageGraph, RunCommand
+from checkpoints import CheckpointStore, FileInput
+from instrument import Tracer, SetTracer, span
+from sweep import Sweep, ReadSweep, ParameterGrid, SweepTable
 import rdflib
 from rdflib import Graph
 from rdflib import URIRef, BNode, Literal
@@ -31,279 +41,442 @@ from rdflib import Namespace
 
 #from pymatlab.matlab import MatlabSession
 from Q_Semantic_Graph import GraphData
+from graph_cache import LoadGraph
+from elements import ElementTable
+from colvol import calctablevolumes
+from embodied import EmbodiedImpacts, ImpactTable, SCENARIOS
+from ifc_structure import ReadIfcStructure
 
-#Instead of using pymatlab, we will use the methods under the MATLAB API for Python:
-import matlab.engine
+#Instead of using pymatlab, we will use the methods under the MATLAB API for Python (the engines come from engine_pool):
 import numpy as np
 
 #######################################################################################################################
 #########################################BEGIN HAZARD MODULE###########################################################
 
-def ReadHazardData(model_names,base_directory):
+def ReadHazardData(model_names,base_directory,cache_dir=None):
     """
     modelnames: MUST be same as subdirectory names, or else all hell breaks loose
     base_directory: curves folders generated using the hazard model from USGS
-    """
-    hazard_data = {} # {city_name: model:[(X1, Y1), ...] }
-    for _model in model_names:
-        print(_model)
-        f = os.path.join(base_directory ,_model,"total.csv")
-        df = pd.read_csv(f,header=None) #read in the total.csv file as a dataframe in pandas
-        df.drop(df.columns[[1,2]],inplace=True,axis=1) #drop the lat and long
-        city_names = df.iloc[:,0].values.tolist()[1:] # all values after the first row are city names
-        X = df.iloc[0,1:].values.tolist() #all x values
-        for i,c in enumerate(city_names):
-            Y = df.iloc[(i+1),1:]
-            if c in hazard_data:
-                hazard_data[c][_model] = zip(X,Y) #ignore the type assertion for now
-            else:
-                hazard_data[c] = {_model:zip(X,Y)}
-    return hazard_data
-
-def main(argv, other_stuff=0):
-    print "==================================================================================="
-    print "Orchestration Main Started"
-    print("################# COLLECTING HAZARD INFORMATION ##################")
-    print("Gathering data from USGS")
-    # Take USGS data sets (3 curves) for a location and get back........................................................
-    basedir = "C:\\Users\\Karen\\Desktop\\USGS_Resilience-master\\USGS_Resilience-master\\nshmp-haz-master\\curve-making-code\\curves_east_donotmodify"
-    #models = ["PGA"] #changed this from line below since we are only asking for one intensity measure (imt)
-    models = ["PGA","SA0P2","SA1P0"] #different types of hazard models used
-    #read all files
-    cityhazardfunctions = ReadHazardData(models,basedir) # nested dict. {city: {model: (X,Y) }}
-    #print(json.dumps(cityhazardfunctions,indent=4)) #print to debug if something goes horrendously wrong
-    curv = Curves()
-    city_splines = curv.querycurves(cityhazardfunctions,savefigs=True)
-    # To get the y values for a given list of x's, set these values
-    # So, you will set the location from the curve sets we have already generated
-    # (for locaiotns we have either see the folders ehre or see the USGS files and sitesE.geojson and sitesW.geojson)
-    # The models we have access to set (so the middle term here) without further editing the USGS tool are on line 51 above
-    #demo_x = [0.42] #[0.1, 0.2, 0.3, 0.4, 0.5] # So this would be some set of x values you want the cooresponding y values for
-
-    #DEFINE HAZARDS.....................................................................................................
-    #Here is where we are going to pull data from the USGS Hazard Curves for PGA, SA1, SA02
-    #Essentially, we will be passing vectors into MATLAB for the three curves
-    #The "x" subscript refers to spectral acceleration being on the x-axis of the hazard curves
-    #The "y" subscript refers to the values for the annual rate of exceedance for the specified spectral accelerations
-    #Since we will be interpolating between three hazard curves within MATLAB, we ask for all data from USGS (i.e. given the initial USGS data points, we are performing a linear interpolation per curve (these are the values we are getting back in this call to city_splines), then we will interpolate over the three hazard curves in MATLAB)
-
-
-    #We will begin with PGA for the specified location: Chicago IL
-    values=city_splines["Chicago IL"]["PGA"]
-    PGAx=matlab.double(list(values[0])) #Spectral acceleration values
-    PGAy=matlab.double(list(values[1])) #Annual Rate of Exceedance values (Note: these values need to be converted in MATLAB)
-    #print(type(PGAx),type(PGAy)) #if uncommented, this will verify that the conversion to a matlab.mlarray.double class was successful
-
-    #Now we repeat the above procedure for SA1, our spectral acceleration for 1.0 second period:
-    values = city_splines["Chicago IL"]["SA1P0"]
-    SA1x = matlab.double(list(values[0]))  # Spectral acceleration values
-    SA1y = matlab.double(list(values[1]))  # Annual Rate of Exceedance values (Note: these values need to be converted in MATLAB)
-
-    #One more time for SA02, our spectral acceleration for 0.2 second period:
-    values = city_splines["Chicago IL"]["SA0P2"]
-    SA02x = matlab.double(list(values[0]))  # Spectral acceleration values
-    SA02y = matlab.double(list(values[1]))  # Annual Rate of Exceedance values (Note: these values need to be converted in MATLAB)
+    cache_dir: where the binary copies of the total.csv files are kept (defaults to a folder inside base_directory)
 
+    returns: HazardStore, which is indexed like the nested dict {city_name: {model: (X, Y) }}
+    """
+    if cache_dir is None:
+        cache_dir = os.path.join(base_directory, "_cache")
+    hazard_data = HazardStore(cache_dir) # one sites x IM levels array per model, plus site names and lat/lon
+    return hazard_data.load(model_names, base_directory)
+
+def main(argv, other_stuff=0, engines=None):
+    print("===================================================================================")
+    print("Orchestration Main Started")
+    #Portfolio mode: main.py --portfolio=sites.csv runs this building for every site (and soil class) listed in the file
+    #Stage outputs are checkpointed in --checkpoints=folder (default: checkpoints); --invalidate=modal,response runs those stages again regardless
+    #Wall time, CPU time and peak memory of every stage and external call go to --trace=file.jsonl (default: traces/run-<date>-<time>.jsonl)
+    #Sweep mode: --sweep=grid.json runs every combination of the parameters in the file ({"Frame_type": ["Moment", "Braced"], ...}),
+    #--workers=N at a time, and writes one table with all of them to grid_results.csv; see parameters and PARAMETER_STAGES below for what can be swept
+    #(--workers is also the number of sites a portfolio runs at the same time)
+    portfolio = None
+    sweep_file = None
+    workers = 4
+    checkpoint_dir = "checkpoints"
+    invalidate = []
+    trace_file = os.path.join("traces", "run-" + time.strftime("%Y%m%d-%H%M%S") + ".jsonl")
+    opts, args = getopt.getopt(argv, "p:", ["portfolio=", "checkpoints=", "invalidate=", "trace=", "sweep=", "workers="])
+    for opt, arg in opts:
+        if opt in ("-p", "--portfolio"):
+            portfolio = ReadPortfolio(arg)
+        elif opt == "--checkpoints":
+            checkpoint_dir = arg
+        elif opt == "--invalidate":
+            invalidate = [name.strip() for name in arg.split(",") if name.strip()]
+        elif opt == "--trace":
+            trace_file = arg
+        elif opt == "--sweep":
+            sweep_file = arg
+        elif opt == "--workers":
+            workers = int(arg)
+    tracer = Tracer(trace_file)
+    previous_tracer = SetTracer(tracer)
+    site = portfolio[0][0] if portfolio else "Chicago IL" #the building-dependent stages are run with the first site
+    matlab_dir=r'D:\Users\Karen\Documents\MATLAB\RSB\GreenResilienceMATLAB_2' #Here you specify path to folder where m-file is located
+    #MATLAB takes a while to start, so the engine is started now in the background and is warm by the time the hazard module needs it.
+    #The same pool is reused by every main() call in this Python process; pass engines=EnginePool(..., backend=StubBackend(...)) to run without MATLAB
+    if engines is None:
+        engines = SharedEnginePool(matlab_dir)
+    double = engines.backend.double #matlab.double
+    #A stage whose inputs (files and parameters) have not changed since it last finished is loaded instead of run, so a crashed run resumes where it stopped
+    checkpoints = CheckpointStore(checkpoint_dir, invalidate, backend=engines.backend)
     num_int=float(8) #here we are defining how many intervals (levels of intensity)
 
     #Last thing: we are going to specify our Soil_Site_class for this site:
-    Soil_Site_class='B'
+    Soil_Site_class=portfolio[0][1] if portfolio else 'B'
+    if sweep_file and portfolio:
+        print("Could not sweep a portfolio, the sweep runs for " + site + " only")
+        portfolio = None
+
+    #The parameters of the modal and response stages; a sweep replaces some of them for each grid point.
+    #The sweep works out from PARAMETER_STAGES which stages each one reaches, e.g. Soil_Site_class and Frame_type only rerun the response stage
+    parameters = {"num_int": num_int, "Soil_Site_class": Soil_Site_class,
+                  "Frame_type": 'Moment', #here we are defining the type of frame we are analyzing
+                  "frame_wall_flag": 1, #Ask the user if they need to import wall information for frame systems: 0==false, 1==true
+                  "struct_wall_flag": 1, #Ask the user if they need to consider structural walls: 0==false, 1==true
+                  "wall_type": 'Masonry', #This is a query to ask what kind of wall system is being used (leaving as a user-defined option so that we can create a library of options in the future)
+                  #Here is the material information we would need from Revit in order to do this:
+                  "E": 0.4*3372.13, #The modulus of elasticity in ksi
+                  "u": 0.17, #Poisson's ratio
+                  "a": 0.00001, #The thermal coefficient
+                  "rho": 150.28} #material density in lb/ft^3 (not an input of InitHazardModule yet, so sweeping it changes nothing)
+    PARAMETER_STAGES = {"modal": ["num_int", "frame_wall_flag", "struct_wall_flag", "wall_type", "E", "u", "a"],
+                        "response": ["num_int", "Soil_Site_class", "Frame_type"]}
+
+    # Hazard stage......................................................................................................
+    def hazard_stage():
+        print("################# COLLECTING HAZARD INFORMATION ##################")
+        print("Gathering data from USGS")
+        # Take USGS data sets (3 curves) for a location and get back........................................................
+        basedir = "C:\\Users\\Karen\\Desktop\\USGS_Resilience-master\\USGS_Resilience-master\\nshmp-haz-master\\curve-making-code\\curves_east_donotmodify"
+        #models = ["PGA"] #changed this from line below since we are only asking for one intensity measure (imt)
+        models = ["PGA","SA0P2","SA1P0"] #different types of hazard models used
+        #read all files
+        cityhazardfunctions = ReadHazardData(models,basedir) # nested dict. {city: {model: (X,Y) }}
+        #print(json.dumps(cityhazardfunctions,indent=4)) #print to debug if something goes horrendously wrong
+        curv = Curves()
+        figure_exporter = FigureExporter(directory="figures", dpi=500, fmt="png", sites=[site]) #figures are drawn in the background while we keep going
+        spline_cache = SplineCache(os.path.join(basedir, "_splines"), max_bytes=50*1024**2, max_age=30*24*3600) #splines fitted on earlier runs are reused as long as the USGS data has not changed
+        city_splines = curv.querycurves(cityhazardfunctions,savefigs=figure_exporter,cache=spline_cache)
+        # To get the y values for a given list of x's, set these values
+        # So, you will set the location from the curve sets we have already generated
+        # (for locaiotns we have either see the folders ehre or see the USGS files and sitesE.geojson and sitesW.geojson)
+        # The models we have access to set (so the middle term here) without further editing the USGS tool are on line 51 above
+        #demo_x = [0.42] #[0.1, 0.2, 0.3, 0.4, 0.5] # So this would be some set of x values you want the cooresponding y values for
+
+        #DEFINE HAZARDS.....................................................................................................
+        #Here is where we are going to pull data from the USGS Hazard Curves for PGA, SA1, SA02
+        #Essentially, we will be passing vectors into MATLAB for the three curves
+        #The "x" subscript refers to spectral acceleration being on the x-axis of the hazard curves
+        #The "y" subscript refers to the values for the annual rate of exceedance for the specified spectral accelerations
+        #Since we will be interpolating between three hazard curves within MATLAB, we ask for all data from USGS (i.e. given the initial USGS data points, we are performing a linear interpolation per curve (these are the values we are getting back in this call to city_splines), then we will interpolate over the three hazard curves in MATLAB)
+
+
+        #We will begin with PGA for the specified location: Chicago IL
+        values=city_splines[site]["PGA"]
+        PGAx=double(list(values[0])) #Spectral acceleration values
+        PGAy=double(list(values[1])) #Annual Rate of Exceedance values (Note: these values need to be converted in MATLAB)
+        #print(type(PGAx),type(PGAy)) #if uncommented, this will verify that the conversion to a matlab.mlarray.double class was successful
+
+        #Now we repeat the above procedure for SA1, our spectral acceleration for 1.0 second period:
+        values = city_splines[site]["SA1P0"]
+        SA1x = double(list(values[0]))  # Spectral acceleration values
+        SA1y = double(list(values[1]))  # Annual Rate of Exceedance values (Note: these values need to be converted in MATLAB)
+
+        #One more time for SA02, our spectral acceleration for 0.2 second period:
+        values = city_splines[site]["SA0P2"]
+        SA02x = double(list(values[0]))  # Spectral acceleration values
+        SA02y = double(list(values[1]))  # Annual Rate of Exceedance values (Note: these values need to be converted in MATLAB)
+        print("Hazard curves fitted: " + str(city_splines.fits) + ", loaded from cache: " + str(spline_cache.hits)) #splines are only fitted for the sites we actually asked for
+        return {"cityhazardfunctions": cityhazardfunctions, "figure_exporter": figure_exporter,
+                "PGAx": PGAx, "PGAy": PGAy, "SA1x": SA1x, "SA1y": SA1y, "SA02x": SA02x, "SA02y": SA02y}
+
+
 
     #Now that we have all of the data we need from our Hazard Curves, we will continue so that we can construct the Semantic Graph and query elevation information
     #...................................................................................................................
 
-    # Construct Semantic Graph..........................................................................................
-    print("Constructing Semantic Graph")
-    # Currently using locally stored files, will need to add this API automation from my scrips from Drive
-    # Note, in script, will need to reset the location of the stored file to be findable by these next lines
-    #inputfileIFCXML = Call API script using IronPython
-    inputfileIFCXML = 'C:/Users/Karen/Desktop/Resilience_Orchestration-master/Resilience_Orchestration-master/TempXMLs/bRC_FRAME_Concrete_allComponents.ifcxml'
-    outputpath='output.csv'
-    material_flag = 0
-    level_flag = 0
-    structure_flag = 0
-    puncture_flag = 0
-    test_query_sequence_flag = 0
-    SemanticGraph_InitialRun = 0
-    # Currently using locally stored files, will need to add this API automation from my scrips from Drive
-    #geo_link = Geo_Link()
-    #geo_link.inputfile = os.path.abspath(inputfileIFCXML)
-    #geo_link.material_flag = material_flag
-    #geo_link.level_flag = level_flag
-    #geo_link.structure_flag = structure_flag
-    #geo_link.puncture_flag = puncture_flag
-    #geo_link.test_query_sequence_flag = test_query_sequence_flag
-    #geo_link.run()
-    # Alternatively, a method like this may work, but will need some tweeking as this is done seperately at this point
-    mylist_of_parameters = [str(inputfileIFCXML) + " " + str(outputpath) + " " + str(material_flag) + " " + str(level_flag) + " " + str(structure_flag) + " " + str(puncture_flag) + " " + str(test_query_sequence_flag)]
-    subprocess.call(["python", "C:/Users/Karen/Desktop/GeoLinked_HollyFerguson-master/GeoLinked_HollyFerguson-master/GeoLmain.pyc", str(inputfileIFCXML), str(outputpath), str(material_flag), str(level_flag), str(structure_flag), str(puncture_flag), str(test_query_sequence_flag) ])
-    #subprocess.call(["python", "C:/Users/hfergus2/Desktop/GeoLinked/GeoLmain.py", "--args", str(inputfileIFCXML), str(outputpath), str(material_flag), str(level_flag), str(structure_flag), str(puncture_flag), str(test_query_sequence_flag) ])
-    #USO_new = USOmain(inputfileIFCXML, outputpath, material_flag, level_flag, structure_flag, puncture_flag, test_query_sequence_flag)
-    print "Storing Graph"
-    #store it somewhere...currently we are saving it and accessing it from here: "C:/Users/holly/Desktop/GeoLinked/FinalGraph/MyGraph.ttl"
-    #note: make sure to run the specific ifcxml in Geolinked so that the graph is available in the .ttl file specified above before running the orchestration code
-
-    # Query Semantic Graph..............................................................................
-    # Now we want to get data from my graph
-    # NOTE: more queries will probably have to be written.
-    # If you go to this path where the graph serialization was stored, currenlty left in the single room model at the time of this code
-    # Then you can see the triples that were able to be pulled out of the GeoLinked project:
-    #           "C:/Users/holly/Desktop/GeoLinked/FinalGraph/MyGraph.ttl"
-    # If you run other models, they will replace this file above, but if you need multiple runnin,
-    # then a versioning system will have to added to the processing, probably back in the GeoLinked Project or running GeoLinked from here
-    # For now, this is the process of pulling levels and spaces from the models with SPARQL queries:
-    #NOTE: FOR THIS OUTPUT FILE WE NEED TO RUN GEOLINKED WITH THE CORRECT MODEL TO BEGIN WITH
-    outputfile = 'C:/Users/Karen/Desktop/GeoLinked_HollyFerguson-master/GeoLinked_HollyFerguson-master/FinalGraph/MyGraph.ttl'  # From the top folder and in FinalGraph
-    SGA_Based_Graph = Graph()
-    SGA_Based_Graph = SGA_Based_Graph.parse(outputfile, format="turtle")
-    #SGA_Based_Graph.serialize(destination=outputfile, format='turtle')
-    graph_data = GraphData()
-    # I have added a few examples of how you might collect a certain type of data from the graph
-    # You will need to add more queries that retrieve and format the information as you see fit per the project needs
-
-    # If uncommented, will print all data in graph so you can learn the structure and what you can and cannot ask it for
-    #print "Running All Data Example Query"
-    #graph_data.get_all_data(SGA_Based_Graph)
-
-    # If uncommented, will return levels in the building and their heights as a dict: [spaceBoundary: (list of data)]
-    # Note: this was modified so that the variable "a" will give us all level information...to see this, uncomment print a in the for loop below
-    #print "Running Levels Example Query"
-    print("Gathering elevations from graph")
-    levels = graph_data.get_levels(SGA_Based_Graph)  # Just copying MyGraph.ttl from other project for now
-    a=dict() #this is just here to make sure that we are storing values so that we can filter through our data for when we are querying elevations
-    elevations=list()
-    for i in levels:
-        a=i, len(levels[i]), levels[i] #if we print a, this will give us the full graph for level data
-        #print (a)
-        value_list=a[2]
-        for j in range(len(value_list)): #
-            #The idea here is to filter out elevation (z) coordinates by recognizing that these values can be converted into float() type numbers:
-            try:
-                elevations.append(float(value_list[j])*12) #making sure that we are in inches
-            except ValueError:
-                pass
-
-    elev=matlab.double(sorted(set(elevations))) #Here we pull unique values from our list and then put them in ascending order
-    print("Here are the elevations",elev) #this is here to make sure that we got the correct data
-
-    # If uncommented, will return spaces in their respective building if multi-building: [space_collection: (list of spaces)]
-    #print "Running Spaces Example Query"
-    #spaces1 = graph_data.get_spaces(SGA_Based_Graph)  # Just copying MyGraph.ttl from other project for now
-    #for i in spaces1:
-        #print i, len(spaces1[i]), spaces1[i]
-
-    #This calls the queries which give us back the spatial information from the ifcxml for beams and columns in our model:
-    Column_info=graph_data.get_dim_columns(SGA_Based_Graph)
-    Beam_info = graph_data.get_dim_beams(SGA_Based_Graph)
+    def graph_stage():
+        # Construct Semantic Graph..........................................................................................
+        print("Constructing Semantic Graph")
+        # Currently using locally stored files, will need to add this API automation from my scrips from Drive
+        # Note, in script, will need to reset the location of the stored file to be findable by these next lines
+        #inputfileIFCXML = Call API script using IronPython
+        inputfileIFCXML = 'C:/Users/Karen/Desktop/Resilience_Orchestration-master/Resilience_Orchestration-master/TempXMLs/bRC_FRAME_Concrete_allComponents.ifcxml'
+        outputpath='output.csv'
+        material_flag = 0
+        level_flag = 0
+        structure_flag = 0
+        puncture_flag = 0
+        test_query_sequence_flag = 0
+        SemanticGraph_InitialRun = 0
+        ifc_fast_path = 0 #1: read levels, columns and beams straight from the ifcxml; 0: run GeoLinked and query MyGraph.ttl
+        #(keep 0 until the fast path matches a GeoLinked graph of the same ifcxml, see tests/test_ifc_structure.py)
+        graph_key = checkpoints.key("graph", FileInput(inputfileIFCXML), ifc_fast_path)
+        found, graph = checkpoints.load("graph", graph_key)
+        if found:
+            return graph
+        # Currently using locally stored files, will need to add this API automation from my scrips from Drive
+        #geo_link = Geo_Link()
+        #geo_link.inputfile = os.path.abspath(inputfileIFCXML)
+        #geo_link.material_flag = material_flag
+        #geo_link.level_flag = level_flag
+        #geo_link.structure_flag = structure_flag
+        #geo_link.puncture_flag = puncture_flag
+        #geo_link.test_query_sequence_flag = test_query_sequence_flag
+        #geo_link.run()
+        # Alternatively, a method like this may work, but will need some tweeking as this is done seperately at this point
+        if ifc_fast_path:
+            #python ifc_structure.py <ifcxml> <MyGraph.ttl> and tests/test_ifc_structure.py check that both ways give the same levels, columns and beams
+            components = ReadIfcStructure(inputfileIFCXML)
+        else:
+            mylist_of_parameters = [str(inputfileIFCXML) + " " + str(outputpath) + " " + str(material_flag) + " " + str(level_flag) + " " + str(structure_flag) + " " + str(puncture_flag) + " " + str(test_query_sequence_flag)]
+            RunCommand(["python", "C:/Users/Karen/Desktop/GeoLinked_HollyFerguson-master/GeoLinked_HollyFerguson-master/GeoLmain.pyc", str(inputfileIFCXML), str(outputpath), str(material_flag), str(level_flag), str(structure_flag), str(puncture_flag), str(test_query_sequence_flag) ], "GeoLinked") #output is captured, the other stages keep going meanwhile
+            #subprocess.call(["python", "C:/Users/hfergus2/Desktop/GeoLinked/GeoLmain.py", "--args", str(inputfileIFCXML), str(outputpath), str(material_flag), str(level_flag), str(structure_flag), str(puncture_flag), str(test_query_sequence_flag) ])
+            #USO_new = USOmain(inputfileIFCXML, outputpath, material_flag, level_flag, structure_flag, puncture_flag, test_query_sequence_flag)
+            print("Storing Graph")
+            #store it somewhere...currently we are saving it and accessing it from here: "C:/Users/holly/Desktop/GeoLinked/FinalGraph/MyGraph.ttl"
+            #note: make sure to run the specific ifcxml in Geolinked so that the graph is available in the .ttl file specified above before running the orchestration code
+
+            # Query Semantic Graph..............................................................................
+            # Now we want to get data from my graph
+            # NOTE: more queries will probably have to be written.
+            # If you go to this path where the graph serialization was stored, currenlty left in the single room model at the time of this code
+            # Then you can see the triples that were able to be pulled out of the GeoLinked project:
+            #           "C:/Users/holly/Desktop/GeoLinked/FinalGraph/MyGraph.ttl"
+            # If you run other models, they will replace this file above, but if you need multiple runnin,
+            # then a versioning system will have to added to the processing, probably back in the GeoLinked Project or running GeoLinked from here
+            # For now, this is the process of pulling levels and spaces from the models with SPARQL queries:
+            #NOTE: FOR THIS OUTPUT FILE WE NEED TO RUN GEOLINKED WITH THE CORRECT MODEL TO BEGIN WITH
+            outputfile = 'C:/Users/Karen/Desktop/GeoLinked_HollyFerguson-master/GeoLinked_HollyFerguson-master/FinalGraph/MyGraph.ttl'  # From the top folder and in FinalGraph
+            SGA_Based_Graph = LoadGraph(outputfile) #parses the Turtle the first time, later runs load the binary copy kept next to it
+            #SGA_Based_Graph.serialize(destination=outputfile, format='turtle')
+            graph_data = GraphData()
+            # I have added a few examples of how you might collect a certain type of data from the graph
+            # You will need to add more queries that retrieve and format the information as you see fit per the project needs
+
+            # If uncommented, will print all data in graph so you can learn the structure and what you can and cannot ask it for
+            #print "Running All Data Example Query"
+            #graph_data.get_all_data(SGA_Based_Graph)
+
+            # If uncommented, will return levels in the building and their heights as a dict: [spaceBoundary: (list of data)]
+            # Note: this was modified so that the variable "a" will give us all level information...to see this, uncomment print a in the for loop below
+            #print "Running Levels Example Query"
+            print("Gathering elevations from graph")
+            #get_components indexes the graph once and gives back the same dicts as get_levels, get_spaces, get_dim_columns and get_dim_beams
+            components = graph_data.get_components(SGA_Based_Graph)
+        levels = components["levels"]  # Just copying MyGraph.ttl from other project for now
+        a=dict() #this is just here to make sure that we are storing values so that we can filter through our data for when we are querying elevations
+        elevations=list()
+        for i in levels:
+            a=i, len(levels[i]), levels[i] #if we print a, this will give us the full graph for level data
+            #print (a)
+            value_list=a[2]
+            for j in range(len(value_list)): #
+                #The idea here is to filter out elevation (z) coordinates by recognizing that these values can be converted into float() type numbers:
+                try:
+                    elevations.append(float(value_list[j])*12) #making sure that we are in inches
+                except ValueError:
+                    pass
+
+        elev=double(sorted(set(elevations))) #Here we pull unique values from our list and then put them in ascending order
+        print("Here are the elevations",elev) #this is here to make sure that we got the correct data
+
+        # If uncommented, will return spaces in their respective building if multi-building: [space_collection: (list of spaces)]
+        #print "Running Spaces Example Query"
+        #spaces1 = graph_data.get_spaces(SGA_Based_Graph)  # Just copying MyGraph.ttl from other project for now
+        #for i in spaces1:
+            #print i, len(spaces1[i]), spaces1[i]
+
+        #This calls the queries which give us back the spatial information from the ifcxml for beams and columns in our model:
+        Column_info=components["columns"]
+        Beam_info = components["beams"]
+        #The geometry comes back as stringified Python lists, so we parse all of it once into one table (a row per element):
+        element_table, element_errors = ElementTable(Column_info, Beam_info)
+        print("Structural elements from graph:", len(element_table), "unreadable:", len(element_errors))
+        graph = {"elev": elev, "components": components, "element_table": element_table, "element_errors": element_errors}
+        checkpoints.save("graph", graph_key, graph)
+        return graph
+
 
 
     #Embodied energy of structural components:
-    #First we need to filter through our dictionaries to find the spatial info we need:
-
-
-    # Call Green Scale..................................................................................................
-    # Running t-he GS Tool (it has been updated to 2016 Revit) will need to be added as this project progresses
-    GreenScale_InitialRun = 0  # Change flag once first run is complete
-    # Currently using locally stored files, will need to add this API automation from my scrips from Drive
-    # Note, in script, will need to reset the location of the stored file to be findable by this next lines
-    # inputfileGBXML = Call API script using IronPython
-    # inputfileGBXML = 'C:/Users/Karen/Desktop/Resilience_Orchestration-master/Resilience_Orchestration-master/TempXMLs/bRC_FRAME_Concrete_allComponents.ifcxml'
-    # Call GS Code (will run Thermal and EE), will want to store results plus return a dictinoary of EE values
-
-    # Call Green Scale without Revit API:
-    print "==================================================================================="
-    print('################ INITIAL SUSTAINABILITY ASSESSMENT #################')
-    print('Running GreenScale')
-    inputfile = 'D:/Users/Karen/Documents/Revit 2016/GreenScale Trials/RC_FRAME.xml'
-    outputpath = 'C:/Users/Karen/Desktop/GreenScale Project/GreenScale Project/Installer/GS/Output/'
-    model_flag = '3'
-    dev_flag = "1"
-    shadowflag = "0"
-    locationfile = 'C:/Users/Karen/Desktop/GreenScale Project/GreenScale Project/Installer/GS/Locations/USA_IL_Chicago-OHare.Intl.AP.725300_TMY31.epw'
-    subprocess.call(["python", "C:/Users/Karen/Desktop/GreenScale Project/GreenScale Project/Installer/GS/main.py", str(inputfile),str(outputpath), str(model_flag), str(dev_flag), str(shadowflag), str(locationfile)])
-    print "==================================================================================="
-    print "==================================================================================="
-
-
-    # Query for pre-analysis Matlab Module..............................................................................
-    print('################ MODAL ANALYSIS #################')
-    print("Beginning MATLAB-SAP API: Modal Analysis")
-    # Call Matlab Modules as needed:
-    #We call one function, InitHazardModule, in order to conduct the following:
-    #(1) Pre-analysis: Modal analysis in SAP --> gives us modal analysis information for ELFM as well as connectivity information. Sets up boundary conditions.
-    #(2) Values for spectral accelerations in the x and y for num_int number of intensities as per FEMA Simplified Analysis Procedures
-    #(3) Calculation of Equivalent Lateral Forces for Response Module
-
-    eng=matlab.engine.start_matlab() #start MATLAB engine for Python
-    eng.cd(r'D:\Users\Karen\Documents\MATLAB\RSB\GreenResilienceMATLAB_2') #Here you specify path to folder where m-file is located
-    #Define input variables for the MATLAB function:
-    FilePath='D:\Users\Karen\Documents\Revit 2017\RC_FRAME' #this is the file path to the full RC Model, needed for pre-analysis function
-    units=3 #Define units:
-    #These are all of the possible unit combinations:
-    #lb,in,F=1  lb,ft,F=2   kip,in,F=3  kip,ft,F=4
-    #kN,mm,C=5  kN,m,C=6    kgf,mm,C=7  kgf,m,C=8
-    #N,mm,C=9   N,m,C=10    Ton,mm,C=11 Ton,m,C=12
-    #kN,cm,C=13 kgf,cm,C=14 N,cm,C=15   Ton,cm,C=16
-
-    #User queries to consider wall properties for a frame system:
-    frame_wall_flag=1 #Ask the user if they need to import wall information for frame systems: 0==false, 1==true
-
-    #User queries if the structural system is a wall system:
-    struct_wall_flag=1 #Ask the user if they need to consider structural walls: 0==false, 1==true
-    wall_type='Masonry' #This is a query to ask what kind of wall system is being used (leaving as a user-defined option so that we can create a library of options in the future)
-    #Here is the material information we would need from Revit in order to do this:
-    E=0.4*3372.13 #The modulus of elasticity in ksi
-    u=0.17 #Poisson's ratio
-    a=0.00001 #The thermal coefficient
-    rho=150.28 #material density in lb/ft^3
-
-    #Changes here: We are changing the calculation of ELFs so that we only perform one calculation and scale it based on our base shear value
-    FrameObjNames,JointCoords, FrameJointConn, FloorConn, WallConn, T1,hj, mass_floor, weight,Sw,FilePathResponse,lfm,Dl,Sax,Say,Fj,PGA,Sa_1=eng.InitHazardModule(FilePath,units,elev,PGAx,PGAy,SA1x,SA1y,SA02x,SA02y,num_int,frame_wall_flag,struct_wall_flag,wall_type,E,u,a,nargout=18) #here, the format is as follows: output1, output2, etc=eng.NameOfMFile(Input1,Input2,etc), nargout refers to number of outputs
-    print("Results: Hazard Module")
-    print("Connectivity Data From SAP:")
-    print("Joint Names and Coordinates:",JointCoords)
-    print("Frame and Joint Connectivity:",FrameJointConn)
-    print("Floor and Joint Connectivity:",FloorConn)
-    print("Wall and Joint Connectivity:",WallConn)
-    print("Information from Modal Analysis:")
-    print("Period in the x and y:",T1)
-    print("mass per floor:",mass_floor)
-    print("total weight of structure:",weight)
-    print("seismic weight:",Sw)
-    print("Equivalent Lateral Forces:")
-    print(Fj)
-    print("PGA:",PGA)
-    print("Sa_1:",Sa_1)
-    print("END OF HAZARD MODULE")
-    print "==================================================================================="
+    #The volumes of the columns and beams in the element table are joined to the material database of embodied.py,
+    #every material scenario in SCENARIOS (concrete grades, steel sections) is evaluated in the same call:
+    def embodied_stage(graph):
+        print('################ EMBODIED ENERGY OF STRUCTURAL COMPONENTS #################')
+        try:
+            volumes, volume_errors = calctablevolumes(graph["element_table"])
+        except (IOError, OSError) as e:
+            print("Could not compute the member volumes: " + str(e)) #e.g. the W section catalogue is not on this machine
+            return None
+        embodied = EmbodiedImpacts(graph["element_table"], volumes, SCENARIOS, levels=graph["components"]["levels"])
+        print("Members without a volume:", embodied["missing"])
+        print("Embodied energy (MJ):")
+        print(ImpactTable(embodied, "energy"))
+        print("Embodied carbon (kgCO2e):")
+        print(ImpactTable(embodied, "carbon"))
+        return embodied
+
+
+    def greenscale_stage():
+        # Call Green Scale..................................................................................................
+        # Running t-he GS Tool (it has been updated to 2016 Revit) will need to be added as this project progresses
+        GreenScale_InitialRun = 0  # Change flag once first run is complete
+        # Currently using locally stored files, will need to add this API automation from my scrips from Drive
+        # Note, in script, will need to reset the location of the stored file to be findable by this next lines
+        # inputfileGBXML = Call API script using IronPython
+        # inputfileGBXML = 'C:/Users/Karen/Desktop/Resilience_Orchestration-master/Resilience_Orchestration-master/TempXMLs/bRC_FRAME_Concrete_allComponents.ifcxml'
+        # Call GS Code (will run Thermal and EE), will want to store results plus return a dictinoary of EE values
+
+        # Call Green Scale without Revit API:
+        print("===================================================================================")
+        print('################ INITIAL SUSTAINABILITY ASSESSMENT #################')
+        print('Running GreenScale')
+        inputfile = 'D:/Users/Karen/Documents/Revit 2016/GreenScale Trials/RC_FRAME.xml'
+        outputpath = 'C:/Users/Karen/Desktop/GreenScale Project/GreenScale Project/Installer/GS/Output/'
+        model_flag = '3'
+        dev_flag = "1"
+        shadowflag = "0"
+        locationfile = 'C:/Users/Karen/Desktop/GreenScale Project/GreenScale Project/Installer/GS/Locations/USA_IL_Chicago-OHare.Intl.AP.725300_TMY31.epw'
+        returncode, output = RunCommand(["python", "C:/Users/Karen/Desktop/GreenScale Project/GreenScale Project/Installer/GS/main.py", str(inputfile),str(outputpath), str(model_flag), str(dev_flag), str(shadowflag), str(locationfile)], "GreenScale") #runs next to the other stages, its console output is kept in output
+        print("===================================================================================")
+        print("===================================================================================")
+        return returncode
+
+
+
+    def modal_stage(hazard, graph, params=parameters):
+        # Query for pre-analysis Matlab Module..............................................................................
+        print('################ MODAL ANALYSIS #################')
+        print("Beginning MATLAB-SAP API: Modal Analysis")
+        # Call Matlab Modules as needed:
+        #We call one function, InitHazardModule, in order to conduct the following:
+        #(1) Pre-analysis: Modal analysis in SAP --> gives us modal analysis information for ELFM as well as connectivity information. Sets up boundary conditions.
+        #(2) Values for spectral accelerations in the x and y for num_int number of intensities as per FEMA Simplified Analysis Procedures
+        #(3) Calculation of Equivalent Lateral Forces for Response Module
+
+        elev=graph["elev"]
+        PGAx, PGAy, SA1x, SA1y, SA02x, SA02y = [hazard[k] for k in ("PGAx", "PGAy", "SA1x", "SA1y", "SA02x", "SA02y")]
+        #Define input variables for the MATLAB function:
+        FilePath=r'D:\Users\Karen\Documents\Revit 2017\RC_FRAME' #this is the file path to the full RC Model, needed for pre-analysis function
+        units=3 #Define units:
+        #These are all of the possible unit combinations:
+        #lb,in,F=1  lb,ft,F=2   kip,in,F=3  kip,ft,F=4
+        #kN,mm,C=5  kN,m,C=6    kgf,mm,C=7  kgf,m,C=8
+        #N,mm,C=9   N,m,C=10    Ton,mm,C=11 Ton,m,C=12
+        #kN,cm,C=13 kgf,cm,C=14 N,cm,C=15   Ton,cm,C=16
+
+        #User queries to consider wall properties for a frame system and the wall material (see parameters above):
+        num_int=float(params["num_int"])
+        frame_wall_flag=int(params["frame_wall_flag"])
+        struct_wall_flag=int(params["struct_wall_flag"])
+        wall_type=str(params["wall_type"])
+        E, u, a = float(params["E"]), float(params["u"]), float(params["a"])
+
+        #Changes here: We are changing the calculation of ELFs so that we only perform one calculation and scale it based on our base shear value
+        #The SAP modal analysis is only run again when the model or one of these inputs has changed:
+        modal_key = checkpoints.key("modal", FileInput(FilePath + ".sdb"), units, elev, PGAx, PGAy, SA1x, SA1y, SA02x, SA02y, num_int, frame_wall_flag, struct_wall_flag, wall_type, E, u, a)
+        found, modal_outputs = checkpoints.load("modal", modal_key)
+        if not found:
+            with engines.engine() as eng, span("matlab.InitHazardModule"): #warm MATLAB engine for Python, already cd'ed to matlab_dir
+                modal_outputs = eng.InitHazardModule(FilePath,units,elev,PGAx,PGAy,SA1x,SA1y,SA02x,SA02y,num_int,frame_wall_flag,struct_wall_flag,wall_type,E,u,a,nargout=18) #here, the format is as follows: output1, output2, etc=eng.NameOfMFile(Input1,Input2,etc), nargout refers to number of outputs
+            checkpoints.save("modal", modal_key, modal_outputs)
+        FrameObjNames,JointCoords, FrameJointConn, FloorConn, WallConn, T1,hj, mass_floor, weight,Sw,FilePathResponse,lfm,Dl,Sax,Say,Fj,PGA,Sa_1=modal_outputs
+        print("Results: Hazard Module")
+        print("Connectivity Data From SAP:")
+        print("Joint Names and Coordinates:",JointCoords)
+        print("Frame and Joint Connectivity:",FrameJointConn)
+        print("Floor and Joint Connectivity:",FloorConn)
+        print("Wall and Joint Connectivity:",WallConn)
+        print("Information from Modal Analysis:")
+        print("Period in the x and y:",T1)
+        print("mass per floor:",mass_floor)
+        print("total weight of structure:",weight)
+        print("seismic weight:",Sw)
+        print("Equivalent Lateral Forces:")
+        print(Fj)
+        print("PGA:",PGA)
+        print("Sa_1:",Sa_1)
+        print("END OF HAZARD MODULE")
+        print("===================================================================================")
+        return {"FrameObjNames": FrameObjNames, "FilePathResponse": FilePathResponse, "units": units, "T1": T1, "hj": hj, "Sw": Sw, "weight": weight,
+                "lfm": lfm, "Dl": Dl, "Sax": Sax, "Say": Say, "Fj": Fj, "PGA": PGA, "Sa_1": Sa_1}
+
 
     #This is the end of the Hazard Module: We now have our Equivalent Static Forces for num_int intensities to conduct our response analysis
 
-    ####################################################################################################################
-    #################################BEGINNING OF RESPONSE MODULE#######################################################
-    print('################ BEGINNING RESPONSE AND DAMAGE MODULES #################')
-    print("Running ELFM")
-    #We are now going to implement our equivalent lateral forces from the Hazard Module onto our structure to obtain the response:
-    g = float(386)  # here we are defining gravity for in/s^2
-    Frame_type='Moment' #here we are defining the type of frame we are analyzing
-
-    eng2=matlab.engine.start_matlab() #start MATLAB engine for Python
-    eng2.cd(r'D:\Users\Karen\Documents\MATLAB\RSB\GreenResilienceMATLAB_2') #Here you specify path to folder where m-file is located
-    x_disp, y_disp, m_drift_ratios, m_vel_ratios,m_accel, b_SD, b_FA, b_FV, b_RD,Cost = eng2.InitResponseDamageModule(FrameObjNames,units,FilePathResponse,elev,Fj,num_int,T1,hj,g,PGA,Sa_1,Sax,Say,lfm,Frame_type,Soil_Site_class,Sw,weight,nargout=10)
-    print("Displacements for All Intensities from SAP")
-    print("Displacements in the x:",x_disp)
-    print("Displacements in the y:",y_disp)
-    print("Actual Displacements and Accelerations (Corrected)")
-    print("drifts:",m_drift_ratios)
-    print("velocities:",m_vel_ratios)
-    print("accelerations:",m_accel)
-    print('Dispersions')
-    print("B_SD:",b_SD)
-    print("B_FA:", b_FA)
-    print("B_FV:",b_FV)
-    print("B_RD:",b_RD)
-    print("Cost:",Cost)
-    print("END OF RESPONSE AND DAMAGE MODULES")
+    def response_stage(hazard, graph, modal, params=parameters):
+        ####################################################################################################################
+        #################################BEGINNING OF RESPONSE MODULE#######################################################
+        print('################ BEGINNING RESPONSE AND DAMAGE MODULES #################')
+        print("Running ELFM")
+        #We are now going to implement our equivalent lateral forces from the Hazard Module onto our structure to obtain the response:
+        elev=graph["elev"]
+        FrameObjNames, FilePathResponse, units, T1, hj, Sw, weight, lfm, Sax, Say, Fj, PGA, Sa_1 = [modal[k] for k in ("FrameObjNames", "FilePathResponse", "units", "T1", "hj", "Sw", "weight", "lfm", "Sax", "Say", "Fj", "PGA", "Sa_1")]
+        g = float(386)  # here we are defining gravity for in/s^2
+        num_int=float(params["num_int"])
+        Frame_type=str(params["Frame_type"])
+        Soil_Site_class=str(params["Soil_Site_class"])
+        response_key = checkpoints.key("response", modal, elev, num_int, g, Frame_type, Soil_Site_class, portfolio,
+                                       [hazard["cityhazardfunctions"][s] for s, _ in portfolio] if portfolio else None)
+        found, response_outputs = checkpoints.load("response", response_key)
+
+        if portfolio:
+            #The modal analysis above only depends on the building, so it is shared by every site.
+            #The hazard intensities and the response/damage module are run for each site in a pool of workers:
+            site_tables = response_outputs
+            if not found:
+                site_tables = RunPortfolio(portfolio, hazard["cityhazardfunctions"], modal, elev, units, num_int, g, Frame_type, matlab_dir, workers=workers, engines=engines)
+                checkpoints.save("response", response_key, site_tables)
+            for site_name, soil_class in portfolio: #not `site`, that would make the outer site local to this stage
+                print("Results for " + site_name + " (Soil Site Class " + soil_class + "):")
+                print(site_tables[site_name])
+            return site_tables
+
+        if not found:
+            with engines.engine() as eng2, span("matlab.InitResponseDamageModule", site=site): #the same warm engine the hazard module used
+                response_outputs = eng2.InitResponseDamageModule(FrameObjNames,units,FilePathResponse,elev,Fj,num_int,T1,hj,g,PGA,Sa_1,Sax,Say,lfm,Frame_type,Soil_Site_class,Sw,weight,nargout=10)
+            checkpoints.save("response", response_key, response_outputs)
+        x_disp, y_disp, m_drift_ratios, m_vel_ratios,m_accel, b_SD, b_FA, b_FV, b_RD,Cost = response_outputs
+        print("Displacements for All Intensities from SAP")
+        print("Displacements in the x:",x_disp)
+        print("Displacements in the y:",y_disp)
+        print("Actual Displacements and Accelerations (Corrected)")
+        print("drifts:",m_drift_ratios)
+        print("velocities:",m_vel_ratios)
+        print("accelerations:",m_accel)
+        print('Dispersions')
+        print("B_SD:",b_SD)
+        print("B_FA:", b_FA)
+        print("B_FV:",b_FV)
+        print("B_RD:",b_RD)
+        print("Cost:",Cost)
+        print("END OF RESPONSE AND DAMAGE MODULES")
+        return {"x_disp": x_disp, "y_disp": y_disp, "m_drift_ratios": m_drift_ratios, "m_vel_ratios": m_vel_ratios, "m_accel": m_accel,
+                "b_SD": b_SD, "b_FA": b_FA, "b_FV": b_FV, "b_RD": b_RD, "Cost": Cost}
+
+    #The hazard curves, the semantic graph and GreenScale do not need each other, so they run at the same time (and next to the MATLAB engine start).
+    #The modal analysis starts as soon as the hazard curves and the elevations are ready, and the response module right after it:
+    if sweep_file:
+        #Every grid point gets its own modal and response runs, but only as many as there are distinct values of the parameters they read;
+        #the hazard curves, the graph, GreenScale and the embodied energy (all material scenarios) are run once for the whole sweep
+        stages = Sweep()
+        stages.add("hazard", hazard_stage)
+        stages.add("graph", graph_stage)
+        stages.add("greenscale", greenscale_stage)
+        stages.add("embodied", embodied_stage, requires=["graph"])
+        stages.add("modal", modal_stage, requires=["hazard", "graph"], parameters=PARAMETER_STAGES["modal"])
+        stages.add("response", response_stage, requires=["hazard", "graph", "modal"], parameters=PARAMETER_STAGES["response"])
+        grid = ParameterGrid(ReadSweep(sweep_file), parameters)
+        engines.start(workers) #one warm engine for every run that can be going on at the same time
+    else:
+        stages = StageGraph()
+        stages.add("hazard", hazard_stage)
+        stages.add("graph", graph_stage)
+        stages.add("greenscale", greenscale_stage)
+        stages.add("embodied", embodied_stage, requires=["graph"])
+        stages.add("modal", modal_stage, requires=["hazard", "graph"])
+        stages.add("response", response_stage, requires=["hazard", "graph", "modal"])
+    try:
+        if sweep_file:
+            sweep_results = stages.run(grid, workers)
+            results = sweep_results[0]
+        else:
+            results = stages.run()
+    finally:
+        SetTracer(previous_tracer)
+        tracer.close() #the spans of the stages that did finish are in the trace file either way
+    print(stages.graph.summary() if sweep_file else stages.summary())
+    print(tracer.summary())
+    print("Trace written to " + trace_file)
+
 
     ####################################################################################################################
     #################################BEGINNING OF DAMAGE MODULE#######################################################
@@ -339,7 +512,23 @@ def main(argv, other_stuff=0):
         #print  i, len(levels[i]), levels[i]  # if we print a, this will give us the full graph for level data
 
 
-    print "Main Finished"
+    if results["hazard"] is not None: #None when the hazard stage of a sweep failed
+        results["hazard"]["figure_exporter"].close() #make sure all the hazard curve figures have been written
+    if sweep_file:
+        #One row per grid point and intensity: the swept parameters, the hazard of the intensity and the response/damage results
+        def point_table(result):
+            modal, response = result["modal"], result["response"]
+            hazard = dict((k, np.ravel(np.array(modal[k], dtype=np.float64))) for k in ("lfm", "Dl", "Sax", "Say", "PGA", "Sa_1"))
+            return SiteTable(hazard, [response[k] for k in ("x_disp", "y_disp", "m_drift_ratios", "m_vel_ratios", "m_accel", "b_SD", "b_FA", "b_FV", "b_RD", "Cost")])
+        sweep_table = SweepTable(grid, sweep_results, point_table, stages.failed, labels=ReadSweep(sweep_file))
+        table_file = os.path.splitext(sweep_file)[0] + "_results.csv"
+        sweep_table.to_csv(table_file, index=False)
+        print("Sweep results of " + str(len(grid) - len(stages.failed)) + " of " + str(len(grid)) + " points written to " + table_file)
+        print("Main Finished")
+        return sweep_table
+    print("Main Finished")
+    if portfolio:
+        return results["response"] #{site: DataFrame}
 
 if __name__ == "__main__":
     #logging.basicConfig()
@@ -0,0 +1,114 @@
+# -------------------------------------------------------------------------------
+# Name:        portfolio.py
+# Purpose:     Run one building model across many candidate sites
+#
+# Created:     10/18/2026
+# Licence:     The University of Notre Dame
+# -------------------------------------------------------------------------------
+
+'''
+The building-dependent stages (semantic graph, GreenScale, the SAP modal analysis in InitHazardModule) only depend
+on the building, so main() runs them once. Only the site-dependent stages are repeated per site:
+
+(1) Hazard: the FEMA P-58 intensity grid (lfm, Dl, Sax, Say, PGA, Sa_1) of every site, in one batched call to
+    time_based.TimeBasedAssessment instead of one MATLAB run per site
+(2) Response and damage: InitResponseDamageModule for each site and its soil class, spread across a pool of workers
+    which borrow warm engines from an engine_pool.EnginePool
+
+The result is one table per site: {site: DataFrame with one row per intensity}.
+A portfolio file is a CSV with the columns site,soil_class (e.g. Chicago IL,B).
+'''
+
+# #!/usr/bin/python
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from engine_pool import EnginePool
+from instrument import span
+from time_based import TimeBasedAssessment, SiteCurves
+
+
+def ReadPortfolio(path):
+    """returns: [(site, soil_class), ...] in file order"""
+    df = pd.read_csv(path, dtype=str)
+    return [(row["site"].strip(), row["soil_class"].strip()) for _, row in df.iterrows()]
+
+
+def _mat(values, backend):
+    """numpy array --> matlab.double row vector (or what the engine backend uses instead)"""
+    return backend.double(np.ravel(values).tolist())
+
+
+def SiteHazard(hazard_data, sites, T1, num_int):
+    """
+    Intensity grid of every site for the building's periods T1 = [T1x, T1y]
+    returns: {site: {"lfm": ..., "Dl": ..., "Sax": ..., "Say": ..., "PGA": ..., "Sa_1": ...}}, num_int values each
+    """
+    T1 = np.ravel(np.array(T1, dtype=np.float64))
+    result = TimeBasedAssessment(T1[0], T1[1], num_int,
+                                 SiteCurves(hazard_data, sites, "PGA"),
+                                 SiteCurves(hazard_data, sites, "SA1P0"),
+                                 SiteCurves(hazard_data, sites, "SA0P2"))
+    hazard = {}
+    for i, site in enumerate(sites):
+        hazard[site] = dict((k, result[k][i, 0]) for k in ("lfm", "Dl", "Sax", "Say", "PGA", "Sa_1"))
+    return hazard
+
+
+def SiteTable(hazard, response):
+    """One row per intensity with the hazard, the dispersions and the total repair cost in x and y"""
+    x_disp, y_disp, m_drift_ratios, m_vel_ratios, m_accel, b_SD, b_FA, b_FV, b_RD, Cost = \
+        [np.array(r, dtype=np.float64, ndmin=2) for r in response]
+    table = pd.DataFrame(hazard)
+    table.index = np.arange(1, len(table) + 1)
+    table.index.name = "intensity"
+    # The MATLAB outputs alternate x and y columns per intensity: [x1 y1 x2 y2 ...]
+    table["max_drift_x"] = m_drift_ratios[:, 0::2].max(axis=0)
+    table["max_drift_y"] = m_drift_ratios[:, 1::2].max(axis=0)
+    table["b_SD_x"] = b_SD[:, 0]
+    table["b_SD_y"] = b_SD[:, 1]
+    table["b_FA_x"] = b_FA[:, 0]
+    table["b_FA_y"] = b_FA[:, 1]
+    table["Cost_x"] = Cost[:, 0::2].sum(axis=0)
+    table["Cost_y"] = Cost[:, 1::2].sum(axis=0)
+    return table
+
+
+def RunPortfolio(portfolio, hazard_data, modal, elev, units, num_int, g, Frame_type, matlab_dir, workers=4,
+                 engines=None):
+    """
+    portfolio: [(site, soil_class), ...]
+    hazard_data: ReadHazardData output with the curves of every site in the portfolio
+    modal: building outputs of InitHazardModule: FrameObjNames, FilePathResponse, T1, hj, Sw, weight, Fj
+    elev, units, num_int, g, Frame_type: same values main() uses for a single site
+    matlab_dir: folder with the MATLAB modules
+    workers: number of sites analyzed at the same time (each one needs its own MATLAB engine)
+    engines: EnginePool to borrow the engines from, it is grown to `workers` engines and left running;
+             without one a pool is started here and shut down at the end
+
+    returns: {site: DataFrame}
+    """
+    sites = [site for site, _ in portfolio]
+    hazard = SiteHazard(hazard_data, sites, modal["T1"], num_int)
+    own_pool = engines is None
+    engines = (EnginePool(matlab_dir) if own_pool else engines).start(workers)
+    mat = lambda values: _mat(values, engines.backend)
+
+    def run_site(site, soil_class):
+        h = hazard[site]
+        with engines.engine() as eng, span("matlab.InitResponseDamageModule", site=site):
+            response = eng.InitResponseDamageModule(modal["FrameObjNames"], units, modal["FilePathResponse"], elev,
+                                                    modal["Fj"], num_int, modal["T1"], modal["hj"], g,
+                                                    mat(h["PGA"]), mat(h["Sa_1"]), mat(h["Sax"]), mat(h["Say"]),
+                                                    mat(h["lfm"]), Frame_type, soil_class, modal["Sw"],
+                                                    modal["weight"], nargout=10)
+        return SiteTable(h, response)
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            jobs = [(site, pool.submit(run_site, site, soil_class)) for site, soil_class in portfolio]
+            tables = dict((site, job.result()) for site, job in jobs)
+    finally:
+        if own_pool:
+            engines.shutdown()
+    return tables
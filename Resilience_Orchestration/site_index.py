@@ -0,0 +1,135 @@
+# -------------------------------------------------------------------------------
+# Name:        site_index.py
+# Purpose:     Nearest-site and radius lookup of hazard curves by longitude/latitude, with distance weighted curves
+#
+# Created:     10/18/2026
+# Licence:     The University of Notre Dame
+# -------------------------------------------------------------------------------
+
+'''
+Buildings are geocoded points, the USGS curve sets are named sites or a grid of them. A SiteIndex is a KD-tree over
+the sites of a HazardModel, so finding the sites around a building takes O(log n) instead of a scan of every row:
+
+    index = SiteIndex(model.lon, model.lat)
+    km, rows = index.nearest(-87.63, 41.88, k=4)             # (4,) distances and rows of model.y, nearest first
+    km, rows = index.within(-87.63, 41.88, radius_km=25.)     # every site within 25 km, nearest first
+    X, Y = InterpolateCurve(model, -87.63, 41.88, k=4)       # the hazard curve at the point itself
+
+HazardStore does the same for all of its models: store.nearest(lon, lat), store.within(lon, lat, radius_km) and
+store.at(lon, lat) which gives {model: (X, Y)}, the shape store[city] has, so the curves of a point can go wherever
+those of a named city go (e.g. Curves.querycurves({"building": store.at(lon, lat)})).
+
+The sites are placed on the unit sphere (x, y, z), so straight-line distances in the tree order the sites exactly as
+great-circle distances do, anywhere on the globe and across the date line; distances come back in km. All queries
+also take arrays of points, which are answered in one call to the tree.
+
+InterpolateCurve weights the k nearest curves by 1 / distance^power (inverse distance weighting). The rates of
+exceedance span orders of magnitude, so they are averaged in log space, which keeps the curve between its neighbours
+on a log-log plot; an IM level where one of the neighbours has a rate of 0 falls back to the linear average. A point
+that is on a site gets that site's curve.
+'''
+
+# #!/usr/bin/python
+import numpy as np
+from scipy.spatial import cKDTree
+
+EARTH_RADIUS = 6371.0088  # mean radius in km
+
+
+def _unit_vectors(lon, lat):
+    """(..., 3) positions on the unit sphere of lon, lat in degrees"""
+    lon = np.radians(np.asarray(lon, dtype=np.float64))
+    lat = np.radians(np.asarray(lat, dtype=np.float64))
+    return np.stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=-1)
+
+
+def _chord(km):
+    """great-circle distance in km --> straight-line distance on the unit sphere"""
+    return 2. * np.sin(np.minimum(np.asarray(km, dtype=np.float64) / EARTH_RADIUS, np.pi) / 2.)
+
+
+def _arc(chord):
+    """straight-line distance on the unit sphere --> great-circle distance in km"""
+    return 2. * EARTH_RADIUS * np.arcsin(np.minimum(np.asarray(chord, dtype=np.float64) / 2., 1.))
+
+
+def GreatCircle(lon1, lat1, lon2, lat2):
+    """Great-circle distance in km between points given in degrees (broadcasts)"""
+    return _arc(np.linalg.norm(_unit_vectors(lon1, lat1) - _unit_vectors(lon2, lat2), axis=-1))
+
+
+class SiteIndex():
+    """
+    lon, lat: (n_sites,) coordinates in degrees, e.g. HazardModel.lon and .lat
+    The rows returned by the queries are positions in these arrays.
+    """
+
+    def __init__(self, lon, lat):
+        self.lon = np.asarray(lon, dtype=np.float64)
+        self.lat = np.asarray(lat, dtype=np.float64)
+        self.tree = cKDTree(_unit_vectors(self.lon, self.lat))
+
+    def __len__(self):
+        return len(self.lon)
+
+    def nearest(self, lon, lat, k=1):
+        """
+        lon, lat: a point, or arrays of points
+        returns: (km, rows), each of shape point shape + (k,), nearest first
+        """
+        k = min(k, len(self))
+        chord, rows = self.tree.query(_unit_vectors(lon, lat), k=[i + 1 for i in range(k)])
+        return _arc(chord), rows
+
+    def within(self, lon, lat, radius_km):
+        """
+        lon, lat: one point
+        returns: (km, rows) of every site at most radius_km away, nearest first
+        """
+        point = _unit_vectors(lon, lat)
+        rows = np.array(self.tree.query_ball_point(point, _chord(radius_km)), dtype=np.intp)
+        km = _arc(np.linalg.norm(self.tree.data[rows] - point, axis=-1))
+        order = np.argsort(km, kind="stable")
+        return km[order], rows[order]
+
+    def weights(self, lon, lat, k=4, power=2.):
+        """
+        Inverse distance weights of the k nearest sites of every point
+        returns: (weights, rows), each of shape point shape + (k,); the weights of a point add up to 1
+        """
+        km, rows = self.nearest(lon, lat, k)
+        exact = km <= 1e-9
+        with np.errstate(divide="ignore"):
+            w = np.where(exact.any(axis=-1, keepdims=True), exact.astype(np.float64), 1. / km ** power)
+        return w / w.sum(axis=-1, keepdims=True), rows
+
+
+def InterpolateRates(y, weights, rows):
+    """
+    y: (n_sites, n_levels) rates of exceedance, weights and rows: (..., k) from SiteIndex.weights
+    returns: (..., n_levels) the weighted curves, averaged in log space where every neighbour is above 0
+    """
+    neighbours = np.asarray(y)[rows]  # (..., k, n_levels)
+    w = weights[..., None]
+    linear = (w * neighbours).sum(axis=-2)
+    positive = (neighbours > 0).all(axis=-2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        logarithmic = np.exp((w * np.log(neighbours)).sum(axis=-2))
+    return np.where(positive, logarithmic, linear)
+
+
+def ModelIndex(model):
+    """The SiteIndex of a HazardModel, built the first time it is asked for"""
+    index = getattr(model, "_site_index", None)
+    if index is None:
+        index = model._site_index = SiteIndex(model.lon, model.lat)
+    return index
+
+
+def InterpolateCurve(model, lon, lat, k=4, power=2.):
+    """
+    Hazard curve of a HazardModel at any point(s), from its k nearest sites
+    returns: (X, Y) like HazardModel.curve, Y of shape point shape + (n_levels,)
+    """
+    weights, rows = ModelIndex(model).weights(lon, lat, k, power)
+    return model.x, InterpolateRates(model.y, weights, rows)
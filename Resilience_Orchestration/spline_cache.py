@@ -0,0 +1,135 @@
+# -------------------------------------------------------------------------------
+# Name:        spline_cache.py
+# Purpose:     Persistent, content-addressed cache of fitted hazard splines
+#
+# Created:     10/18/2026
+# Licence:     The University of Notre Dame
+# -------------------------------------------------------------------------------
+
+'''
+A fitted spline is stored as its tck (full knot vector, coefficients and degree, read with the public get_knots()
+and get_coeffs()) in one small .npz file and comes back as a scipy BSpline, which evaluates the same B-spline as
+the UnivariateSpline it was fitted as; a HazardCurve is stored as its log points and slopes. The file name is a hash
+of the USGS (X, Y) arrays and of the parameters the fit depends on (degree and GRANULARITY for the splines, nothing
+else for the PCHIP curves), so the same curve fitted with the same settings is only ever fitted once, whatever the
+city is called. Old entries are evicted by age and, oldest first, by the total size of the cache folder, when the
+cache is opened and after every entry it stores.
+'''
+
+# #!/usr/bin/python
+import os
+import time
+import hashlib
+import numpy as np
+from scipy.interpolate import BSpline
+from hazard_curve import HazardCurve
+
+
+def SplineKey(x, y, degree, GRANULARITY, method="spline"):
+    """Hash of the curve data and of the fitting parameters (degree and GRANULARITY do not change a PCHIP curve)"""
+    h = hashlib.sha1()
+    h.update(np.ascontiguousarray(x, dtype=np.float64).tobytes())
+    h.update(np.ascontiguousarray(y, dtype=np.float64).tobytes())
+    if method == "spline":  # the splines cached before there was a choice keep their keys
+        h.update(("degree=%d;GRANULARITY=%d" % (degree, GRANULARITY)).encode("utf-8"))
+    else:
+        h.update(("method=" + method).encode("utf-8"))
+    return h.hexdigest()
+
+
+def SplineTck(spl):
+    """(t, c, k) of a UnivariateSpline from its public methods: get_knots() leaves out the k repeated end knots"""
+    knots = spl.get_knots()
+    coeffs = spl.get_coeffs()
+    k = len(coeffs) - len(knots) + 1
+    t = np.concatenate([np.repeat(knots[0], k), knots, np.repeat(knots[-1], k)])
+    return t, coeffs, k
+
+
+class SplineCache():
+    """
+    directory: folder the fitted splines are stored in
+    max_bytes: the oldest entries are removed once the folder grows past this size, None for no limit
+    max_age: entries not used for this many seconds are removed, None for no limit
+    """
+
+    def __init__(self, directory, max_bytes=None, max_age=None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        self.evict()
+
+    def path(self, key):
+        return os.path.join(self.directory, key + ".npz")
+
+    def get(self, key):
+        """
+        returns: the cached spline as a BSpline (or the HazardCurve), None when this curve was never fitted with these
+                 parameters
+        """
+        path = self.path(key)
+        try:
+            with np.load(path) as entry:
+                if "log_x" in entry:
+                    curve = HazardCurve.from_arrays(dict(entry))
+                else:
+                    curve = None
+                    tck = (entry["knots"], entry["coeffs"], int(entry["degree"]))
+        except (IOError, OSError, KeyError, ValueError):
+            self.misses += 1
+            return None
+        os.utime(path, None)  # the age used for eviction counts from the last time an entry was used
+        self.hits += 1
+        if curve is not None:
+            return curve
+        return BSpline(*tck)  # extrapolates like the UnivariateSpline did
+
+    def put(self, key, spl):
+        if isinstance(spl, HazardCurve):
+            arrays = spl.arrays()
+        else:
+            t, c, k = spl.tck if isinstance(spl, BSpline) else SplineTck(spl)
+            arrays = {"knots": t, "coeffs": c, "degree": k}
+        path = self.path(key)
+        tmp_path = path + ".tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                np.savez(f, **arrays)
+            os.replace(tmp_path, path)
+        except (IOError, OSError) as e:
+            # The spline is still good, it will just be fitted again next time
+            print("Could not cache spline " + key + ": " + str(e))
+            return
+        if self.max_bytes is not None or self.max_age is not None:
+            self.evict()
+
+    def evict(self):
+        """Removes expired entries, then the least recently used ones until the cache fits in max_bytes"""
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".npz"):
+                continue
+            path = os.path.join(self.directory, name)
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+
+        now = time.time()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for mtime, size, path in entries:
+            expired = self.max_age is not None and now - mtime > self.max_age
+            too_big = self.max_bytes is not None and total > self.max_bytes
+            if not (expired or too_big):
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
@@ -0,0 +1,144 @@
+# -------------------------------------------------------------------------------
+# Name:        stages.py
+# Purpose:     Run the orchestration stages as a dependency graph, independent stages at the same time
+#
+# Created:     10/18/2026
+# Licence:     The University of Notre Dame
+# -------------------------------------------------------------------------------
+
+'''
+main() is split into stages that name the stages they need:
+
+    stages = StageGraph()
+    stages.add("hazard", hazard_stage)
+    stages.add("graph", graph_stage)
+    stages.add("modal", modal_stage, requires=["hazard", "graph"])     # modal_stage(hazard=..., graph=...)
+    results = stages.run()
+
+A stage starts as soon as everything it requires has finished and gets their results as keyword arguments. Stages
+run on a thread pool, so the external programs (GeoLinked, GreenScale) and MATLAB, which all spend their time outside
+the Python interpreter, overlap with each other and with the Python stages; the wall-clock time is about that of the
+longest chain instead of the sum of all stages. RunCommand runs an external program with its output captured, so
+stages running at the same time do not interleave their output on the console.
+'''
+
+# #!/usr/bin/python
+import os
+import time
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from instrument import span
+
+
+class StageError(Exception):
+    """A stage raised: stage is its name, error the original exception"""
+
+    def __init__(self, stage, error):
+        Exception.__init__(self, "stage %s failed: %r" % (stage, error))
+        self.stage = stage
+        self.error = error
+
+
+class StageGraph():
+
+    def __init__(self):
+        self.stages = {}
+        self.order = []
+        self.timings = {}
+
+    def add(self, name, func, requires=()):
+        """func(**{required stage: its result}) is run once every stage in `requires` has finished"""
+        if name in self.stages:
+            raise ValueError("stage %s added twice" % name)
+        self.stages[name] = (func, tuple(requires))
+        self.order.append(name)
+
+    def _check(self):
+        for name in self.order:
+            for dep in self.stages[name][1]:
+                if dep not in self.stages:
+                    raise ValueError("stage %s requires unknown stage %s" % (name, dep))
+        # Kahn's algorithm: every stage must become ready at some point
+        done = set()
+        while len(done) < len(self.order):
+            ready = [n for n in self.order if n not in done and all(d in done for d in self.stages[n][1])]
+            if not ready:
+                raise ValueError("stages depend on each other in a cycle: %s" % sorted(set(self.order) - done))
+            done.update(ready)
+
+    def run(self, workers=None):
+        """
+        workers: number of stages running at the same time, defaults to one per stage
+        returns: {stage name: result}; raises StageError for the first stage that fails (stages that were
+                 already running are allowed to finish, the ones that were waiting are not started)
+        """
+        self._check()
+        results = {}
+        self.timings = {}
+        start = time.time()
+        pending = list(self.order)
+        running = {}
+
+        def timed(name, func, kwargs):
+            began = time.time()
+            try:
+                with span("stage." + name):
+                    return func(**kwargs)
+            finally:
+                self.timings[name] = (began - start, time.time() - start)
+
+        with ThreadPoolExecutor(max_workers=workers or max(1, len(self.order))) as pool:
+            while pending or running:
+                for name in [n for n in pending if all(d in results for d in self.stages[n][1])]:
+                    func, requires = self.stages[name]
+                    kwargs = dict((d, results[d]) for d in requires)
+                    running[pool.submit(timed, name, func, kwargs)] = name
+                    pending.remove(name)
+                finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    if future.exception() is not None:
+                        for other in running:
+                            other.cancel()
+                        raise StageError(name, future.exception())
+                    results[name] = future.result()
+        return results
+
+    def summary(self):
+        """One line per stage with when it started and finished, then the wall-clock time against the sum"""
+        lines = []
+        for name in sorted(self.timings, key=lambda n: self.timings[n][0]):
+            began, ended = self.timings[name]
+            lines.append("%-12s %8.2f s -> %8.2f s  (%8.2f s)" % (name, began, ended, ended - began))
+        if self.timings:
+            wall = max(e for _, e in self.timings.values())
+            total = sum(e - b for b, e in self.timings.values())
+            lines.append("wall clock %.2f s, stages one after another %.2f s" % (wall, total))
+        return "\n".join(lines)
+
+
+def RunCommand(args, name=None, log_dir=None):
+    """
+    Runs an external program (e.g. ["python", "GeoLmain.pyc", ...]) and waits for it without holding the interpreter
+    name: used for the messages and the log file name, defaults to the program
+    log_dir: when given, everything the program printed is also written to <log_dir>/<name>.log
+    returns: (return code, output)
+    """
+    name = name or os.path.basename(str(args[1] if len(args) > 1 else args[0]))
+    with span("command." + name) as info:
+        try:
+            process = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        except OSError as e:
+            print(name + " could not be started: " + str(e))
+            return None, ""
+        output = process.communicate()[0].decode("utf-8", "replace")
+        info["returncode"] = process.returncode
+    if log_dir is not None:
+        if not os.path.isdir(log_dir):
+            os.makedirs(log_dir)
+        with open(os.path.join(log_dir, name + ".log"), "w") as f:
+            f.write(output)
+    if process.returncode != 0:
+        print(name + " exited with code " + str(process.returncode) + ":")
+        print("\n".join(output.splitlines()[-20:]))
+    return process.returncode, output
@@ -0,0 +1,253 @@
+# -------------------------------------------------------------------------------
+# Name:        static_response.py
+# Purpose:     FEMA P-58 simplified analysis (equiv_static_forces.m and median_dispersions.m) in NumPy
+#
+# Created:     10/18/2026
+# Licence:     The University of Notre Dame
+# -------------------------------------------------------------------------------
+
+'''
+Same quantities as the MATLAB functions, for all intensities, both directions and any number of buildings in one
+broadcast call instead of one intensity and one direction at a time:
+
+    forces = LateralForces(T1, Sw, hj)                        # Fj of InitHazardModule, (..., 2, n_floors)
+    Fj = EquivStaticForces(T1, Sa, Sw, W, "B", hj)            # equiv_static_forces, (..., num_int, 2, n_floors)
+    result = MedianDispersions(T1, Vy, hj, g, Sa, PGA, Sa_1, Gamma, "Moment", "B", disp, W1, weight)
+    result["m_drift_ratios"][..., intensity, direction, floor]
+    result["b_SD"][..., intensity, direction]
+
+Array layout: a trailing axis of 2 is (x, y), Sa is (..., num_int, 2) (i.e. Sax and Say stacked), disp and Phi are
+(..., 2, n_floors) (the MATLAB (n_floors, 2) matrices transposed). Leading dimensions are buildings (or anything
+else to sweep over) and broadcast against each other; buildings in one call share the number of floors.
+Soil_Site_class and Frame_type are the strings main() passes to InitResponseDamageModule.
+
+The FEMA P-58 coefficients (CF_9.mat / CF_15.mat) and dispersion table (Dispersions.mat) are read from the MATLAB
+folder. scatteredInterpolant is replaced by scipy's LinearNDInterpolator, the same Delaunay-based linear
+interpolation; points outside the table are moved onto its edge instead of being extrapolated. Two things in
+median_dispersions.m are fixed rather than copied: the site coefficient `a` is not defined there (it is taken from
+Soil_Site_class as in equiv_static_forces.m), and the velocity term uses Vy of its own direction.
+MedianDispersionsReference() below is a line-by-line transcription of median_dispersions.m for one intensity with
+those two fixes; tests/test_static_response.py checks MedianDispersions against it and pins the three deviations.
+'''
+
+# #!/usr/bin/python
+import os
+import numpy as np
+from scipy.io import loadmat
+from scipy.interpolate import LinearNDInterpolator
+
+MATLAB_CODES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "MATLAB Codes")
+SITE_CLASS_A = {"A": 130., "B": 130., "C": 90., "D": 60.}  # any other class is 60
+FRAME_TYPE_P = {"Braced": 1, "Moment": 2, "Wall": 3}  # row of the drift coefficients in CF
+B_RD = 0.8  # dispersion of the residual drift
+
+_tables = {}
+
+
+def _load(name, matlab_dir):
+    path = os.path.join(matlab_dir, name + ".mat")
+    if path not in _tables:
+        _tables[path] = np.asarray(loadmat(path)[name], dtype=np.float64)
+    return _tables[path]
+
+
+def SiteCoefficient(Soil_Site_class):
+    """a of the C1 coefficient for an ASCE/SEI 7-10 site class"""
+    return SITE_CLASS_A.get(Soil_Site_class, 60.)
+
+
+def ResponseCoefficients(n_floors, matlab_dir=MATLAB_CODES):
+    """CF: the FEMA P-58 coefficients for buildings up to 9 stories (CF_9.mat) or up to 15 (CF_15.mat)"""
+    return _load("CF_9" if n_floors <= 9 else "CF_15", matlab_dir)
+
+
+def HeightExponent(T1):
+    """k of the vertical distribution of the lateral forces"""
+    T1 = np.asarray(T1, dtype=np.float64)
+    return np.where(T1 < 0.5, 1., np.where(T1 > 2.5, 2., 0.75 + 0.5 * T1))
+
+
+def LateralForces(T1, Sw, hj):
+    """
+    Sw.*hj.^k / sum(Sw.*hj.^k): the lateral forces for a base shear of 1 (Fj of InitHazardModule)
+    T1: (..., 2), Sw, hj: (..., n_floors)
+    returns: (..., 2, n_floors)
+    """
+    k = HeightExponent(T1)[..., None]
+    Sw = np.asarray(Sw, dtype=np.float64)[..., None, :]
+    hj = np.asarray(hj, dtype=np.float64)[..., None, :]
+    weights = Sw * hj ** k
+    return weights / weights.sum(axis=-1, keepdims=True)
+
+
+def Coefficients(T1, S, a):
+    """
+    C1 and C2 of FEMA P-58 for the strength ratios S (same shape as T1 after broadcasting)
+    returns: (C1, C2, S) where S is raised to 1 wherever it was below, as in the .m files
+    """
+    T1, S = np.broadcast_arrays(np.asarray(T1, dtype=np.float64), np.asarray(S, dtype=np.float64))
+    elastic = S <= 1
+    C1 = np.where(elastic | (T1 > 1), 1., np.where(T1 <= 0.2, 1 + (S - 1) / (0.04 * a), 1 + (S - 1) / (a * T1 ** 2)))
+    C2 = np.where(elastic | (T1 > 0.7), 1., np.where(T1 <= 0.2, 1 + (S - 1) ** 2 / 32, 1 + (S - 1) ** 2 / (800 * T1 ** 2)))
+    return C1, C2, np.where(elastic, 1., S)
+
+
+def EquivStaticForces(T1, Sa, Sw, W, Soil_Site_class, hj):
+    """
+    equiv_static_forces for every intensity: strength ratio 1 (C1 = C2 = 1) and W1 = W as in the .m file
+    T1: (..., 2), Sa: (..., num_int, 2), Sw, hj: (..., n_floors), W: (...) total weight
+    returns: Fj (..., num_int, 2, n_floors)
+    """
+    Sa = np.asarray(Sa, dtype=np.float64)
+    T1 = np.asarray(T1, dtype=np.float64)[..., None, :]
+    C1, C2, _ = Coefficients(T1, np.ones(Sa.shape), SiteCoefficient(Soil_Site_class))
+    V = C1 * C2 * Sa * np.asarray(W, dtype=np.float64)[..., None, None]
+    return V[..., None] * LateralForces(T1, Sw, hj)
+
+
+def FirstModeWeight(Sw, Phi, weight):
+    """W1 of InitResponseDamageModule: (sum(Sw*Phi))^2 / sum(Sw*Phi^2), at least 0.8 weight; Phi (..., 2, n_floors)"""
+    Sw = np.asarray(Sw, dtype=np.float64)[..., None, :]
+    Phi = np.asarray(Phi, dtype=np.float64)
+    W1 = (Sw * Phi).sum(axis=-1) ** 2 / (Sw * Phi ** 2).sum(axis=-1)
+    return np.maximum(W1, 0.8 * np.asarray(weight, dtype=np.float64)[..., None])
+
+
+class DispersionTable():
+    """The FEMA P-58 dispersions of Dispersions.mat (columns T1, S, drift, acceleration, velocity, modelling)"""
+
+    def __init__(self, matlab_dir=MATLAB_CODES):
+        table = _load("Dispersions", matlab_dir)
+        self.points = table[:, :2]
+        self.lower = table[:, :2].min(axis=0)
+        self.upper = table[:, :2].max(axis=0)
+        self.interpolant = LinearNDInterpolator(self.points, table[:, 2:6])
+
+    def __call__(self, T1, S):
+        """returns: (b_SD, b_FA, b_FV) total dispersions of drift, floor acceleration and floor velocity"""
+        T1, S = np.broadcast_arrays(np.asarray(T1, dtype=np.float64), np.asarray(S, dtype=np.float64))
+        q = np.clip(np.stack([T1.ravel(), S.ravel()], axis=1), self.lower, self.upper)
+        b = self.interpolant(q).reshape(T1.shape + (4,))
+        b_ad, b_aa, b_av, b_m = b[..., 0], b[..., 1], b[..., 2], b[..., 3]
+        return np.sqrt(b_ad ** 2 + b_m ** 2), np.sqrt(b_aa ** 2 + b_m ** 2), np.sqrt(b_av ** 2 + b_m ** 2)
+
+
+def MedianDispersions(T1, Vy, hj, g, Sa, PGA, Sa_1, Gamma, Frame_type, Soil_Site_class, disp, W1, weight, CF=None,
+                      dispersions=None, matlab_dir=MATLAB_CODES):
+    """
+    median_dispersions for every intensity and direction
+    T1, Vy, Gamma, W1: (..., 2), hj: (..., n_floors) floor elevations, g: gravity in the units of disp
+    Sa: (..., num_int, 2), PGA, Sa_1: (..., num_int), weight: (...)
+    disp: (..., 2, n_floors) floor displacements for a base shear of 1 (ResponseSapAPI with LateralForces)
+    CF, dispersions: coefficient table and DispersionTable, read from matlab_dir when not given
+
+    returns: dict with m_drift_ratios, m_vel_ratios, m_accel (..., num_int, 2, n_floors), b_SD, b_FA, b_FV, and
+             C1, C2, S (the strength ratio) and V (base shear) (..., num_int, 2), and b_RD
+    """
+    hj = np.asarray(hj, dtype=np.float64)
+    n_floors = hj.shape[-1]
+    CF = ResponseCoefficients(n_floors, matlab_dir) if CF is None else np.asarray(CF, dtype=np.float64)
+    dispersions = DispersionTable(matlab_dir) if dispersions is None else dispersions
+    p = FRAME_TYPE_P[Frame_type] - 1
+    Sa = np.asarray(Sa, dtype=np.float64)
+    T1 = np.asarray(T1, dtype=np.float64)[..., None, :]  # (..., 1, 2) against (..., num_int, 2)
+    Vy = np.asarray(Vy, dtype=np.float64)[..., None, :]
+    W1 = np.asarray(W1, dtype=np.float64)[..., None, :]
+    Gamma = np.asarray(Gamma, dtype=np.float64)[..., None, :]
+    disp = np.asarray(disp, dtype=np.float64)[..., None, :, :]  # (..., 1, 2, n_floors)
+
+    S = Sa * np.asarray(weight, dtype=np.float64)[..., None, None] / Vy  # strength ratio
+    C1, C2, S = Coefficients(T1, S, SiteCoefficient(Soil_Site_class))
+    V = C1 * C2 * Sa * W1  # pseudo lateral force, base shear
+
+    story = np.diff(hj, axis=-1, prepend=0.)[..., None, None, :]  # height of each story
+    drift_ratios = disp * V[..., None] / story
+
+    height = (hj / hj[..., -1:])[..., None, None, :]  # relative height of each floor
+
+    def correction(row):
+        c = CF[row]
+        return np.exp(c[0] + c[1] * T1[..., None] + c[2] * S[..., None] + c[3] * height + c[4] * height ** 2
+                      + c[5] * height ** 3)
+
+    PGA = np.asarray(PGA, dtype=np.float64)[..., None, None]
+    PGV = (np.asarray(Sa_1, dtype=np.float64)[..., None, None] * g / (2 * np.pi)) / 1.65
+    vs = PGV + 0.3 * T1[..., None] * (Vy * g * Gamma / W1)[..., None] * (disp / disp[..., -1:]) / (2 * np.pi)
+
+    b_SD, b_FA, b_FV = dispersions(np.broadcast_to(T1, S.shape), S)
+    return {
+        "m_drift_ratios": correction(p) * drift_ratios,
+        "m_vel_ratios": correction(p + 3) * vs,
+        "m_accel": correction(p + 6) * PGA,
+        "b_SD": b_SD,
+        "b_FA": b_FA,
+        "b_FV": b_FV,
+        "b_RD": B_RD,
+        "C1": C1,
+        "C2": C2,
+        "S": S,
+        "V": V,
+    }
+
+
+def MedianDispersionsReference(T1, Vy, hj, g, Sa, PGA, Sa_1, Gamma, p, CF, disp, W1, weight, a, dispersions):
+    """
+    Scalar transcription of median_dispersions.m for one intensity, to check against
+    p: 1-based row of CF, disp: (n_floors, 2), a: site coefficient; returns the outputs of the .m file in order
+    """
+    hj = np.asarray(hj, dtype=np.float64)
+    disp = np.asarray(disp, dtype=np.float64)
+    N = len(hj)
+    S = np.array([Sa[0] * weight / Vy[0], Sa[1] * weight / Vy[1]])
+    C1 = np.zeros(2)
+    C2 = np.zeros(2)
+    V = np.zeros(2)
+    for i in range(2):
+        if S[i] <= 1:
+            C1[i] = 1
+        elif T1[i] <= 0.2:
+            C1[i] = 1 + (S[i] - 1) / (0.04 * a)
+        elif T1[i] <= 1:
+            C1[i] = 1 + (S[i] - 1) / (a * T1[i] ** 2)
+        else:
+            C1[i] = 1
+        if S[i] <= 1:
+            C2[i] = 1
+            S[i] = 1
+        elif T1[i] <= 0.2:
+            C2[i] = 1 + ((S[i] - 1) ** 2) / 32
+        elif T1[i] <= 0.7:
+            C2[i] = 1 + ((S[i] - 1) ** 2) / (800 * T1[i] ** 2)
+        else:
+            C2[i] = 1
+        V[i] = C1[i] * C2[i] * Sa[i] * W1[i]
+
+    Td = np.eye(N)
+    for k in range(N - 1):
+        Td[k + 1, k] = -1
+    hf = np.dot(Td, hj)
+    drift_ratios = np.zeros((N, 2))
+    drift_ratios[:, 0] = disp[:, 0] * V[0] / hf
+    drift_ratios[:, 1] = disp[:, 1] * V[1] / hf
+    PGV = (Sa_1 * g / (2 * np.pi)) / 1.65
+
+    Hdr = np.zeros((N, 2))
+    Hvel = np.zeros((N, 2))
+    Hacc = np.zeros((N, 2))
+    vs = np.zeros((N, 2))
+    r = hj / hj[-1]
+    for i in range(2):
+        c = CF[p - 1]
+        Hdr[:, i] = np.exp(c[0] + c[1] * T1[i] + c[2] * S[i] + c[3] * r + c[4] * r ** 2 + c[5] * r ** 3)
+        c = CF[p + 2]
+        Hvel[:, i] = np.exp(c[0] + c[1] * T1[i] + c[2] * S[i] + c[3] * r + c[4] * r ** 2 + c[5] * r ** 3)
+        c = CF[p + 5]
+        Hacc[:, i] = np.exp(c[0] + c[1] * T1[i] + c[2] * S[i] + c[3] * r + c[4] * r ** 2 + c[5] * r ** 3)
+        vs[:, i] = PGV + 0.3 * T1[i] * (Vy[i] * g * Gamma[i] / W1[i]) * (disp[:, i] / disp[-1, i]) / (2 * np.pi)
+
+    b_SD = np.zeros(2)
+    b_FA = np.zeros(2)
+    b_FV = np.zeros(2)
+    for i in range(2):
+        b_SD[i], b_FA[i], b_FV[i] = dispersions(T1[i], S[i])
+    return Hdr * drift_ratios, Hvel * vs, Hacc * PGA, b_SD, b_FA, b_FV, B_RD
@@ -0,0 +1,136 @@
+# -------------------------------------------------------------------------------
+# Name:        superposition.py
+# Purpose:     Floor displacements of every intensity from one structural analysis per lateral load shape
+#
+# Created:     10/18/2026
+# Licence:     The University of Notre Dame
+# -------------------------------------------------------------------------------
+
+'''
+The Equivalent Lateral Force Method is a linear analysis, and for a direction the forces of every intensity have the
+same vertical shape Sw.*hj.^k (k only depends on T1) scaled by the base shear V. So the structural model only has to
+be solved once for each shape, with a base shear of 1; the displacements of any intensity, site or sweep point are
+that response times V:
+
+    engine = SuperpositionEngine(SapSolver(engines, FrameObjNames, units, FilePathResponse, elev), Sw, hj)
+    disp = engine.displacements(T1, V)          # (..., num_int, 2, n_floors) for V (..., num_int, 2)
+    x_disp, y_disp = MatlabDisplacements(disp)  # the (n_floors, num_int) matrices of ResponseSapAPI
+
+The unit responses are kept per (direction, k), so however many intensities or sites are asked for, the solver (SAP
+through ResponseSapAPI, or ShearBuildingSolver without it) only runs once for every k it has not seen; engine.solves
+counts the runs. A sweep over many periods has many distinct k, so once more than n_floors shapes are missing the
+engine solves one unit load per floor instead and keeps the flexibility matrix, from which the response to any
+shape is a matrix product. Keep one engine per building (e.g. for all the sites of a portfolio).
+'''
+
+# #!/usr/bin/python
+import numpy as np
+from static_response import HeightExponent, LateralForces
+from instrument import span
+
+
+def SapSolver(engines, FrameObjNames, units, FilePathResponse, elev):
+    """
+    Solver that runs ResponseSapAPI on a warm engine of the EnginePool
+    returns: solve(Fj) with Fj (2, n_floors) -> {"disp": (2, n_floors), "Gamma": ..., "Phi": ...}
+    """
+    def solve(Fj):
+        with engines.engine() as eng, span("matlab.ResponseSapAPI"):
+            x_disp, y_disp, Joint_elev, JointNames, Gamma, Phi = eng.ResponseSapAPI(
+                FrameObjNames, units, FilePathResponse, elev, engines.backend.double(np.asarray(Fj).T.tolist()),
+                nargout=6)
+        return {"disp": np.stack([np.ravel(x_disp), np.ravel(y_disp)]), "Gamma": np.ravel(Gamma), "Phi": np.asarray(Phi).T}
+    return solve
+
+
+def ShearBuildingSolver(story_stiffness):
+    """
+    Solver for a shear building model, to use the engine without SAP
+    story_stiffness: (2, n_floors) lateral stiffness of each story in the x and y direction
+    """
+    story_stiffness = np.asarray(story_stiffness, dtype=np.float64)
+
+    def solve(Fj):
+        # The shear in each story is the sum of the forces above it, the drifts add up from the ground
+        shear = np.cumsum(np.asarray(Fj, dtype=np.float64)[:, ::-1], axis=1)[:, ::-1]
+        return {"disp": np.cumsum(shear / story_stiffness, axis=1)}
+    return solve
+
+
+class SuperpositionEngine():
+    """
+    solver: solve(Fj) -> {"disp": (2, n_floors), ...} for the forces Fj (2, n_floors) of both directions
+    Sw, hj: lumped seismic weight and elevation of each floor
+    decimals: k values that agree to this many decimals share a unit response
+    """
+
+    def __init__(self, solver, Sw, hj, decimals=9):
+        self.solver = solver
+        self.Sw = np.asarray(Sw, dtype=np.float64)
+        self.hj = np.asarray(hj, dtype=np.float64)
+        self.decimals = decimals
+        self.responses = {}  # {(direction, k): displacements for a base shear of 1}
+        self.flexibility = None  # (2, n_floors, n_floors): displacements of every floor for a unit load at each floor
+        self.outputs = None  # everything else the last solver run returned (e.g. Gamma and Phi from SAP)
+        self.solves = 0
+
+    def _run(self, Fj):
+        result = self.solver(Fj)
+        self.solves += 1
+        self.outputs = dict((key, value) for key, value in result.items() if key != "disp")
+        return np.asarray(result["disp"], dtype=np.float64)
+
+    def _solve(self, kx, ky):
+        T1 = np.array([_period(kx), _period(ky)])
+        disp = self._run(LateralForces(T1, self.Sw, self.hj))
+        self.responses[(0, kx)] = disp[0]
+        self.responses[(1, ky)] = disp[1]
+
+    def _solve_flexibility(self):
+        n_floors = len(self.hj)
+        columns = [self._run(np.tile(np.eye(n_floors)[j], (2, 1))) for j in range(n_floors)]
+        self.flexibility = np.stack(columns, axis=-1)  # (2, n_floors, load floor)
+
+    def unit_response(self, T1):
+        """T1: (..., 2) periods; returns: (..., 2, n_floors) displacements for a base shear of 1 in each direction"""
+        k = np.round(HeightExponent(T1), self.decimals)
+        kx = sorted(set(np.ravel(k[..., 0]).tolist()))
+        ky = sorted(set(np.ravel(k[..., 1]).tolist()))
+        missing_x = [v for v in kx if (0, v) not in self.responses]
+        missing_y = [v for v in ky if (1, v) not in self.responses]
+        if self.flexibility is None and max(len(missing_x), len(missing_y)) > len(self.hj):
+            self._solve_flexibility()
+        if self.flexibility is not None:
+            return np.einsum("dij,...dj->...di", self.flexibility, LateralForces(T1, self.Sw, self.hj))
+        # Both directions are loaded in one run, so the missing shapes are solved in pairs
+        for i in range(max(len(missing_x), len(missing_y))):
+            self._solve(missing_x[min(i, len(missing_x) - 1)] if missing_x else kx[0],
+                        missing_y[min(i, len(missing_y) - 1)] if missing_y else ky[0])
+        n_floors = len(self.hj)
+        out = np.empty(k.shape[:-1] + (2, n_floors))
+        for direction, values in ((0, kx), (1, ky)):
+            for v in values:
+                out[k[..., direction] == v, direction] = self.responses[(direction, v)]
+        return out
+
+    def displacements(self, T1, V):
+        """
+        T1: (..., 2) periods, V: (..., num_int, 2) base shears
+        returns: (..., num_int, 2, n_floors) floor displacements
+        """
+        return np.asarray(V, dtype=np.float64)[..., None] * self.unit_response(T1)[..., None, :, :]
+
+
+def _period(k):
+    """A period with this height exponent (for k = 1 and k = 2 any period below 0.5 s or above 2.5 s will do)"""
+    if k <= 1:
+        return 0.
+    if k >= 2:
+        return 3.
+    return (k - 0.75) / 0.5
+
+
+def MatlabDisplacements(disp):
+    """(num_int, 2, n_floors) to the x_disp and y_disp matrices (n_floors, num_int) of ResponseSapAPI"""
+    disp = np.asarray(disp)
+    return disp[..., 0, :].T, disp[..., 1, :].T
@@ -0,0 +1,180 @@
+# -------------------------------------------------------------------------------
+# Name:        sweep.py
+# Purpose:     Run the orchestration stages over a grid of parameters, each stage only as often as its inputs change
+#
+# Created:     10/18/2026
+# Licence:     The University of Notre Dame
+# -------------------------------------------------------------------------------
+
+'''
+A sweep is the stages of main() plus the parameters each of them reads:
+
+    sweep = Sweep()
+    sweep.add("hazard", hazard_stage)
+    sweep.add("modal", modal_stage, requires=["hazard"], parameters=["num_int", "E"])   # modal_stage(hazard=..., params=...)
+    sweep.add("response", response_stage, requires=["hazard", "modal"], parameters=["Frame_type"])
+    grid = ParameterGrid({"num_int": [8, 12], "Frame_type": ["Moment", "Braced"]}, defaults)
+    results = sweep.run(grid, workers=4)       # [{stage: result}] in grid order
+    table = SweepTable(grid, results, lambda result: SomeDataFrame(result["response"]), sweep.failed)
+
+A stage depends on its own parameters and on everything the stages it requires depend on. For every grid point the
+stage is identified by the values of just those parameters, so grid points that agree on them share one run: above,
+hazard runs once, modal once per num_int and response for every point. All the runs go into one StageGraph, so a
+response starts as soon as its modal run is done and runs of different points overlap (workers at a time). A run
+that fails is reported and the runs that need it are skipped; the other points carry on, see Sweep.failed.
+
+A sweep file is JSON with a list of values (or a single value) per parameter, e.g.
+{"Soil_Site_class": ["A", "B", "C", "D"], "Frame_type": ["Moment", "Braced"], "E": [1348.85, 1500.0]}
+'''
+
+# #!/usr/bin/python
+import json
+import itertools
+import pandas as pd
+from stages import StageGraph
+
+
+def ReadSweep(path):
+    """returns: {parameter: [values]} in file order"""
+    with open(path) as f:
+        spec = json.load(f)
+    return dict((name, values if isinstance(values, list) else [values]) for name, values in spec.items())
+
+
+def ParameterGrid(spec, defaults):
+    """
+    spec: {parameter: [values]}, defaults: {parameter: value} for every parameter the stages read
+    returns: [{parameter: value}], every combination of the spec values (last parameter varying fastest)
+    """
+    unknown = [name for name in spec if name not in defaults]
+    if unknown:
+        raise ValueError("unknown sweep parameters %s, known: %s" % (unknown, sorted(defaults)))
+    names = list(spec)
+    grid = []
+    for values in itertools.product(*[spec[name] for name in names]):
+        point = dict(defaults)
+        point.update(zip(names, values))
+        grid.append(point)
+    return grid
+
+
+class _Failed():
+    """Result of a run that raised (or of one that needed a failed run)"""
+
+    def __init__(self, name, error):
+        self.name = name
+        self.error = error
+
+
+class Sweep():
+
+    def __init__(self):
+        self.stages = {}
+        self.order = []
+        self.runs = {}  # {stage: number of distinct runs} of the last run()
+        self.failed = []  # [(grid index, stage, error)] of the last run()
+        self.graph = None
+
+    def add(self, name, func, requires=(), parameters=()):
+        """func(params=grid point, **{required stage: its result}), or func(**{...}) when it reads no parameters"""
+        if name in self.stages:
+            raise ValueError("stage %s added twice" % name)
+        for dep in requires:
+            if dep not in self.stages:
+                raise ValueError("stage %s requires %s, which has to be added before it" % (name, dep))
+        self.stages[name] = (func, tuple(requires), tuple(parameters))
+        self.order.append(name)
+
+    def dependencies(self):
+        """returns: {stage: set of the parameters its result depends on}"""
+        depends = {}
+        for name in self.order:
+            func, requires, parameters = self.stages[name]
+            depends[name] = set(parameters).union(*[depends[d] for d in requires])
+        return depends
+
+    def affected(self, names):
+        """The stages that have to run again when the parameters `names` change"""
+        depends = self.dependencies()
+        return [name for name in self.order if depends[name] & set(names)]
+
+    def _instance(self, name, point, deps):
+        func, requires, parameters = self.stages[name]
+
+        def run(**results):
+            inputs = dict((stage, results[instance]) for stage, instance in deps)
+            failed = [r for r in inputs.values() if isinstance(r, _Failed)]
+            if failed:
+                return failed[0]
+            try:
+                if parameters:
+                    return func(params=dict(point), **inputs)
+                return func(**inputs)
+            except Exception as e:
+                print("Could not run stage " + name + " for " + str(dict((p, point[p]) for p in parameters)) + ": " + repr(e))
+                return _Failed(name, e)
+        return run
+
+    def run(self, grid, workers=None):
+        """
+        grid: [{parameter: value}] (see ParameterGrid)
+        workers: runs at the same time, defaults to 4
+        returns: [{stage: result}] for every grid point, None for the stages that failed
+        """
+        depends = self.dependencies()
+        unused = set().union(*[set(p) for p in grid]) - set().union(*depends.values()) if grid else set()
+        if unused:
+            print("Parameters no stage reads (they only label the results): " + ", ".join(sorted(unused)))
+        graph = StageGraph()
+        instances = {}  # {(stage, parameter values): run name}
+        points = []  # [{stage: run name}] per grid point
+        self.runs = dict((name, 0) for name in self.order)
+        for point in grid:
+            names = {}
+            for name in self.order:
+                key = (name, tuple((p, repr(point[p])) for p in sorted(depends[name])))
+                if key not in instances:
+                    instances[key] = name if not depends[name] else "%s[%d]" % (name, self.runs[name])
+                    requires = [(d, names[d]) for d in self.stages[name][1]]
+                    graph.add(instances[key], self._instance(name, point, requires), requires=[r for _, r in requires])
+                    self.runs[name] += 1
+                names[name] = instances[key]
+            points.append(names)
+        print("Sweep of " + str(len(grid)) + " points: " + ", ".join("%s %d runs" % (n, self.runs[n]) for n in self.order))
+        self.graph = graph
+        outputs = graph.run(workers=workers or 4)
+        results = []
+        self.failed = []
+        for i, names in enumerate(points):
+            result = {}
+            for name in self.order:
+                output = outputs[names[name]]
+                if isinstance(output, _Failed):
+                    if output.name == name:
+                        self.failed.append((i, name, output.error))
+                    output = None
+                result[name] = output
+            results.append(result)
+        return results
+
+
+def SweepTable(grid, results, table, failed=(), labels=None):
+    """
+    table(result) -> DataFrame for the {stage: result} of one grid point
+    failed: Sweep.failed, those points are left out
+    labels: parameters to add as columns, defaults to all of them
+    returns: one DataFrame with the rows of every point, a "point" column and one column per parameter in front
+    """
+    skip = set(i for i, _, _ in failed)
+    frames = []
+    for i, (point, result) in enumerate(zip(grid, results)):
+        if i in skip:
+            continue
+        df = table(result)
+        df = df.reset_index() if df.index.name else df.copy()  # e.g. the intensity index of portfolio.SiteTable
+        for n, name in enumerate(["point"] + list(labels or point)):
+            df.insert(n, name, i if name == "point" else point[name])
+        frames.append(df)
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,13 @@
+# -------------------------------------------------------------------------------
+# Name:        conftest.py
+# Purpose:     Make the flat modules of Resilience_Orchestration importable from the tests
+#
+# Created:     10/18/2026
+# Licence:     The University of Notre Dame
+# -------------------------------------------------------------------------------
+
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
@@ -0,0 +1,32 @@
+# -------------------------------------------------------------------------------
+# Name:        test_curves.py
+# Purpose:     CurveSet fits each curve once, with either fitter, and loads it from the SplineCache afterwards
+#
+# Created:     10/18/2026
+# Licence:     The University of Notre Dame
+# -------------------------------------------------------------------------------
+
+import numpy as np
+import pytest
+from curves import CurveSet
+from spline_cache import SplineCache
+
+X = np.array([0.0025, 0.0113, 0.0253, 0.057, 0.128, 0.288, 0.649, 1.46, 2.19])
+DATA = {"Chicago IL": {"PGA": (X, np.array([2.08e-02, 4.59e-03, 1.68e-03, 5.02e-04, 1.62e-04, 5.16e-05, 1.37e-05,
+                                            2.26e-06, 5.36e-07])),
+                       "SA1P0": (X, np.array([1.99e-02, 4.30e-03, 1.59e-03, 3.68e-04, 5.06e-05, 7.13e-06, 1.10e-06,
+                                              1.11e-07, 2.73e-08]))}}
+
+
+@pytest.mark.parametrize("method", ["pchip", "spline"])
+def test_fitted_once_then_cached(tmp_path, method):
+    first = CurveSet(DATA, cache=SplineCache(str(tmp_path)), method=method)
+    fitted = [first["Chicago IL"][model] for model in ("PGA", "SA1P0", "PGA")]
+    assert first.fits == 2 and first.cache.misses == 2
+
+    second = CurveSet(DATA, cache=SplineCache(str(tmp_path)), method=method)
+    assert second.prefetch(["Chicago IL"]) == 0
+    assert second.cache.hits == 2
+    q = np.log(X)
+    np.testing.assert_allclose(second["Chicago IL"]["PGA"](q), fitted[0](q), rtol=1e-12)
+    np.testing.assert_allclose(second["Chicago IL"]["SA1P0"](q), fitted[1](q), rtol=1e-12)
@@ -0,0 +1,77 @@
+# -------------------------------------------------------------------------------
+# Name:        test_elements.py
+# Purpose:     The split element parser gives what the literal_eval parser gives
+#
+# Created:     10/18/2026
+# Licence:     The University of Notre Dame
+# -------------------------------------------------------------------------------
+
+import os
+import numpy as np
+import pytest
+from elements import ParseElementLiteral, ParseElementLiteralReference, ElementTable, STRING_FIELDS
+from ifc_structure import ReadIfcStructure, ElementLiteral
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# The column and beam literals quoted in colvol.py (GeoLinked graph literals)
+COLVOL_LITERALS = [
+    ("[[<Element {http://www.iai-tech.org/ifcXML/IFC2x2/FINAL}IfcColumn at 0x136b6808>, ('Concrete-Square-Column:14 x "
+     "14:528211', 'name'), ('i3438', 'id'), ([('CadID', '528211'), ('world_direction_ratios', ['6.123031769E-17', '1.'"
+     "]), ('depth', ['8.572916667']), ('XandYDim', ['0.08333333333', '0.08333333333']), ('profile_location', ['-3.5527"
+     "13679E-15', '0.']), ('reference_direction', ['1.', '0.']), ('local_direction_ratios', ['-75.50063228', '53.15938"
+     "446', '10.']), ('position', ['-75.50063228', '53.15938446', '10.']), ('extrude_direction', ['0.', '0.', '1.'])],"
+     " 'coors')]]"),
+    ("[[<Element {http://www.iai-tech.org/ifcXML/IFC2x2/FINAL}IfcBeam at 0x134f3908>, ('Concrete-Rectangular Beam:9x18"
+     ":528821', 'name'), ('i4255', 'id'), ([('CadID', ['528821']), ('position', []), ('local_direction_ratios', ['1.',"
+     " '0.', '0.']), ('reference_direction', ['0.', '0.', '0.']), ('profile_location', []), ('XandYDim', ['None', 'Non"
+     "e', 'None'])], 'coors')]]"),
+    ("[[<Element {http://www.iai-tech.org/ifcXML/IFC2x2/FINAL}IfcBeam at 0x42d66c8>, ('W Shapes:W14X22:587548', 'name'"
+     "), ('i1963', 'id'), ([('CadID', ['587548']), ('position', ['-76.04229895', '62.6177178', '0.']), ('local_directi"
+     "on_ratios', []), ('reference_direction', []), ('profile_location', ['0.5708333333', '-0.2083333333', '-1.1416666"
+     "67']), ('XandYDim', ['18.85833333', '0.4166666667', '1.141666667'])], 'coors')]]")]
+EDGE_CASES = [
+    str(ElementLiteral("IfcBeam", "i12", "O'Brien \\ beam:W8X10:99", [("CadID", "99"), ("XandYDim", ["1.5", "2", "3e-2"]),
+                                                                     ("depth", [4.0])])),
+    str(ElementLiteral("IfcColumn", "i13", "", [("position", [1.0, None, -2.5])])),
+    str(ElementLiteral("IfcColumn", "i14", 'say "hi":C:1', [("CadID", []), ("world_direction_ratios", [])])),
+]
+
+
+def _same(ours, reference):
+    assert set(ours) == set(reference)
+    for field in reference:
+        if isinstance(reference[field], str):
+            assert ours[field] == reference[field], field
+        else:
+            np.testing.assert_array_equal(ours[field], reference[field], err_msg=field)
+
+
+@pytest.mark.parametrize("literal", COLVOL_LITERALS + EDGE_CASES)
+def test_split_parser_gives_the_literal_eval_result(literal):
+    _same(ParseElementLiteral(literal), ParseElementLiteralReference(literal))
+
+
+@pytest.mark.parametrize("name", ["bRC_FRAME_Concrete_allComponents.ifcxml", "cRC_FRAME_Concrete_ReinforcementCheck.ifcxml"])
+def test_every_element_of_the_models(name):
+    components = ReadIfcStructure(os.path.join(ROOT, "TempXMLs", name))
+    for kind in ("columns", "beams"):
+        for literals in components[kind].values():
+            for literal in literals:
+                _same(ParseElementLiteral(literal), ParseElementLiteralReference(literal))
+
+
+@pytest.mark.parametrize("literal", ["foo", "[1, 2]", ""])
+def test_not_an_element(literal):
+    with pytest.raises(ValueError):
+        ParseElementLiteral(literal)
+    with pytest.raises(ValueError):
+        ParseElementLiteralReference(literal)
+
+
+def test_table():
+    table, errors = ElementTable({"c1": COLVOL_LITERALS[:1], "b1": COLVOL_LITERALS[1:]}, {"x": ["foo"]})
+    assert len(table) == 3 and [e["subject"] for e in errors] == ["x"]
+    assert list(table["section"]) == ["14 x 14", "9x18", "W14X22"]
+    np.testing.assert_array_equal(table["XandYDim"][2], [18.85833333, 0.4166666667, 1.141666667])
+    assert np.isnan(table["XandYDim"][1]).all() and table["depth"][0] == 8.572916667
+    assert set(STRING_FIELDS) <= set(table.dtype.names)
@@ -0,0 +1,38 @@
+# -------------------------------------------------------------------------------
+# Name:        test_graph_cache.py
+# Purpose:     The binary graph cache gives back the graph it was made from, in about the size of its text
+#
+# Created:     10/18/2026
+# Licence:     The University of Notre Dame
+# -------------------------------------------------------------------------------
+
+import os
+from rdflib import Graph, URIRef, BNode, Literal
+from rdflib.namespace import XSD
+from graph_cache import LoadGraph, EncodeGraph, DecodeGraph
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MY_GRAPH = os.path.join(ROOT, "MyGraph.ttl")
+
+
+def test_terms_survive_the_round_trip():
+    graph = Graph()
+    graph.bind("ubo", "http://www.sw.org/UBO#")
+    s = URIRef("http://www.sw.org/UBO#Column1")
+    graph.add((s, URIRef("http://www.sw.org/UBO#hasValue"), Literal("[[('name', 'Säule 14 x 14')]]")))
+    graph.add((s, URIRef("http://www.sw.org/UBO#hasLabel"), Literal("colonne", lang="fr")))
+    graph.add((s, URIRef("http://www.sw.org/UBO#depth"), Literal("8.5", datatype=XSD.double)))
+    graph.add((s, URIRef("http://www.sw.org/UBO#hasPart"), BNode("b1")))
+    graph.add((s, URIRef("http://www.sw.org/UBO#hasName"), Literal("")))
+    decoded = DecodeGraph(EncodeGraph(graph))
+    assert set(decoded) == set(graph)
+    assert dict(decoded.namespaces())["ubo"] == URIRef("http://www.sw.org/UBO#")
+
+
+def test_cached_graph_is_the_parsed_one(tmp_path):
+    parsed = LoadGraph(MY_GRAPH, str(tmp_path))
+    cached = LoadGraph(MY_GRAPH, str(tmp_path))
+    assert set(cached) == set(parsed) == set(Graph().parse(MY_GRAPH, format="turtle"))
+    (cache_file,) = os.listdir(str(tmp_path))
+    # Strings as UTF-8 bytes, not padded to the longest literal
+    assert os.path.getsize(os.path.join(str(tmp_path), cache_file)) < 2 * os.path.getsize(MY_GRAPH)
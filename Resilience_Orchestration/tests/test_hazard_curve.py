@@ -0,0 +1,44 @@
+# -------------------------------------------------------------------------------
+# Name:        test_hazard_curve.py
+# Purpose:     HazardCurve is monotone and sa() is the inverse of rate() on the USGS curves of the repository
+#
+# Created:     10/18/2026
+# Licence:     The University of Notre Dame
+# -------------------------------------------------------------------------------
+
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from hazard_curve import HazardCurve
+
+MATLAB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "MATLAB Codes")
+
+
+def _curves():
+    for name in ("total.csv", "total_SA0P2.csv", "total_SA1.csv"):
+        df = pd.read_csv(os.path.join(MATLAB, name), header=None)
+        X = df.iloc[0, 3:].values.astype(np.float64)
+        for row, Y in enumerate(df.iloc[1:, 3:].values.astype(np.float64)):
+            yield pytest.param(X, Y, id="%s-%d" % (name, row))
+
+
+@pytest.mark.parametrize("X, Y", list(_curves()))
+def test_sa_inverts_rate(X, Y):
+    curve = HazardCurve(X, Y)
+    sa = np.exp(np.random.default_rng(0).uniform(np.log(curve.x[0]) - 1., np.log(curve.x[-1]) + 1., 20000))
+    rates = curve.rate(sa)
+    assert np.all(np.diff(rates[np.argsort(sa)]) <= 0)
+    np.testing.assert_allclose(curve.sa(rates), sa, rtol=1e-12)
+    np.testing.assert_allclose(curve.rate(curve.sa(rates)), rates, rtol=1e-12)
+    np.testing.assert_allclose(curve.sa(curve.y), curve.x, rtol=1e-12)
+    restored = HazardCurve.from_arrays(curve.arrays())
+    np.testing.assert_array_equal(restored.sa(rates), curve.sa(rates))
+
+
+def test_flat_stretches_and_ends():
+    curve = HazardCurve([0.1, 0.2, 0.3, 0.4], [1e-2, 1e-3, 1e-3, 1e-4])
+    np.testing.assert_allclose(curve.sa(1e-3), 0.2, rtol=1e-12)  # where the flat stretch starts
+    assert curve.sa(0.) == np.inf
+    assert curve.sa([[5e-4]]).shape == (1, 1)
+    np.testing.assert_allclose(curve.rate(curve.sa([2e-2, 1e-5])), [2e-2, 1e-5], rtol=1e-12)
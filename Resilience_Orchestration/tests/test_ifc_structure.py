@@ -0,0 +1,45 @@
+# -------------------------------------------------------------------------------
+# Name:        test_ifc_structure.py
+# Purpose:     The ifcxml fast path against GeoLinked graphs of the same model
+#
+# Created:     10/18/2026
+# Licence:     The University of Notre Dame
+# -------------------------------------------------------------------------------
+
+import os
+import pytest
+from rdflib import Graph
+from Q_Semantic_Graph import GraphData
+from ifc_structure import ReadIfcStructure, CompareWithGraph
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+BRC = os.path.join(ROOT, "TempXMLs", "bRC_FRAME_Concrete_allComponents.ifcxml")
+# The whole GeoLinked graph of BRC, main() keeps ifc_fast_path = 0 until it is here and the full comparison passes
+BRC_GRAPH = os.path.join(HERE, "fixtures", "bRC_FRAME_Concrete_allComponents.ttl")
+
+
+def _components(path):
+    return GraphData().get_components(Graph().parse(path, format="turtle"))
+
+
+@pytest.fixture(scope="module")
+def brc():
+    return ReadIfcStructure(BRC)
+
+
+def test_fast_path_matches_the_geolinked_elements(brc):
+    graph = _components(os.path.join(HERE, "fixtures", "bRC_FRAME_geolinked_elements.ttl"))
+    assert len(graph["columns"]) == 1 and len(graph["beams"]) == 1
+    assert CompareWithGraph(brc, graph, partial=True) == []
+
+
+def test_another_model_does_not_pass(brc):
+    differences = CompareWithGraph(brc, _components(os.path.join(ROOT, "MyGraph.ttl")))
+    assert any(line.startswith("elevations") for line in differences)
+    assert any(line.endswith("only in the ifcxml") for line in differences)
+
+
+@pytest.mark.skipif(not os.path.exists(BRC_GRAPH), reason="no full GeoLinked graph of the bRC model yet")
+def test_fast_path_matches_the_whole_graph(brc):
+    assert CompareWithGraph(brc, _components(BRC_GRAPH)) == []
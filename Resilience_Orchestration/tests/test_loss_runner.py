@@ -0,0 +1,48 @@
+# -------------------------------------------------------------------------------
+# Name:        test_loss_runner.py
+# Purpose:     RunLosses against the scalar calc_losses transcription, with more than one fragility group
+#
+# Created:     10/18/2026
+# Licence:     The University of Notre Dame
+# -------------------------------------------------------------------------------
+
+import numpy as np
+from losses import CalcLossesReference, THETA, BETA, RC, QUANT
+from loss_runner import RunLosses
+
+DRIFTS = np.array([[[0.004, 0.006, 0.005], [0.003, 0.005, 0.004]],
+                   [[0.012, 0.015, 0.010], [0.009, 0.011, 0.013]]])  # (num_int, 2, n_floors)
+B_SD = np.array([[0.35, 0.40], [0.45, 0.30]])
+# Two independent groups: the drift group of calc_losses and a cheaper one driven by the same drifts
+GROUPS = [("drift", THETA, BETA, RC, QUANT), ("drift", THETA * 1.5, BETA, RC / 2., QUANT)]
+NZ, CHUNK, SEED = 300, 128, 7
+
+
+def _reference_samples(groups):
+    """(num_int, 2, Nz, n_floors) losses of every sample, each group on the stream RunLosses gives it"""
+    L = np.zeros(DRIFTS.shape[:2] + (NZ, DRIFTS.shape[-1]))
+    for i in range(DRIFTS.shape[0]):
+        for k in range(2):
+            for c, start in enumerate(range(0, NZ, CHUNK)):
+                stop = min(NZ, start + CHUNK)
+                for g, (_, theta, beta, rc, quant) in enumerate(groups):
+                    rng = np.random.default_rng(np.random.SeedSequence(SEED, spawn_key=(g, i, k, c)))
+                    for s, z in enumerate(rng.standard_normal(stop - start)):
+                        L[i, k, start + s] += CalcLossesReference(DRIFTS[i, k], B_SD[i, k], [z], beta=beta,
+                                                                  theta=theta, RC=rc, quant=quant)
+    return L
+
+
+def test_groups_are_added_sample_by_sample():
+    result = RunLosses(DRIFTS, B_SD, Nz=NZ, seed=SEED, workers=1, chunk=CHUNK, groups=GROUPS, keep_samples=True)
+    reference = _reference_samples(GROUPS)
+    np.testing.assert_allclose(result["mean"], reference.mean(axis=2), rtol=1e-9)
+    np.testing.assert_allclose(result["std"], reference.std(axis=2), rtol=1e-7)
+    np.testing.assert_allclose(result["samples"], np.sort(reference, axis=2), rtol=1e-9)
+
+
+def test_independent_groups_do_not_add_their_spreads():
+    one = RunLosses(DRIFTS, B_SD, Nz=20000, seed=SEED, workers=1, groups=GROUPS[:1])
+    two = RunLosses(DRIFTS, B_SD, Nz=20000, seed=SEED, workers=1, groups=GROUPS[:1] * 2)
+    # Two identical independent groups: sqrt(2) times the spread of one, 2 if they were added sorted
+    np.testing.assert_allclose(two["std"] / one["std"], np.sqrt(2.), rtol=0.05)
@@ -0,0 +1,59 @@
+# -------------------------------------------------------------------------------
+# Name:        test_losses.py
+# Purpose:     The vectorized calc_losses against the scalar transcription and against losses worked out by hand
+#
+# Created:     10/18/2026
+# Licence:     The University of Notre Dame
+# -------------------------------------------------------------------------------
+
+import numpy as np
+from losses import CalcLosses, CalcLossesReference, TOLERANCE
+
+# Fragility data of Test_cost.m (exterior wall, OMF), with its quantities
+THETA = np.array([[0.4, 2.26, 2.67], [0.0175, 0.0225, 0.0322]])
+BETA = np.array([[0.4, 0.3, 0.25], [0.4, 0.4, 0.4]])
+RC = np.array([[1776.67, 3720, 5460], [27846, 38978.4, 47978.4]])
+QUANT = np.array([8, 8])
+DRIFTS = np.array([0.004, 0.006, 0.005, 0.003])
+Z = np.random.default_rng(0).standard_normal(500)
+
+
+def test_mean_matches_the_reference():
+    result = CalcLosses(DRIFTS, 0.35, BETA, THETA, RC=RC, quant=QUANT, z=Z)
+    reference = CalcLossesReference(DRIFTS, 0.35, Z, beta=BETA, theta=THETA, RC=RC, quant=QUANT)
+    np.testing.assert_allclose(result["mean"], reference, rtol=TOLERANCE)
+
+
+def test_samples_are_the_reference_losses_of_each_z():
+    each = np.array([CalcLossesReference(DRIFTS, 0.35, [z], beta=BETA, theta=THETA, RC=RC, quant=QUANT) for z in Z])
+    unsorted = CalcLosses(DRIFTS, 0.35, BETA, THETA, RC=RC, quant=QUANT, z=Z, sort=False)
+    np.testing.assert_allclose(unsorted["samples"], each, rtol=TOLERANCE)
+    np.testing.assert_allclose(unsorted["std"], each.std(axis=0), rtol=1e-7)
+    # Sorted over the samples for every floor, like L in calc_losses.m; chunking does not change anything
+    result = CalcLosses(DRIFTS, 0.35, BETA, THETA, RC=RC, quant=QUANT, z=Z)
+    small_chunks = CalcLosses(DRIFTS, 0.35, BETA, THETA, RC=RC, quant=QUANT, z=Z, max_bytes=1)
+    np.testing.assert_allclose(result["samples"], np.sort(each, axis=0), rtol=TOLERANCE)
+    np.testing.assert_array_equal(small_chunks["samples"], result["samples"])
+    assert np.all(np.diff(result["samples"], axis=0) >= 0)
+
+
+def test_losses_worked_out_by_hand():
+    # One assembly with two damage states, quant 2, RC 100 and 300, both medians' dispersion 0.5
+    theta, beta, rc, quant = np.array([[0.01, 0.02]]), np.array([[0.5, 0.5]]), np.array([[100., 300.]]), [2]
+    # z = 0: D = 0.01, F1 = normcdf(0) = 0.5, F2 = normcdf(log(0.5) / 0.5) = 0.0828285...
+    #   L = 2 * (100 * (F1 - F2) + 300 * F2) = 100 + 400 * F2
+    # z = 1 with b_SD = 0.5: D = 0.01 * exp(0.5), F1 = normcdf(1), F2 = normcdf((0.5 - log(2)) / 0.5)
+    result = CalcLosses([0.01], 0.5, beta, theta, RC=rc, quant=quant, z=np.array([1., 0.]), sort=False)
+    np.testing.assert_allclose(result["samples"][:, 0], [308.12468445398497, 133.13140760067938], rtol=1e-12)
+    np.testing.assert_allclose(result["mean"], [(308.12468445398497 + 133.13140760067938) / 2], rtol=1e-12)
+    # A drift of 0 is no damage
+    assert CalcLosses([0.], 0.5, beta, theta, RC=rc, quant=quant, z=np.zeros(3))["mean"][0] == 0.
+
+
+def test_batched_drifts_get_their_own_samples():
+    drifts = np.stack([DRIFTS, DRIFTS * 2])  # (2, n_floors), e.g. two intensities
+    z = np.random.default_rng(1).standard_normal((200, 2))
+    result = CalcLosses(drifts, [0.3, 0.45], BETA, THETA, RC=RC, quant=QUANT, z=z)
+    for i, b in enumerate([0.3, 0.45]):
+        reference = CalcLossesReference(drifts[i], b, z[:, i], beta=BETA, theta=THETA, RC=RC, quant=QUANT)
+        np.testing.assert_allclose(result["mean"][i], reference, rtol=TOLERANCE)
@@ -0,0 +1,61 @@
+# -------------------------------------------------------------------------------
+# Name:        test_spline_cache.py
+# Purpose:     Cached splines and curves evaluate like the fitted ones, keys, eviction
+#
+# Created:     10/18/2026
+# Licence:     The University of Notre Dame
+# -------------------------------------------------------------------------------
+
+import os
+import numpy as np
+from scipy.interpolate import UnivariateSpline, splev
+from hazard_curve import HazardCurve
+from spline_cache import SplineCache, SplineKey, SplineTck
+
+X = np.array([0.0025, 0.0045, 0.0075, 0.0113, 0.0169, 0.0253, 0.038, 0.057, 0.0854, 0.128, 0.192, 0.288, 0.432,
+              0.649, 0.973, 1.46, 2.19])
+Y = np.array([2.08e-02, 1.16e-02, 6.98e-03, 4.59e-03, 2.91e-03, 1.68e-03, 9.14e-04, 5.02e-04, 2.84e-04, 1.62e-04,
+              9.25e-05, 5.16e-05, 2.76e-05, 1.37e-05, 6.11e-06, 2.26e-06, 5.36e-07])
+Q = np.linspace(np.log(X[0]) - 1., np.log(X[-1]) + 1., 200)  # past both ends too
+
+
+def test_spline_comes_back_the_same(tmp_path):
+    cache = SplineCache(str(tmp_path))
+    for degree in (1, 3, 5):
+        spl = UnivariateSpline(np.log(X), np.log(Y), k=degree)
+        np.testing.assert_allclose(splev(Q, SplineTck(spl)), spl(Q), rtol=1e-13)
+        key = SplineKey(X, Y, degree, 500)
+        cache.put(key, spl)
+        np.testing.assert_allclose(cache.get(key)(Q), spl(Q), rtol=1e-13)
+    assert cache.hits == 3
+
+
+def test_curve_comes_back_the_same(tmp_path):
+    cache = SplineCache(str(tmp_path))
+    curve = HazardCurve(X, Y)
+    key = SplineKey(X, Y, 3, 500, "pchip")
+    cache.put(key, curve)
+    np.testing.assert_array_equal(cache.get(key)(Q), curve(Q))
+    assert cache.get(SplineKey(X, Y * 2, 3, 500, "pchip")) is None
+
+
+def test_pchip_key_only_depends_on_the_data():
+    assert SplineKey(X, Y, 3, 500, "pchip") == SplineKey(X, Y, 5, 100, "pchip")
+    assert SplineKey(X, Y, 3, 500) != SplineKey(X, Y, 3, 100)
+    assert SplineKey(X, Y, 3, 500) != SplineKey(X, Y, 5, 500)
+    assert SplineKey(X, Y, 3, 500, "pchip") != SplineKey(X, Y, 3, 500)
+
+
+def test_cache_stays_within_max_bytes_while_it_is_used(tmp_path):
+    curve = HazardCurve(X, Y)
+    cache = SplineCache(str(tmp_path))
+    cache.put("size", curve)
+    entry = os.path.getsize(cache.path("size"))
+    os.remove(cache.path("size"))
+
+    cache = SplineCache(str(tmp_path), max_bytes=5 * entry)
+    for i in range(20):
+        cache.put("curve%d" % i, curve)
+        total = sum(os.path.getsize(os.path.join(str(tmp_path), name)) for name in os.listdir(str(tmp_path)))
+        assert total <= 5 * entry
+    assert os.path.exists(cache.path("curve19"))
@@ -0,0 +1,87 @@
+# -------------------------------------------------------------------------------
+# Name:        test_static_response.py
+# Purpose:     Batched median_dispersions against its scalar transcription, and the deliberate deviations from the .m
+#
+# Created:     10/18/2026
+# Licence:     The University of Notre Dame
+# -------------------------------------------------------------------------------
+
+import numpy as np
+import pytest
+from static_response import (MedianDispersions, MedianDispersionsReference, DispersionTable, ResponseCoefficients,
+                             SiteCoefficient, FRAME_TYPE_P)
+
+HJ = np.array([10., 20., 30.])
+G = 386.1
+VY = np.array([500., 800.])
+GAMMA = np.array([1.3, 1.25])
+W1 = np.array([900., 850.])
+WEIGHT = 1000.
+DISP = np.array([[0.002, 0.005, 0.007], [0.001, 0.003, 0.0045]])  # (2, n_floors)
+SA = np.array([[0.1, 0.2], [0.4, 0.7], [1.2, 1.5], [3.0, 4.5], [6.0, 9.0]])  # S from below 1 to past the table
+PGA = np.array([0.05, 0.2, 0.5, 1.1, 2.4])
+SA_1 = np.array([0.04, 0.15, 0.4, 0.9, 2.0])
+
+
+def _run(T1, Frame_type="Moment", Soil_Site_class="B", Vy=VY):
+    return MedianDispersions(T1, Vy, HJ, G, SA, PGA, SA_1, GAMMA, Frame_type, Soil_Site_class, DISP, W1, WEIGHT)
+
+
+@pytest.mark.parametrize("T1", [[0.15, 0.45], [0.6, 0.9], [1.6, 2.5]])
+@pytest.mark.parametrize("Frame_type", sorted(FRAME_TYPE_P))
+@pytest.mark.parametrize("Soil_Site_class", ["A", "C", "D", "E"])
+def test_matches_the_reference(T1, Frame_type, Soil_Site_class):
+    T1 = np.array(T1)
+    result = _run(T1, Frame_type, Soil_Site_class)
+    dispersions = DispersionTable()
+    for i in range(len(SA)):
+        drift, vel, accel, b_SD, b_FA, b_FV, b_RD = MedianDispersionsReference(
+            T1, VY, HJ, G, SA[i], PGA[i], SA_1[i], GAMMA, FRAME_TYPE_P[Frame_type], ResponseCoefficients(len(HJ)),
+            DISP.T, W1, WEIGHT, SiteCoefficient(Soil_Site_class), dispersions)
+        np.testing.assert_allclose(result["m_drift_ratios"][i], drift.T, rtol=1e-12)
+        np.testing.assert_allclose(result["m_vel_ratios"][i], vel.T, rtol=1e-12)
+        np.testing.assert_allclose(result["m_accel"][i], accel.T, rtol=1e-12)
+        np.testing.assert_allclose(result["b_SD"][i], b_SD, rtol=1e-12)
+        np.testing.assert_allclose(result["b_FA"][i], b_FA, rtol=1e-12)
+        np.testing.assert_allclose(result["b_FV"][i], b_FV, rtol=1e-12)
+
+
+def test_site_coefficient_comes_from_the_soil_class():
+    # a is undefined in median_dispersions.m, it is taken from Soil_Site_class like in equiv_static_forces.m
+    assert [SiteCoefficient(c) for c in ("A", "B", "C", "D", "E", "F")] == [130., 130., 90., 60., 60., 60.]
+    T1 = np.array([0.15, 0.45])
+    S = SA * WEIGHT / VY
+    for soil, a in (("B", 130.), ("C", 90.), ("D", 60.)):
+        C1 = _run(T1, Soil_Site_class=soil)["C1"]
+        inelastic = S > 1
+        expected = np.where(T1 <= 0.2, 1 + (S - 1) / (0.04 * a), 1 + (S - 1) / (a * T1 ** 2))
+        np.testing.assert_allclose(C1[inelastic], expected[inelastic], rtol=1e-12)
+        assert np.all(C1[~inelastic] == 1.)
+
+
+def test_velocity_uses_the_yield_strength_of_its_own_direction():
+    T1 = np.array([0.6, 0.9])
+    result = _run(T1)
+    other = _run(T1, Vy=np.array([5000., VY[1]]))  # only Vy of x changes
+    for name in ("m_drift_ratios", "m_vel_ratios", "m_accel", "b_SD", "S", "V"):
+        np.testing.assert_array_equal(result[name][:, 1], other[name][:, 1])
+        assert not np.allclose(result[name][:, 0], other[name][:, 0])
+    # The velocity term of y, without the correction factor, with Vy of y (the .m file used Vy(1) for both)
+    PGV = SA_1[:, None] * G / (2 * np.pi) / 1.65
+    vs = PGV + 0.3 * T1[1] * (VY[1] * G * GAMMA[1] / W1[1]) * (DISP[1] / DISP[1, -1]) / (2 * np.pi)
+    c = ResponseCoefficients(len(HJ))[FRAME_TYPE_P["Moment"] - 1 + 3]
+    r = HJ / HJ[-1]
+    S = result["S"][:, 1:2]
+    correction = np.exp(c[0] + c[1] * T1[1] + c[2] * S + c[3] * r + c[4] * r ** 2 + c[5] * r ** 3)
+    np.testing.assert_allclose(result["m_vel_ratios"][:, 1], correction * vs, rtol=1e-12)
+
+
+def test_dispersions_are_clipped_to_the_table():
+    table = DispersionTable()
+    (T_low, S_low), (T_high, S_high) = table.lower, table.upper
+    # Outside the table the values of its edge, never an extrapolation (or the NaN of scatteredInterpolant's hull)
+    np.testing.assert_array_equal(table(5., 20.), table(T_high, S_high))
+    np.testing.assert_array_equal(table(0.01, 0.2), table(T_low, S_low))
+    np.testing.assert_array_equal(table(0.75, 20.), table(0.75, S_high))
+    np.testing.assert_array_equal(table(5., 3.), table(T_high, 3.))
+    assert np.all(np.isfinite(np.array(table(np.linspace(0., 4., 9), np.linspace(0., 12., 9)))))
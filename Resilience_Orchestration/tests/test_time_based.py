@@ -0,0 +1,64 @@
+# -------------------------------------------------------------------------------
+# Name:        test_time_based.py
+# Purpose:     The batched time-based assessment against the scalar transcription of time_based_assessment.m
+#
+# Created:     10/18/2026
+# Licence:     The University of Notre Dame
+# -------------------------------------------------------------------------------
+
+import os
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.io as sio
+from scipy.interpolate import PchipInterpolator
+from time_based import TimeBasedAssessment, TimeBasedAssessmentReference, BatchedPCHIP, TOLERANCE
+
+MATLAB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "MATLAB Codes")
+OUTPUTS = ["Sa_min", "Sa_max", "lfm", "Dl", "Sax", "Say", "PGA", "Sa_1"]
+
+
+def _sites(name):
+    df = pd.read_csv(os.path.join(MATLAB, name), header=None)
+    X = df.iloc[0, 3:].values.astype(np.float64)
+    return [(X, Y) for Y in df.iloc[1:, 3:].values.astype(np.float64)]
+
+
+def _check(T1x, T1y, num_int, PGA, SA1, SA02):
+    result = TimeBasedAssessment(T1x, T1y, num_int, PGA, SA1, SA02)
+    for site in range(len(PGA)):
+        for pair in range(len(T1x)):
+            reference = TimeBasedAssessmentReference(T1x[pair], T1y[pair], num_int, PGA[site][0], PGA[site][1],
+                                                     SA1[site][0], SA1[site][1], SA02[site][0], SA02[site][1])
+            for name in OUTPUTS:
+                np.testing.assert_allclose(result[name][site, pair], reference[name], rtol=TOLERANCE, atol=0,
+                                           err_msg="%s site %d pair %d" % (name, site, pair))
+
+
+def test_matlab_inputs():
+    """The curves and periods saved with the MATLAB code (USGS_modal.mat)"""
+    m = sio.loadmat(os.path.join(MATLAB, "USGS_modal.mat"))
+    curve = lambda name: (m[name + "x"].ravel(), m[name + "y"].ravel())
+    _check([m["T1x"].item()], [m["T1y"].item()], 8, [curve("PGA")], [curve("SA1")], [curve("SA02")])
+
+
+@pytest.mark.parametrize("num_int", [1, 8, 20])
+def test_all_sites_and_period_branches(num_int):
+    # Tm below 0.2 s, between 0.2 and 0.7 s, above 0.7 s and above 1 s (Sa_min = 0.05 / Tm)
+    T1x = [0.1, 0.236, 0.5, 0.9, 1.6]
+    T1y = [0.15, 0.26, 0.6, 0.8, 2.0]
+    _check(T1x, T1y, num_int, _sites("total.csv"), _sites("total_SA1.csv"), _sites("total_SA0P2.csv"))
+
+
+def test_batched_pchip_is_pchip_on_every_row():
+    rng = np.random.default_rng(3)
+    n = np.array([2, 3, 5, 9])
+    x = np.full((len(n), n.max()), np.nan)
+    y = np.full((len(n), n.max()), np.nan)
+    for i, m in enumerate(n):
+        x[i, :m] = np.cumsum(rng.uniform(0.1, 1., m))
+        y[i, :m] = rng.normal(size=m)
+    q = rng.uniform(-1., 10., (len(n), 50))  # outside the points too: the end pieces go on
+    values = BatchedPCHIP(x, y, n)(q)
+    for i, m in enumerate(n):
+        np.testing.assert_allclose(values[i], PchipInterpolator(x[i, :m], y[i, :m])(q[i]), rtol=1e-10, atol=1e-12)
@@ -0,0 +1,256 @@
+# -------------------------------------------------------------------------------
+# Name:        time_based.py
+# Purpose:     FEMA P-58 time-based hazard discretization (time_based_assessment.m and haz_curve_l.m) in NumPy
+#
+# Created:     10/18/2026
+# Licence:     The University of Notre Dame
+# -------------------------------------------------------------------------------
+
+'''
+Same outputs as the MATLAB time_based_assessment function (lfm, Dl, Sax, Say, PGA, Sa_1, plus Sa_min and Sa_max),
+for many sites and many (T1x, T1y) pairs in one call and without a MATLAB engine:
+
+    result = TimeBasedAssessment(T1x, T1y, num_int, PGA_curves, SA1_curves, SA02_curves)
+    result["Sax"][site, pair, interval]
+
+PGA_curves, SA1_curves and SA02_curves are lists with one (X, Y) hazard curve per site, e.g. from SiteCurves().
+Every interp1(..., 'PCHIP') call of the MATLAB code is replaced by BatchedPCHIP, which evaluates the same
+shape-preserving piecewise cubic (Fritsch-Carlson slopes, MATLAB's end conditions, extrapolation with the end pieces)
+for all sites at once. TimeBasedAssessmentReference() below is a line-by-line transcription of the .m files on
+scipy's PchipInterpolator (the same end conditions as MATLAB's pchip); tests/test_time_based.py checks that both
+agree within TOLERANCE (relative) on the inputs saved with the MATLAB code (USGS_modal.mat) and on the site curves of
+the repository. No output of a MATLAB run is stored in the repository to compare with. The one deliberate difference is the trimming of the curves at their first zero rate,
+which is applied to all three curves here (InitHazardModule.m skips it for SA1 because of a typo in its find()).
+'''
+
+# #!/usr/bin/python
+import numpy as np
+from scipy.interpolate import PchipInterpolator
+
+TOLERANCE = 1e-9  # relative agreement with the scalar reference
+L_MAX = 0.0002  # maximum mean annual frequency of exceedance
+
+
+def TrimCurve(x, y):
+    """Cuts a USGS curve after its first zero rate, so that the rates can be used as interpolation points"""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    zeros = np.flatnonzero(y == 0)
+    if len(zeros):
+        x = x[:zeros[0] + 1]
+        y = y[:zeros[0] + 1]
+    return x, y
+
+
+class BatchedPCHIP():
+    """
+    One PCHIP interpolant per row of x and y, evaluated for all rows in one go
+    x, y: (n_rows, n_points) arrays, row i only uses its first n[i] points and must be increasing in x there
+    """
+
+    def __init__(self, x, y, n):
+        self.x = x
+        self.y = y
+        self.n = n
+        rows = np.arange(x.shape[0])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            h = np.diff(x, axis=1)
+            delta = np.diff(y, axis=1) / h
+            d = np.zeros_like(y)
+
+            # Interior slopes: weighted harmonic mean of the neighbouring secant slopes, zero at local extrema
+            hk1, hk = h[:, :-1], h[:, 1:]
+            mk1, mk = delta[:, :-1], delta[:, 1:]
+            w1 = 2 * hk + hk1
+            w2 = hk + 2 * hk1
+            same_sign = np.sign(mk1) * np.sign(mk) > 0
+            d[:, 1:-1] = np.where(same_sign, (w1 + w2) / (w1 / mk1 + w2 / mk), 0.0)
+
+            # End slopes: non-centered three point formula, kept shape-preserving (pchipslopes in MATLAB)
+            last = n - 1
+            d[:, 0] = self._end_slope(h[:, 0], h[:, np.minimum(1, h.shape[1] - 1)],
+                                      delta[:, 0], delta[:, np.minimum(1, h.shape[1] - 1)])
+            d[rows, last] = self._end_slope(h[rows, last - 1], h[rows, np.maximum(last - 2, 0)],
+                                            delta[rows, last - 1], delta[rows, np.maximum(last - 2, 0)])
+            # Two points only: a straight line
+            linear = n == 2
+            d[linear, 0] = delta[linear, 0]
+            d[linear, 1] = delta[linear, 0]
+        self.h = h
+        self.delta = delta
+        self.d = d
+
+    @staticmethod
+    def _end_slope(h0, h1, m0, m1):
+        d = ((2 * h0 + h1) * m0 - h0 * m1) / (h0 + h1)
+        d = np.where(np.sign(d) != np.sign(m0), 0.0, d)
+        return np.where((np.sign(m0) != np.sign(m1)) & (np.abs(d) > np.abs(3 * m0)), 3 * m0, d)
+
+    def __call__(self, q):
+        """q: (n_rows, n_queries) points to evaluate row i at; points outside the data are extrapolated"""
+        q = np.asarray(q, dtype=np.float64)
+        # Interval of every query point: number of interior break points at or below it
+        n_points = self.x.shape[1]
+        interior = np.arange(1, n_points - 1)
+        valid = interior[None, :] <= (self.n - 2)[:, None]
+        breaks = np.where(valid, self.x[:, 1:-1], np.inf)
+        k = np.sum(q[:, :, None] >= breaks[:, None, :], axis=2)
+
+        take = lambda a: np.take_along_axis(a, k, axis=1)
+        h = take(self.h)
+        delta = take(self.delta)
+        d0 = take(self.d)
+        d1 = np.take_along_axis(self.d, k + 1, axis=1)
+        t = q - take(self.x)
+        c2 = (3 * delta - 2 * d0 - d1) / h
+        c3 = (d0 - 2 * delta + d1) / h ** 2
+        return take(self.y) + t * (d0 + t * (c2 + t * c3))
+
+
+class HazardCurveTable():
+    """Hazard curves of one model for several sites, with interpolants in both directions"""
+
+    def __init__(self, curves):
+        trimmed = [TrimCurve(x, y) for x, y in curves]
+        n = np.array([len(x) for x, _ in trimmed])
+        width = n.max()
+        x = np.full((len(trimmed), width), np.nan)
+        y = np.full((len(trimmed), width), np.nan)
+        for i, (xi, yi) in enumerate(trimmed):
+            x[i, :len(xi)] = xi
+            y[i, :len(yi)] = yi
+        self.x = x
+        self.y = y
+        self.n = n
+
+        # The inverse interpolant takes every curve sorted by rate, like interp1 does with unsorted points (the rates
+        # mostly decrease with intensity, but not in every file: SA1y of USGS_modal.mat has a stray 3.78); the
+        # padding is NaN, which argsort puts last
+        order = np.argsort(y, axis=1, kind="stable")
+        self.forward = BatchedPCHIP(x, y, n)  # rate of exceedance given Sa
+        self.inverse = BatchedPCHIP(np.take_along_axis(y, order, axis=1),
+                                    np.take_along_axis(x, order, axis=1), n)  # Sa given rate of exceedance
+
+
+def _by_period(T, pga, sa02, sa1):
+    """Blends the three curves like haz_curve_l.m: PGA to SA0.2 below 0.2 s, SA0.2 up to 0.7 s, SA1/T above"""
+    short = pga + (sa02 - pga) * T / 0.2
+    return np.where(T < 0.2, short, np.where(T < 0.7, sa02, sa1))
+
+
+def HazardSa(T, l, PGA, SA02, SA1):
+    """
+    haz_curve_l(T, l, ..., flag=1): spectral acceleration at period T for the rates of exceedance l
+    T: (n_sites, ...) periods broadcastable to l, l: (n_sites, ...) rates
+    """
+    l = np.asarray(l, dtype=np.float64)
+    shape = l.shape
+    flat = l.reshape(shape[0], -1)
+    Tf = np.broadcast_to(T, shape).reshape(shape[0], -1)
+    sa = _by_period(Tf, PGA.inverse(flat), SA02.inverse(flat), SA1.inverse(flat) / Tf)
+    return sa.reshape(shape)
+
+
+def HazardRate(T, S, PGA, SA02, SA1):
+    """haz_curve_l(T, 1, S, ..., flag=0): rate of exceedance at period T for the spectral accelerations S"""
+    S = np.asarray(S, dtype=np.float64)
+    shape = S.shape
+    flat = S.reshape(shape[0], -1)
+    Tf = np.broadcast_to(T, shape).reshape(shape[0], -1)
+    lf = _by_period(Tf, PGA.forward(flat), SA02.forward(flat), SA1.forward(flat * Tf))
+    return lf.reshape(shape)
+
+
+def TimeBasedAssessment(T1x, T1y, num_int, PGA_curves, SA1_curves, SA02_curves, l_max=L_MAX):
+    """
+    T1x, T1y: fundamental periods, one entry per building/period pair
+    num_int: number of intensity intervals
+    PGA_curves, SA1_curves, SA02_curves: one (X, Y) curve per site, X spectral accelerations and Y annual rates
+
+    returns: dict of arrays, Sa_min and Sa_max are (n_sites, n_pairs); lfm, Dl, Sax, Say, PGA and Sa_1 are
+             (n_sites, n_pairs, num_int)
+    """
+    num_int = int(num_int)
+    T1x = np.atleast_1d(np.asarray(T1x, dtype=np.float64))
+    T1y = np.atleast_1d(np.asarray(T1y, dtype=np.float64))
+    PGA = HazardCurveTable(PGA_curves)
+    SA1 = HazardCurveTable(SA1_curves)
+    SA02 = HazardCurveTable(SA02_curves)
+    n_sites = len(PGA.n)
+    n_pairs = len(T1x)
+
+    Tm = np.broadcast_to((T1x + T1y) / 2, (n_sites, n_pairs))
+    Sa_min = np.where(Tm <= 1, 0.05, 0.05 / Tm)
+    Sa_max = HazardSa(Tm, np.full((n_sites, n_pairs), l_max), PGA, SA02, SA1)
+
+    # num_int intervals of equal length between Sa_min and Sa_max, and their midpoints
+    steps = np.linspace(0, 1, num_int + 1)
+    Sa = Sa_min[:, :, None] + (Sa_max - Sa_min)[:, :, None] * steps
+    Sa_m = (Sa[:, :, :-1] + Sa[:, :, 1:]) / 2
+
+    lf = HazardRate(Tm[:, :, None], Sa, PGA, SA02, SA1)
+    lfm = HazardRate(Tm[:, :, None], Sa_m, PGA, SA02, SA1)
+    Dl = lf[:, :, :-1] - lf[:, :, 1:]  # mean annual probability of ground motions within each interval
+
+    Tx = np.broadcast_to(T1x[None, :, None], lfm.shape)
+    Ty = np.broadcast_to(T1y[None, :, None], lfm.shape)
+    flat = lfm.reshape(n_sites, -1)
+    return {
+        "Sa_min": Sa_min,
+        "Sa_max": Sa_max,
+        "lfm": lfm,
+        "Dl": Dl,
+        "Sax": HazardSa(Tx, lfm, PGA, SA02, SA1),
+        "Say": HazardSa(Ty, lfm, PGA, SA02, SA1),
+        "PGA": PGA.inverse(flat).reshape(lfm.shape),
+        "Sa_1": SA1.inverse(flat).reshape(lfm.shape),
+    }
+
+
+def SiteCurves(hazard_data, sites, model):
+    """The (X, Y) curves of one model for a list of sites, from ReadHazardData's {city: {model: (X,Y) }}"""
+    return [hazard_data[s][model] for s in sites]
+
+
+def TimeBasedAssessmentReference(T1x, T1y, num_int, PGAx, PGAy, SA1x, SA1y, SA02x, SA02y, l_max=L_MAX):
+    """Scalar transcription of time_based_assessment.m for one site and one (T1x, T1y), to check against"""
+    PGAx, PGAy = TrimCurve(PGAx, PGAy)
+    SA1x, SA1y = TrimCurve(SA1x, SA1y)
+    SA02x, SA02y = TrimCurve(SA02x, SA02y)
+
+    def interp1(x, y, q):
+        order = np.argsort(x)
+        return PchipInterpolator(x[order], y[order])(q)
+
+    def haz_curve_l(Tm, l, S, flag):
+        if flag == 1:
+            if Tm < 0.2:
+                return np.interp(Tm, [0, 0.2], [0, 1]) * (interp1(SA02y, SA02x, l) - interp1(PGAy, PGAx, l)) \
+                    + interp1(PGAy, PGAx, l)
+            elif Tm < 0.7:
+                return interp1(SA02y, SA02x, l)
+            return interp1(SA1y, SA1x / Tm, l)
+        if Tm < 0.2:
+            return np.interp(Tm, [0, 0.2], [0, 1]) * (interp1(SA02x, SA02y, S) - interp1(PGAx, PGAy, S)) \
+                + interp1(PGAx, PGAy, S)
+        elif Tm < 0.7:
+            return interp1(SA02x, SA02y, S)
+        return interp1(SA1x / Tm, SA1y, S)
+
+    Tm = (T1x + T1y) / 2.0
+    Sa_min = 0.05 if Tm <= 1 else 0.05 / Tm
+    Sa_max = haz_curve_l(Tm, l_max, 1, 1)
+    Sa = np.linspace(Sa_min, Sa_max, int(num_int) + 1)
+    Sa_m = (Sa[:-1] + Sa[1:]) / 2
+    lf = haz_curve_l(Tm, 1, Sa, 0)
+    lfm = haz_curve_l(Tm, 1, Sa_m, 0)
+    return {
+        "Sa_min": Sa_min,
+        "Sa_max": Sa_max,
+        "lfm": lfm,
+        "Dl": lf[:-1] - lf[1:],
+        "Sax": haz_curve_l(T1x, lfm, Sa_min, 1),
+        "Say": haz_curve_l(T1y, lfm, Sa_min, 1),
+        "PGA": interp1(PGAy, PGAx, lfm),
+        "Sa_1": interp1(SA1y, SA1x, lfm),
+    }
@@ -10,43 +10,69 @@
 
 #-------------------------------------------------------------------------------
 
+import sys
+import os
+from collections import namedtuple
 import xml.etree.ElementTree as ET
 
-#First we are going to read through the xml file we are trying to read:
-tree=ET.parse('C:/Users/Karen/Desktop/Resilience_Orchestration-master/Resilience_Orchestration-master/TempXMLs/bRC_FRAME_Concrete_allComponents.ifcxml')
-root=tree.getroot()
-len_root=len(root)
-#Grab the last entry of the root --> this is our starting point to get to the Ifc structural data:
-start=root[len_root-1] #This creates a class 'xml.etree.ElementTree.Element' object
-
-#The following findall commands identify all of our components: Columns, Beams, Walls
-all_colTags=start.findall('{http://www.iai-tech.org/ifcXML/IFC2x2/FINAL}IfcColumn') #This is us asking to find every subelement with the IfcColumn Tag
-all_beamTags=start.findall('{http://www.iai-tech.org/ifcXML/IFC2x2/FINAL}IfcBeam') #This is us asking to find every subelement with the IfcBeam Tag
-all_WallTags=start.findall('{http://www.iai-tech.org/ifcXML/IFC2x2/FINAL}IfcWallStandardCase') #This is us asking to find every subelement with the IfcWallStandardCase Tag
-
-print("Here are all the columns:")
-for tags in all_colTags:
-    Tag=tags.find('{http://www.iai-tech.org/ifcXML/IFC2x2/FINAL}Tag').text #This is to verify uniqueness within components
-    ObjectType=tags.find('{http://www.iai-tech.org/ifcXML/IFC2x2/FINAL}ObjectType').text
-    print(ObjectType,Tag)
-
-print("Here are all the beams:")
-for tags in all_beamTags:
-    Tag=tags.find('{http://www.iai-tech.org/ifcXML/IFC2x2/FINAL}Tag').text #This is to verify uniqueness within components
-    ObjectType=tags.find('{http://www.iai-tech.org/ifcXML/IFC2x2/FINAL}ObjectType').text
-    print(ObjectType,Tag)
-
-print("Here are all the walls:")
-for tags in all_WallTags:
-    Tag=tags.find('{http://www.iai-tech.org/ifcXML/IFC2x2/FINAL}Tag').text #This is to verify uniqueness within components
-    ObjectType=tags.find('{http://www.iai-tech.org/ifcXML/IFC2x2/FINAL}ObjectType').text
-    print(ObjectType,Tag)
-
-
-
-
-
-
-
-
-
+IFC_NS='{http://www.iai-tech.org/ifcXML/IFC2x2/FINAL}'
+#The components we look for unless we are asked for others: Columns, Beams, Walls
+DEFAULT_CLASSES=('IfcColumn','IfcBeam','IfcWallStandardCase')
+
+#One record per component: ifc_class is e.g. 'IfcColumn', id is the ifcxml id (e.g. 'i3180'), Tag is the Revit element id,
+#placement is the id of the IfcLocalPlacement the component refers to
+ComponentRecord=namedtuple('ComponentRecord',['ifc_class','id','Tag','ObjectType','Name','placement'])
+
+def _text(element,name):
+    child=element.find(IFC_NS+name)
+    return child.text if child is not None else None
+
+def component_record(element,ifc_class):
+    placement=element.find(IFC_NS+'ObjectPlacement/'+IFC_NS+'IfcLocalPlacement')
+    return ComponentRecord(ifc_class,element.get('id'),_text(element,'Tag'),_text(element,'ObjectType'),_text(element,'Name'),
+                           placement.get('ref') if placement is not None else None)
+
+def iter_entities(path,classes=None):
+    #Streams through the file once and yields (ifc_class, element) for every top level entity of the ifcxml
+    #(classes=None --> every entity). The entities sit right below the last child of the root (the uos element);
+    #each one is cleared as soon as it has been handed out, so memory stays bounded however big the file is.
+    #An element is only complete on its 'end' event, so it must be used before the generator is advanced.
+    depth=0
+    uos=None
+    for event,element in ET.iterparse(path,events=('start','end')):
+        if event=='start':
+            depth+=1
+            if depth==2:
+                uos=element
+            continue
+        depth-=1
+        if depth!=2:
+            continue
+        tag=element.tag
+        ifc_class=tag[len(IFC_NS):] if tag.startswith(IFC_NS) else tag
+        if classes is None or ifc_class in classes:
+            yield ifc_class,element
+        uos.clear() #drops this entity (and anything before it) from the tree that iterparse keeps building
+
+def iter_components(path,classes=DEFAULT_CLASSES):
+    #Yields a ComponentRecord for every component of the requested classes, in file order
+    classes=frozenset(classes)
+    for ifc_class,element in iter_entities(path,classes):
+        yield component_record(element,ifc_class)
+
+def extract_components(path,classes=DEFAULT_CLASSES):
+    #returns: {ifc_class: [ComponentRecord, ...]} in one pass over the file
+    components=dict((c,[]) for c in classes)
+    for record in iter_components(path,classes):
+        components[record.ifc_class].append(record)
+    return components
+
+def main(path):
+    components=extract_components(path)
+    for ifc_class,title in (('IfcColumn','columns'),('IfcBeam','beams'),('IfcWallStandardCase','walls')):
+        print("Here are all the "+title+":")
+        for record in components[ifc_class]:
+            print(record.ObjectType,record.Tag) #Tag is to verify uniqueness within components
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv)>1 else os.path.join(os.path.dirname(os.path.abspath(__file__)),'TempXMLs','bRC_FRAME_Concrete_allComponents.ifcxml'))